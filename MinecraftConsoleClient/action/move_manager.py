@@ -22,6 +22,12 @@ class MoveManager:
     _target_queue: queue.Queue = None
     _paused: threading.Lock = None
     _skip: bool = None
+    # Set when mover may put packets, see suspend.
+    _unsuspended: threading.Event = None
+    # Held while putting packet, suspend waits for it.
+    _send_lock: threading.Lock = None
+    # Incremented by suspend, walk started with other number is aborted.
+    _walk_number: int = 0
     __login_packet_creator = None  # Module, read-only.
 
     _on_pause: [callable, ] = None
@@ -29,22 +35,31 @@ class MoveManager:
     def __init__(self,
                  send_queue: queue.Queue,
                  play_packet_creator,
-                 hero: Hero):
+                 hero: Hero,
+                 get_compression_threshold: callable = lambda: -1):
         """
         :param send_queue: queue from where packet will be taken and send
         :param play_packet_creator: module containing actions for moving
         :type hero: Hero object which will be moved
+        :param get_compression_threshold: returns compression threshold of the connection,
+            movement packets are framed for it
         """
         logger.debug("Starting mover.")
 
         self._target_queue = queue.Queue()
         self._started_thread = threading.Event()
         self._play_packet_creator = play_packet_creator
+        self._get_compression_threshold = get_compression_threshold
 
         self._paused = threading.Lock()
         self.is_paused = self._paused.locked
         self._skip = False
 
+        self._unsuspended = threading.Event()
+        self._unsuspended.set()
+        self._send_lock = threading.Lock()
+        self._walk_number = 0
+
         self._on_pause = []
 
         # Started as daemon because of:
@@ -73,6 +88,10 @@ class MoveManager:
 
         return self._mover.is_alive()
 
+    def is_running(self) -> bool:
+        """Return whether moving thread is alive."""
+        return self._mover.is_alive()
+
     def stop(self):
         """Stops moving thread."""
         self.clear_targets()
@@ -96,6 +115,28 @@ class MoveManager:
         yield True
         self.resume()
 
+    def suspend(self):
+        """
+        Abort current walk, clear targets and stop putting packets until unsuspend.
+
+        After return no movement packet is put into send_queue,
+        e.g. between sessions, when packets would be sent during login.
+        """
+        with self._send_lock:
+            self._unsuspended.clear()
+            self._walk_number += 1
+        self.clear_targets()
+
+        logger.info("Suspended mover")
+
+    def unsuspend(self):
+        """Allow walking to targets again, e.g. after logged in."""
+        self._unsuspended.set()
+
+    def is_suspended(self) -> bool:
+        """Return whether mover is suspended, see suspend."""
+        return not self._unsuspended.is_set()
+
     def add_target(self,
                    x: float = None, y: float = None, z: float = None,
                    target: Position = None):
@@ -182,7 +223,12 @@ class MoveManager:
             target = target_queue.get()
             if target is None:
                 break  # Exit thread loop
-            target_x, target_y, target_z = target
+
+            # Targets added while suspended wait for unsuspend.
+            self._unsuspended.wait()
+            walk_number = self._walk_number
+
+            target_x, target_y, target_z = target.x, target.y, target.z
             while hero.entity.position is None:
                 logger.info(f"Waiting for hero position.")
                 time.sleep(0.2)  # Wait until server sends hero position.
@@ -191,8 +237,11 @@ class MoveManager:
             logger.info(f"Going to: {target}")
 
             # Speed is critical.
-            create_step_packet = self._play_packet_creator.hero_position
+            # Only coordinates change, packets are patched copies of one preframed packet.
+            create_step_packet = self._play_packet_creator.player_position_template(
+                self._get_compression_threshold()).create
             send_packet = send_queue.put
+            send_lock = self._send_lock
             get_perf_time = time.perf_counter
             is_paused = self._paused.locked
 
@@ -243,20 +292,24 @@ class MoveManager:
                     next_hero_pos_z = hero_pos_z + step_z
 
                     """Packet may be delayed due to full send queue, 
-                    and extremely slow connection. """
-                    # TODO: Add to the connection priority queue.
-                    send_packet(
-                        create_step_packet((next_hero_pos_x,
-                                            next_hero_pos_y,
-                                            next_hero_pos_z),
-                                           on_ground=False))
+                    and extremely slow connection. 
+                    Movement is sent after control packets (keep-alive, confirms). """
+                    with send_lock:
+                        if walk_number != self._walk_number:
+                            logger.info(f"Aborted moving: {target}")
+                            break
+                        send_packet(
+                            create_step_packet(next_hero_pos_x,
+                                               next_hero_pos_y,
+                                               next_hero_pos_z,
+                                               False))  # on_ground
 
                     # Needs to be rewritten: update pos basing on server response.
-                    hero.position.pos = {'x': next_hero_pos_x,
-                                           'y': next_hero_pos_y,
-                                           'z': next_hero_pos_z}
+                    hero_pos.set(next_hero_pos_x,
+                                 next_hero_pos_y,
+                                 next_hero_pos_z)
 
-                    # print(f"hero_pos: {hero.position.pos}")
+                    # print(f"hero_pos: {hero_pos}")
 
                     time.sleep(step_delay -
                                (
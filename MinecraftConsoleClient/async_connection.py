@@ -0,0 +1,145 @@
+"""Creator and manager of asyncio based connection to the server."""
+
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Union
+
+from connection import frame_packet
+from packet.frame_reader import FrameReader, peek_packet_id
+
+logger = logging.getLogger('mainLogger')
+
+
+class _PacketProtocol(asyncio.BufferedProtocol):
+    """Frame packets straight from the event loop into received queue."""
+
+    def __init__(self, received: asyncio.Queue):
+        self._frame_reader: FrameReader = FrameReader()
+        self._put_received: callable = received.put_nowait
+        self._can_write: asyncio.Event = asyncio.Event()
+        self._can_write.set()
+        self.transport: asyncio.Transport = None
+
+        # See AsyncConnection.set_packet_filter.
+        self.packet_filter: frozenset = None
+        self.is_compression_enabled: bool = False
+        self.dropped_packets: int = 0
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        return self._frame_reader.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int):
+        try:
+            packets = self._frame_reader.buffer_updated(nbytes)
+        except ValueError as err:
+            logger.critical("Invalid varint. %s", err)
+            self.transport.close()
+            return
+
+        put_received = self._put_received
+        packet_filter = self.packet_filter
+        if packet_filter is None:
+            for packet in packets:
+                put_received(packet)
+            return
+
+        is_compression_enabled = self.is_compression_enabled
+        for packet in packets:
+            packet_id = peek_packet_id(packet, is_compression_enabled)
+            if packet_id is None or packet_id in packet_filter:
+                put_received(packet)
+            else:
+                self.dropped_packets += 1
+
+    def connection_lost(self, exc: Exception):
+        if exc is not None:
+            logger.critical("Probably connection has been shut down: %s", exc)
+        # Wake up writers, next write will fail on closed transport.
+        self._can_write.set()
+        self._put_received(None)
+
+    def pause_writing(self):
+        self._can_write.clear()
+
+    def resume_writing(self):
+        self._can_write.set()
+
+    async def wait_for_writing(self):
+        await self._can_write.wait()
+
+
+class AsyncConnection:
+    """
+    Asyncio counterpart of connection.Connection.
+
+    Does not start any threads - everything happens in the event loop,
+    so many connections can share one loop and one thread.
+
+    Received packets are put into received queue, None means end of connection.
+    """
+
+    # Positive threshold means number of bytes before start compressing otherwise compression is disabled.
+    compression_threshold: int = -1
+
+    def __init__(self):
+        """Create instance of AsyncConnection."""
+        self._protocol: _PacketProtocol = None
+
+    async def connect(self, socket_data: (str, int),
+                      received_queue: asyncio.Queue,
+                      timeout: int = 5):
+        """
+        Start connection using socket_data(ip / hostname, port).
+
+        On error raises standard socket exceptions or asyncio.TimeoutError.
+
+        :param socket_data: tuple(host, port)
+        :param received_queue: where to put received packets
+        :param timeout: connection timeout
+        """
+        loop = asyncio.get_running_loop()
+        _, self._protocol = await asyncio.wait_for(
+            loop.create_connection(lambda: _PacketProtocol(received_queue), *socket_data),
+            timeout)
+
+    async def send(self, payload: bytes):
+        """
+        Compress (when needed) and send payload to the server.
+
+        Waits when the transport write buffer is full.
+
+        :param payload: b'VarInt(Packet ID)' + b'VarInt(Data)', or framed packet (see packet.packet_template)
+        """
+        protocol = self._protocol
+        protocol.transport.write(frame_packet(payload, self.compression_threshold))
+        await protocol.wait_for_writing()
+
+    def set_packet_filter(self, packet_ids: Union[frozenset, None]):
+        """
+        Drop received packets with id not in packet_ids, see Connection.set_packet_filter.
+
+        Has to be called after connect.
+
+        :param packet_ids: ids of packets to put into received queue, None disables filter
+        """
+        self._protocol.is_compression_enabled = self.compression_threshold >= 0
+        self._protocol.packet_filter = packet_ids
+
+    @property
+    def dropped_packets(self) -> int:
+        """Return number of packets dropped by packet filter."""
+        return 0 if self._protocol is None else self._protocol.dropped_packets
+
+    def is_closing(self) -> bool:
+        """Return whether connection is closed or being closed."""
+        return self._protocol is None or self._protocol.transport.is_closing()
+
+    def close(self):
+        """Close connection. Received queue gets None when closed."""
+        with suppress(Exception):
+            self._protocol.transport.close()
+            logger.info("Closed connection")
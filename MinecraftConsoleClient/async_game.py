@@ -0,0 +1,224 @@
+"""
+Asyncio runtime for game.
+
+Game starts 4+ threads per bot, AsyncGame runs in the event loop,
+so hundreds of bots can share one process and one thread.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from typing import Union
+
+import async_connection
+import game
+from misc.exceptions import InvalidUncompressedPacketError
+from packet.outbound_queue import PriorityDeque
+from packet.packet_data_reader import PacketDataReader
+
+logger = logging.getLogger("mainLogger")
+
+
+class _SendQueue(asyncio.Queue):
+    """
+    Unbounded asyncio.Queue accepting packets from synchronous packet handlers.
+
+    Like packet.outbound_queue.OutboundQueue, gets packets in order of their outbound class.
+    """
+
+    def _init(self, maxsize: int):
+        self._queue = PriorityDeque()
+
+    def _put(self, packet: bytes):
+        if not self._queue.append(packet):
+            # Superseded packet will never be got, do not wait for its task_done.
+            self._unfinished_tasks -= 1
+
+    def discard(self, *coalesce_keys: str) -> int:
+        """Drop queued packets with any of given coalescing keys (see PriorityDeque.discard)."""
+        discarded = self._queue.discard(*coalesce_keys)
+        if discarded:
+            self._unfinished_tasks -= discarded
+            if not self._unfinished_tasks:
+                self._finished.set()
+        return discarded
+
+    @property
+    def coalesced(self) -> Counter:
+        """Return number of packets dropped per coalescing key."""
+        return self._queue.coalesced
+
+    def put(self, item):
+        """Add item without waiting, the same as put_nowait."""
+        self.put_nowait(item)
+
+
+class AsyncGame(game.Game):
+    """
+    Game driven by asyncio event loop.
+
+    Uses the same PacketDataReader and packets_specifics as Game.
+    Does not drive move_manager - it needs its own thread.
+    Does not support fast_keep_alive - there is no listener thread, protocol and game share the event loop.
+    """
+
+    _connection_class: type = async_connection.AsyncConnection
+    _send_queue_class: type = _SendQueue
+    _receive_queue_class: type = asyncio.Queue
+
+    def _create_receive_queue(self) -> asyncio.Queue:
+        """Return unbounded asyncio.Queue, receive_high_water and queue wait time are not supported."""
+        return self._receive_queue_class()
+
+    def is_keep_alive_answered(self, keep_alive_id: bytes) -> bool:
+        """Return False, keep alive is always answered by the handler."""
+        return False
+
+    async def start(self) -> Union[str, None]:
+        """
+        Start game.
+
+        :return: error message, otherwise None
+        """
+        if not await self._connect_to_server():
+            return self.stop("Cannot connect to the server.")
+        logger.info("Successfully connected to the server.")
+
+        sender = asyncio.create_task(self._send_packets())
+        try:
+            if not await self._log_in():
+                return self.stop("Cannot log in.")
+            logger.info("Successfully logged in to server.")
+
+            return await self._play()
+        finally:
+            sender.cancel()
+
+    async def _play(self) -> Union[str, None]:
+        """Interpret play packets until connection ends."""
+        play_packets_specifics = self.data.version_data.packets_specifics["play"]
+
+        packet_data_reader = PacketDataReader()
+        packet_data_reader.set_compression_threshold(self._connection.compression_threshold)
+        packet_filter = self._get_play_packet_filter()
+        packet_data_reader.set_packet_filter(packet_filter, self.skip_stats)
+        if packet_filter is not None:
+            self._connection.set_packet_filter(packet_filter)
+
+        metrics = self.metrics
+        get_received_packet = self.received_packets.get
+        while True:
+            try:
+                data = await asyncio.wait_for(get_received_packet(), 20)
+            except asyncio.TimeoutError:
+                return self.stop("Server timeout error.")
+
+            if not data:
+                return self.stop("Received 0 bytes")
+
+            try:
+                if metrics is not None:
+                    result = self._interpret_packet_measured(data, packet_data_reader,
+                                                             play_packets_specifics)
+                elif packet_data_reader.load(packet_data=memoryview(data)):
+                    result = self.interpret_packet(packet_data_reader=packet_data_reader,
+                                                   state_packets_specifics=play_packets_specifics)
+                else:
+                    continue
+            except InvalidUncompressedPacketError:
+                return self.stop("Received packet with invalid compression.")
+
+            if result == 5555:
+                break
+
+        return None
+
+    async def _send_packets(self):
+        """Send packets put into to_send_packets until get b''."""
+        get_to_send = self.to_send_packets.get
+        send = self._connection.send
+        while True:
+            payload = await get_to_send()
+
+            if not payload:
+                logger.critical("Packet is empty.")
+                break
+            if self._connection.is_closing():
+                logger.critical("Probably connection has been shut down.")
+                break
+
+            await send(payload)
+
+        logger.info("Exiting sending task")
+
+    async def _log_in(self) -> bool:
+        """
+        Log-in into server.
+
+        SUPPORT ONLY NON-PREMIUM.
+
+        :return success
+        :rtype bool
+        """
+        logger.info("Trying to log in in offline mode (non-premium).")
+
+        for payload in self._get_login_payloads():
+            self.to_send_packets.put(payload)
+
+        packet_data_reader = PacketDataReader()
+        packet_data_reader.set_compression_threshold(self._connection.compression_threshold)
+
+        login_packets_specifics = self.data.version_data.packets_specifics["login"]
+        for _ in range(5):
+            try:
+                data = await asyncio.wait_for(self.received_packets.get(), 20)
+            except asyncio.TimeoutError:
+                logger.error("TimeoutError while waiting for nonpremium login responses.")
+                return False
+
+            result = self._handle_login_packet(data, packet_data_reader, login_packets_specifics)
+            if result is not None:
+                return result
+
+        return False
+
+    async def _connect_to_server(self, timeout=5) -> bool:
+        """
+        Establish connection with the server.
+
+        Not raises exceptions.
+
+        :param timeout: connection timeout
+        :returns: success
+        :rtype: bool
+        """
+        try:
+            await self._connection.connect(self.server_address or self.data.host.get_host_data(),
+                                           self.received_packets, timeout)
+        except (OSError, asyncio.TimeoutError) as err:
+            logger.critical("Can't connect to: %s, reason: %s",
+                            self.data.host.socket_data, err)
+            return False
+
+        logger.debug("Established connection with: %s", self.data.host.socket_data)
+        return True
+
+
+async def run_games(games: [AsyncGame, ]) -> [Union[str, None], ]:
+    """
+    Start all games in the running event loop and wait until they end.
+
+    :param games: games to start
+    :return: error message or None for every game
+    """
+    return await asyncio.gather(*(game_.start() for game_ in games))
+
+
+def start_games(games: [AsyncGame, ]) -> [Union[str, None], ]:
+    """
+    Run all games in new event loop in the current thread.
+
+    :param games: games to start
+    :return: error message or None for every game
+    """
+    return asyncio.run(run_games(games))
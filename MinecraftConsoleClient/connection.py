@@ -4,16 +4,67 @@ import logging
 import queue
 import socket
 import threading
+import time
 import zlib
 from contextlib import suppress
+from typing import Union
 
 from misc import converters
-from misc.consts import MAX_INT
+from misc.consts import MAX_FRAME_SIZE
 from misc.hashtables import VARINT_BYTES
+from packet.capture import CaptureWriter, Direction
+from packet.frame_reader import FrameReader, peek_packet_id
+from packet.packet_template import get_payload
+from packet.packet_writer import PacketWriter
+from packet.receive_arena import ArenaFrameReader, ReceiveArena
 
 logger = logging.getLogger('mainLogger')
 
 
+# Maximal number of packets written into one buffer and sent with one send call.
+MAX_BATCH_PACKETS = 256
+
+
+def frame_payload(payload: bytes, compression_threshold: int) -> bytes:
+    """
+    Prefix payload with its length, compress when exceeds compression_threshold.
+
+    :param payload: b'VarInt(Packet ID)' + b'VarInt(Data)'
+    :param compression_threshold: negative when compression is disabled
+    :returns packet ready to send
+    """
+    to_varint = converters.convert_to_varint
+    payload_len = len(payload)
+
+    # Compression is disabled
+    if compression_threshold < 0:
+        return to_varint(payload_len) + payload
+
+    # When compression disabled for this packet
+    if payload_len < compression_threshold:
+        payload = b'\x00' + payload
+    else:  # Compression is enabled
+        payload = to_varint(payload_len) + zlib.compress(payload)
+
+    return to_varint(len(payload)) + payload
+
+
+def frame_packet(packet: bytes, compression_threshold: int) -> bytes:
+    """
+    Like frame_payload, but packet framed for compression_threshold
+    (see packet.packet_template) is returned as it is.
+
+    :param packet: payload or framed packet
+    :param compression_threshold: negative when compression is disabled
+    :returns packet ready to send
+    """
+    if getattr(packet, "is_framed", False):
+        if packet.compression_threshold == compression_threshold:
+            return packet
+        packet = packet[packet.payload_offset:]
+    return frame_payload(packet, compression_threshold)
+
+
 class Connection:
     """
     Main class that creates and handles TCP connection between server(host) and client.
@@ -27,6 +78,31 @@ class Connection:
     compression_threshold: int = -1
     _connection: socket.socket = None
 
+    # Receive many packets per recv_into call, instead of recv(1) per VarInt byte.
+    use_buffered_receive: bool = True
+    _frame_reader: FrameReader = None
+
+    # Receive into recycled slabs, packets are memoryviews which have to be released,
+    # see release_frame. Works with use_buffered_receive.
+    use_receive_arena: bool = False
+    _arena: ReceiveArena = None
+
+    # Send all queued packets with one sendall call, see enable_write_coalescing.
+    coalesce_writes: bool = False
+    # How long (seconds) sender waits for more packets before sending a batch.
+    max_batch_delay: float = 0.0
+
+    # Ids of packets put into received queue, None passes all, see set_packet_filter.
+    _packet_filter: frozenset = None
+    # Number of packets dropped by the listener.
+    dropped_packets: int = 0
+
+    # Records received and sent frames, see start_capture.
+    _capture: CaptureWriter = None
+
+    # Listener answers keep alive itself, see enable_keep_alive_fast_path.
+    _keep_alive: (int, callable) = None
+
     _listener: threading.Thread = None
     _sender: threading.Thread = None
 
@@ -35,6 +111,10 @@ class Connection:
     def __init__(self):
         """Create instance of Connection."""
         self._connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # Listener (keep alive) and sender send through the same socket.
+        self._send_lock: threading.Lock = threading.Lock()
+        # Keep alive id -> time.perf_counter() of the answer, see pop_keep_alive_time.
+        self._answered_keep_alives: {bytes: float} = {}
 
     def __del__(self):
         """Close connection."""
@@ -44,6 +124,121 @@ class Connection:
         """Change socket behavior."""
         self._connection.setblocking(is_blocking)
 
+    def set_tcp_nodelay(self, is_enabled: bool = True):
+        """Enable (disable) TCP_NODELAY - send data without waiting (Nagle's algorithm)."""
+        self._connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(is_enabled))
+
+    def enable_write_coalescing(self, max_batch_delay: float = 0.0,
+                                tcp_nodelay: bool = True):
+        """
+        Make sender send all queued packets with one system call.
+
+        Has to be called before start_sender.
+        Higher max_batch_delay gives bigger batches (throughput) at cost of latency.
+
+        :param max_batch_delay: how long (seconds) wait for more packets before sending
+        :param tcp_nodelay: whether to disable Nagle's algorithm
+        """
+        self.coalesce_writes = True
+        self.max_batch_delay = max_batch_delay
+        self.set_tcp_nodelay(tcp_nodelay)
+
+    def set_packet_filter(self, packet_ids: Union[frozenset, None]):
+        """
+        Make listener drop packets with id not in packet_ids.
+
+        Packet id is read without inflating, so compressed packets
+        always pass - see PacketDataReader.set_packet_filter.
+        Filter can be changed anytime, e.g. when state changes from login to play.
+
+        :param packet_ids: ids of packets to put into received queue, None disables filter
+        """
+        self._packet_filter = packet_ids
+
+    def start_capture(self, path: str):
+        """
+        Record every received frame and sent payload into capture file.
+
+        Received frames are recorded before packet filter.
+        See packet.capture for the format, Game.replay_capture for replaying.
+
+        :param path: capture file, appended when exists
+        """
+        self.stop_capture()
+        self._capture = CaptureWriter(path)
+
+    def stop_capture(self):
+        """Stop recording and close capture file."""
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            capture.close()
+
+    def enable_keep_alive_fast_path(self, keep_alive_packet_id: int, create_response: callable):
+        """
+        Make listener answer keep alive packets, without waiting for the game.
+
+        Keep alive packets still get into received queue, see pop_keep_alive_time.
+        Has to be called in play state, after compression threshold has been set.
+
+        :param keep_alive_packet_id: id of received keep alive packet
+        :param create_response: function creating response payload from keep alive id
+        """
+        self._keep_alive = (keep_alive_packet_id, create_response)
+
+    def pop_keep_alive_time(self, keep_alive_id: bytes) -> Union[float, None]:
+        """
+        Return time.perf_counter() when listener has answered keep_alive_id.
+
+        :param keep_alive_id: data of keep alive packet
+        :returns None when keep alive has not been answered by the listener
+        """
+        return self._answered_keep_alives.pop(bytes(keep_alive_id), None)
+
+    def _answer_keep_alives(self, packets: [bytes, ], keep_alive: (int, callable)):
+        """Send response to every uncompressed keep alive among packets."""
+        # Keep alive: [b'\x00' (data length, when compression is enabled)] + packet id + long.
+        id_pos = 1 if self.compression_threshold >= 0 else 0
+        keep_alive_size = id_pos + 9
+        keep_alive_packet_id, create_response = keep_alive
+
+        for packet in packets:
+            if len(packet) != keep_alive_size or packet[id_pos] != keep_alive_packet_id:
+                continue
+            if id_pos and packet[0]:
+                continue  # Compressed.
+
+            keep_alive_id = bytes(packet[id_pos + 1:])
+            payload = create_response(keep_alive_id)
+            capture = self._capture
+            if capture is not None:
+                capture.write(Direction.OUT, payload)
+            if self._send_data(frame_payload(payload, self.compression_threshold)):
+                self._answered_keep_alives[keep_alive_id] = time.perf_counter()
+
+    def release_frame(self, packet: bytes):
+        """
+        Give back packet received into arena (see use_receive_arena) when not needed anymore.
+
+        Does nothing when arena is disabled or packet is not from arena.
+        """
+        arena = self._arena
+        if arena is not None:
+            arena.release(packet)
+
+    def _filter_packets(self, packets: [bytes, ], packet_filter: frozenset) -> [bytes, ]:
+        """Return packets wanted by packet_filter or with unknown packet id, count dropped."""
+        is_compression_enabled = self.compression_threshold >= 0
+        wanted = []
+        for packet in packets:
+            packet_id = peek_packet_id(packet, is_compression_enabled)
+            if packet_id is None or packet_id in packet_filter:
+                wanted.append(packet)
+            else:
+                self.release_frame(packet)
+
+        self.dropped_packets += len(packets) - len(wanted)
+        return wanted
+
     def connect(self, socket_data: (str, int), timeout: int = 5):
         """
         Start connection using socket_data(ip / hostname, port).
@@ -101,6 +296,35 @@ class Connection:
 
         return b''
 
+    def _receive_packets(self) -> [bytes, ]:
+        """
+        Read all complete packets from one fill of the receive buffer.
+
+        Similar to _receive_packet, but calls recv_into once per buffer fill.
+
+        Returns None when connection is broken or sth.
+
+        :returns list of read packets (may be empty)
+        """
+        # Broad try, because when sth went wrong here we are in danger.
+        try:
+            return self._frame_reader.read_frames()
+
+        except BrokenPipeError:
+            logger.critical("Connection has been broken.")
+
+        except ValueError as err:
+            logger.critical("Invalid varint. %s", err)
+
+        except OSError as err:
+            logger.critical("Probably connection has been shut down: %s", err)
+
+        except Exception as err:
+            logger.critical("<connection#3>Uncaught exception [%s] "
+                            "occurred: [%s]", err.__class__.__name__, err)
+
+        return None
+
     def start_listener(self, received_queue: queue.Queue) -> bool:
         """
         Start thread that listens packets incoming from the server.
@@ -118,6 +342,13 @@ class Connection:
             logger.error("Listener already started")
             return False
 
+        if self.use_buffered_receive:
+            if self.use_receive_arena:
+                self._arena = ReceiveArena()
+                self._frame_reader = ArenaFrameReader(self._arena, self._connection.recv_into)
+            else:
+                self._frame_reader = FrameReader(self._connection.recv_into)
+
         self._ready = threading.Event()
         self._listener = threading.Thread(target=self._listen,
                                           args=(received_queue,),
@@ -180,8 +411,8 @@ class Connection:
         else:
             raise ValueError("VarInt is too big!")
 
-        if packet_length > MAX_INT:
-            raise ValueError("VarInt is too big!")
+        if packet_length > MAX_FRAME_SIZE:
+            raise ValueError(f"Packet length {packet_length} is bigger than {MAX_FRAME_SIZE}!")
 
         return packet_length
 
@@ -219,6 +450,8 @@ class Connection:
                 if not self._sender.is_alive():
                     logger.debug("Stopped sender")
 
+        self.stop_capture()
+
         logger.info("Closed connection")
 
     def _listen(self, received: queue.Queue):
@@ -228,6 +461,7 @@ class Connection:
         Similar to _sender.
         Starts listening packets incoming from server.
         When received packet inserts it into buffer queue (received).
+        With use_buffered_receive frames every packet from one buffer fill.
         It is blocking function, so has to be run as a daemon.
         Closes when:
             receive packet longer or shorted than declared,
@@ -243,13 +477,44 @@ class Connection:
 
         self._ready.set()
 
-        while True:
-            packet = self._receive_packet()
-
-            if not packet:
-                logger.critical("Received empty packet. Exiting.")
-                break
-            received.put(packet)
+        put = received.put
+        if self.use_buffered_receive:
+            receive_packets = self._receive_packets
+            while True:
+                packets = receive_packets()
+
+                if packets is None:
+                    logger.critical("Connection has been closed. Exiting.")
+                    break
+                capture = self._capture
+                if capture is not None:
+                    capture.write_frames(Direction.IN, packets)
+                keep_alive = self._keep_alive
+                if keep_alive is not None:
+                    self._answer_keep_alives(packets, keep_alive)
+                packet_filter = self._packet_filter
+                if packet_filter is not None:
+                    packets = self._filter_packets(packets, packet_filter)
+                for packet in packets:
+                    put(packet)
+        else:
+            receive_packet = self._receive_packet
+            while True:
+                packet = receive_packet()
+
+                if not packet:
+                    logger.critical("Received empty packet. Exiting.")
+                    break
+                capture = self._capture
+                if capture is not None:
+                    capture.write(Direction.IN, packet)
+                keep_alive = self._keep_alive
+                if keep_alive is not None:
+                    self._answer_keep_alives([packet], keep_alive)
+                packet_filter = self._packet_filter
+                if packet_filter is not None and not self._filter_packets([packet], packet_filter):
+                    continue
+                put(packet)
 
         received.put(None)
         logger.info("Exiting listening thread")
@@ -276,49 +541,113 @@ class Connection:
 
         self._ready.set()
 
-        to_varint = converters.convert_to_varint
-        while True:
-            # packet: b'VarInt(Packet ID)' + b'VarInt(Data)'
-            payload = to_send.get()
+        if self.coalesce_writes:
+            self._send_batches(to_send)
+        else:
+            send_data = self._send_data
+            while True:
+                # packet: b'VarInt(Packet ID)' + b'VarInt(Data)'
+                payload = to_send.get()
 
-            if not payload:
-                logger.critical("Packet is empty.")
-                break
+                if not payload:
+                    logger.critical("Packet is empty.")
+                    break
 
-            payload_len = len(payload)
+                capture = self._capture
+                if capture is not None:
+                    capture.write(Direction.OUT, get_payload(payload))
 
-            # Compression is disabled
-            if self.compression_threshold < 0:
-                packet = to_varint(payload_len) + payload
-
-            else:
-                # When compression disabled for this packet
-                if payload_len < self.compression_threshold:
-                    payload = b'\x00' + payload
-                else:  # Compression is enabled
-                    payload = to_varint(payload_len) + zlib.compress(payload)
-
-                packet = to_varint(len(payload)) + payload
-            # End of compression
-
-            try:
-                self._connection.sendall(packet)
-            except ConnectionAbortedError:
-                # Client closed connection.
-                logger.critical("Connection has been shut down by client. ")
-                break
-            except BrokenPipeError:
-                # Server closed connection or socket has been shutdown.
-                logger.critical(
-                    "Probably connection has been shut down. Try again.")
-                break
-            except OSError as err:
-                logger.critical(
-                    "Probably connection has been shut down: %s", err)
-                break
-            except Exception as err:
-                logger.critical("<connection#1>Uncaught exception [%s] "
-                                "occurred: {%s}", err.__class__.__name__, err)
-                break
+                if not send_data(frame_packet(payload, self.compression_threshold)):
+                    break
 
         logger.info("Exiting sending thread")
+
+    def _send_batches(self, to_send: queue.Queue):
+        """
+        Get all packets waiting in to_send and send them at once.
+
+        Similar to _send loop, but drains to_send and flushes up to
+        MAX_BATCH_PACKETS packets with one send call.
+        Waits up to max_batch_delay for more packets before flushing.
+        Quits when get b'' from to_send queue (sends packets queued before it).
+
+        :param to_send: queue.Queue from where to read bytes to send
+        """
+        get = to_send.get
+        get_nowait = to_send.get_nowait
+        get_perf_time = time.perf_counter
+        max_batch_delay = self.max_batch_delay
+        # Frames of the batch are written one after another into one reusable buffer.
+        writer = PacketWriter()
+        add_frame = writer.add_frame
+
+        is_last = False
+        while not is_last:
+            payloads = [get()]
+
+            # Wait for more packets.
+            if max_batch_delay > 0 and payloads[0]:
+                deadline = get_perf_time() + max_batch_delay
+                while len(payloads) < MAX_BATCH_PACKETS and payloads[-1]:
+                    timeout = deadline - get_perf_time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        payloads.append(get(timeout=timeout))
+                    except queue.Empty:
+                        break
+
+            # Take everything what is already waiting.
+            while len(payloads) < MAX_BATCH_PACKETS and payloads[-1]:
+                try:
+                    payloads.append(get_nowait())
+                except queue.Empty:
+                    break
+
+            if not payloads[-1]:
+                is_last = True
+                payloads.pop()
+
+            capture = self._capture
+            if capture is not None:
+                capture.write_frames(Direction.OUT, [get_payload(payload) for payload in payloads])
+
+            compression_threshold = self.compression_threshold
+            writer.clear()
+            for payload in payloads:
+                add_frame(payload, compression_threshold)
+
+            if payloads and not self._send_data(writer.get_frames()):
+                return
+
+        logger.critical("Packet is empty.")
+
+    def _send_data(self, data: bytes) -> bool:
+        """
+        Send data to the server.
+
+        Not raises exceptions.
+
+        :param data: bytes-like object with framed packets
+        :returns success
+        """
+        try:
+            with self._send_lock:
+                self._connection.sendall(data)
+        except ConnectionAbortedError:
+            # Client closed connection.
+            logger.critical("Connection has been shut down by client. ")
+        except BrokenPipeError:
+            # Server closed connection or socket has been shutdown.
+            logger.critical(
+                "Probably connection has been shut down. Try again.")
+        except OSError as err:
+            logger.critical(
+                "Probably connection has been shut down: %s", err)
+        except Exception as err:
+            logger.critical("<connection#1>Uncaught exception [%s] "
+                            "occurred: {%s}", err.__class__.__name__, err)
+        else:
+            return True
+
+        return False
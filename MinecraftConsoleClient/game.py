@@ -7,6 +7,9 @@ Everything what is controlled, is controlled here.
 
 import logging
 import queue
+import sys
+import time
+from concurrent.futures import Future
 from typing import Any, Union, TYPE_CHECKING
 
 import action.move_manager
@@ -16,8 +19,14 @@ import data_structures.host
 import versions.base
 import versions.version
 from data_structures.game_data import GameData
+from misc import chat
 from misc.exceptions import DisconnectedByServerException, InvalidUncompressedPacketError
-from packet.packet_data_reader import PacketDataReader
+from misc.metrics import PacketIdMetrics, PacketMetrics
+from packet.capture import CaptureReader, Direction
+from packet.inflate_stage import DEFAULT_SIZE_CUTOFF, InflateMeasurement, InflateStage
+from packet.outbound_queue import OutboundQueue
+from packet.packet_data_reader import PacketDataReader, SkipStats
+from packet.receive_queue import ReceiveQueue
 from versions.v1_12_2.packet.clientbound.packet_specific import PacketSpecific
 
 if TYPE_CHECKING:
@@ -29,6 +38,43 @@ logger = logging.getLogger("mainLogger")
 class Game:
     """Ultimate class for Life, the Universe, and Everything."""
 
+    # Overridden by runtimes with different transport, see async_game.AsyncGame.
+    _connection_class: type = connection.Connection
+    _send_queue_class: type = OutboundQueue
+    _receive_queue_class: type = queue.Queue
+
+    # Sender sends all queued packets with one system call, see Connection.enable_write_coalescing.
+    coalesce_writes: bool = False
+    max_batch_delay: float = 0.0
+    tcp_nodelay: bool = True
+
+    # When positive, decompress big packets in thread pool, see packet.inflate_stage.
+    inflate_workers: int = 0
+    inflate_size_cutoff: int = DEFAULT_SIZE_CUTOFF
+
+    # Measure traffic and time per packet id, see misc.metrics and Game.metrics.
+    collect_metrics: bool = False
+    # When set, metrics are dumped as JSON into this file when game stops.
+    metrics_path: Union[str, None] = None
+
+    # Receive into recycled slabs instead of bytes per packet, see packet.receive_arena.
+    use_receive_arena: bool = False
+
+    # Record received and sent packets into this file, see Game.replay_capture.
+    capture_path: Union[str, None] = None
+
+    # When positive, received queue is bounded with overload policies, see packet.receive_queue.
+    receive_high_water: int = 0
+    receive_low_water: Union[int, None] = None
+
+    # Listener answers keep alive itself, game only records how late it would answer,
+    # see Connection.enable_keep_alive_fast_path and keep_alive_delay.
+    fast_keep_alive: bool = False
+
+    # Drop play packets without handler: uncompressed ones in the listener,
+    # big compressed ones without inflating them, see skip_stats.
+    skip_unhandled_packets: bool = False
+
     def __init__(self, host: data_structures.host.Host,
                  hero: data_structures.hero.Hero):
         """
@@ -39,8 +85,8 @@ class Game:
         """
         self.data: GameData = GameData(host=host, hero=hero)
 
-        self.to_send_packets: queue.Queue = queue.Queue()
-        self.received_packets: queue.Queue = queue.Queue()
+        self.to_send_packets: queue.Queue = self._send_queue_class()
+        self.received_packets: queue.Queue = self._create_receive_queue()
 
         # TODO: Move mover to Hero.
         self.play_packet_creator: versions.base.VersionData.packet_creator.play \
@@ -50,9 +96,24 @@ class Game:
 
         self.move_manager = action.move_manager.MoveManager(self.to_send_packets,
                                                             self.play_packet_creator,
-                                                            self.data.hero)
+                                                            self.data.hero,
+                                                            self._get_compression_threshold)
+
+        self._connection: connection.Connection = self._connection_class()
+        self._inflate_stage: Union[InflateStage, None] = None
+        self.skip_stats: SkipStats = SkipStats()
+        self.metrics: Union[PacketMetrics, None] = PacketMetrics() if self.collect_metrics else None
 
-        self._connection: connection.Connection = connection.Connection()
+        # Resolved (ip, port) of the host, when set connects without resolving host again.
+        self.server_address: Union[tuple, None] = None
+        # Handshake and login start, the same for every session.
+        self._login_payloads: Union[(bytes, bytes), None] = None
+        # time.perf_counter() of successful log in, None until logged in.
+        self.logged_in_time: Union[float, None] = None
+
+        # Seconds between listener answering keep alive and game handling it, last and maximal.
+        self.keep_alive_delay: float = 0.0
+        self.max_keep_alive_delay: float = 0.0
 
     def start(self) -> Union[str, None]:
         """
@@ -65,27 +126,74 @@ class Game:
             return self.stop("Cannot connect to the server.")
         logger.info("Successfully connected to the server.")
 
+        if self.capture_path is not None:
+            self._connection.start_capture(self.capture_path)
+
+        if self.use_receive_arena:
+            self._connection.use_receive_arena = True
+            if isinstance(self.received_packets, ReceiveQueue):
+                self.received_packets.on_discard = self._connection.release_frame
+
         if not self._connection.start_listener(self.received_packets):
             return self.stop("Cannot start listener")
         logger.debug("Successfully started listening thread")
 
+        if self.coalesce_writes:
+            self._connection.enable_write_coalescing(self.max_batch_delay, self.tcp_nodelay)
+
         if not self._connection.start_sender(self.to_send_packets):
             return self.stop("Cannot start sender")
         logger.debug("Successfully started sending thread")
 
         if not self._log_in():
             return self.stop("Cannot log in.")
+        self.logged_in_time = time.perf_counter()
         logger.info("Successfully logged in to server.")
 
-        if not self.move_manager.start():
+        # Mover keeps running between sessions, suspended until logged in, see reset_session.
+        if not self.move_manager.is_running() and not self.move_manager.start():
             return self.stop("Can't start move manager.")
+        self.move_manager.unsuspend()
 
         play_packets_specifics = self.data.version_data.packets_specifics["play"]
 
         packet_data_reader = PacketDataReader()
-        packet_data_reader.set_compression_threshold(self._connection.compression_threshold)
-
-        get_received_packet = self.received_packets.get
+        received_packets = self.received_packets
+        packet_filter = self._get_play_packet_filter()
+        if packet_filter is not None:
+            self._connection.set_packet_filter(packet_filter)
+        if self.fast_keep_alive:
+            self._connection.enable_keep_alive_fast_path(self.data.version_data.keep_alive_packet_id,
+                                                         self.play_packet_creator.keep_alive)
+
+        compression_threshold = self._connection.compression_threshold
+        if self.inflate_workers > 0 and compression_threshold >= 0:
+            # Stage hands over already decompressed and filtered packets.
+            self._inflate_stage = InflateStage(self.received_packets,
+                                               self.inflate_workers,
+                                               self.inflate_size_cutoff,
+                                               packet_filter,
+                                               self.skip_stats,
+                                               self.receive_high_water,
+                                               self._get_release_frame(),
+                                               self.metrics is not None)
+            if not self._inflate_stage.start(compression_threshold):
+                return self.stop("Can't start inflate stage.")
+            received_packets = self._inflate_stage.inflated
+        else:
+            packet_data_reader.set_compression_threshold(compression_threshold)
+            packet_data_reader.set_packet_filter(packet_filter, self.skip_stats)
+
+        metrics = self.metrics
+        # Without inflate stage, queue wait time is measured by ReceiveQueue.
+        is_queue_timed = isinstance(received_packets, ReceiveQueue)
+        # Measured inflate stage passes wire size, inflate time and queue wait with every packet.
+        is_stage_measured = metrics is not None and self._inflate_stage is not None
+        get_perf_time = time.perf_counter
+        # Inflate stage releases packets itself.
+        release_frame = self._get_release_frame() if self._inflate_stage is None else None
+
+        get_received_packet = received_packets.get
         while True:
             try:
                 data = get_received_packet(timeout=20)
@@ -96,16 +204,138 @@ class Game:
                 return self.stop("Received 0 bytes")
 
             try:
-                packet_data_reader.load(packet_data=memoryview(data))
+                measurement = None
+                if is_stage_measured:
+                    get_time = get_perf_time()
+                    data, measurement = data
+
+                if data.__class__ is Future:
+                    data = data.result()
+
+                if data is None:  # Skipped by inflate stage.
+                    if measurement is not None:
+                        self._record_packet_metrics(None, measurement.wire_bytes, 0,
+                                                    measurement.get_queue_wait_time(get_time),
+                                                    measurement.inflate_time)
+                    continue
+
+                if measurement is not None:
+                    result = self._interpret_packet_measured(
+                        data, packet_data_reader, play_packets_specifics,
+                        measurement.get_queue_wait_time(get_time), measurement)
+                elif metrics is not None:
+                    result = self._interpret_packet_measured(
+                        data, packet_data_reader, play_packets_specifics,
+                        received_packets.last_wait_time if is_queue_timed else 0.0)
+                elif packet_data_reader.load(packet_data=memoryview(data)):
+                    result = self.interpret_packet(packet_data_reader=packet_data_reader,
+                                                   state_packets_specifics=play_packets_specifics)
+                else:
+                    result = None
             except InvalidUncompressedPacketError:
                 return self.stop("Received packet with invalid compression.")
 
-            if self.interpret_packet(packet_data_reader=packet_data_reader,
-                                     state_packets_specifics=play_packets_specifics) == 5555:
+            if release_frame is not None:
+                release_frame(data)
+
+            if result == 5555:
                 break
 
         return None
 
+    def _get_compression_threshold(self) -> int:
+        """Return compression threshold set by the server, negative when compression is disabled."""
+        return self.data.world_data.compression_threshold
+
+    def _get_release_frame(self) -> Union[callable, None]:
+        """Return Connection.release_frame when receive arena is used, otherwise None."""
+        return self._connection.release_frame if self.use_receive_arena else None
+
+    def _create_receive_queue(self) -> queue.Queue:
+        """Return bounded ReceiveQueue when receive_high_water is positive, otherwise unbounded queue."""
+        if self.receive_high_water > 0:
+            return ReceiveQueue(self.receive_high_water, self.receive_low_water,
+                                self.data.version_data.receive_policies)
+        if self.collect_metrics:
+            # Never overloaded, measures queue wait time.
+            return ReceiveQueue(sys.maxsize)
+        return self._receive_queue_class()
+
+    def replay_capture(self, path: str) -> int:
+        """
+        Interpret packets received in capture file, without connecting to the server.
+
+        Frames are fed straight from mmap at full speed - timestamps are ignored.
+        Packets created by handlers are put into to_send_packets, but not sent.
+
+        :param path: capture file, see capture_path
+        :returns number of interpreted play packets
+        """
+        packets_specifics = self.data.version_data.packets_specifics
+        login_packets_specifics = packets_specifics["login"]
+        play_packets_specifics = packets_specifics["play"]
+
+        packet_data_reader = PacketDataReader()
+
+        n_of_packets = 0
+        with CaptureReader(path) as capture:
+            frames = capture.frames(Direction.IN)
+
+            for frame in frames:
+                result = self._handle_login_packet(frame, packet_data_reader, login_packets_specifics)
+                if result is False:
+                    logger.error("Cannot replay log in.")
+                    return n_of_packets
+                if result:
+                    break
+
+            packet_data_reader.set_packet_filter(self._get_play_packet_filter(), self.skip_stats)
+            load = packet_data_reader.load
+            interpret_packet = self.interpret_packet
+            metrics = self.metrics
+            for frame in frames:
+                try:
+                    if metrics is not None:
+                        result = self._interpret_packet_measured(frame, packet_data_reader,
+                                                                 play_packets_specifics)
+                    elif load(packet_data=frame):
+                        result = interpret_packet(packet_data_reader=packet_data_reader,
+                                                  state_packets_specifics=play_packets_specifics)
+                    else:
+                        continue
+                except InvalidUncompressedPacketError:
+                    logger.error("Replayed packet with invalid compression.")
+                    break
+
+                n_of_packets += 1
+                if result == 5555:
+                    break
+
+        return n_of_packets
+
+    def is_keep_alive_answered(self, keep_alive_id: bytes) -> bool:
+        """
+        Return whether listener has answered keep alive, record keep_alive_delay when so.
+
+        :param keep_alive_id: data of keep alive packet
+        """
+        if not self.fast_keep_alive:
+            return False
+        answered_time = self._connection.pop_keep_alive_time(keep_alive_id)
+        if answered_time is None:
+            return False
+
+        self.keep_alive_delay = time.perf_counter() - answered_time
+        if self.keep_alive_delay > self.max_keep_alive_delay:
+            self.max_keep_alive_delay = self.keep_alive_delay
+        return True
+
+    def _get_play_packet_filter(self) -> Union[frozenset, None]:
+        """Return ids of play packets with handler when skip_unhandled_packets, otherwise None."""
+        if not self.skip_unhandled_packets:
+            return None
+        return frozenset(self.data.version_data.packets_specifics["play"])
+
     def _log_in(self) -> bool:
         """
         Log-in into server.
@@ -134,11 +364,83 @@ class Game:
         logger.info("Stopping bot %s. Reason: %s.",
                     self.data.hero.username, error_message)
 
+        if self.metrics is not None and self.metrics_path is not None:
+            self.metrics.dump_json(self.metrics_path)
+
+        if self.fast_keep_alive:
+            logger.info("Maximal keep alive delay of the game: %.3fs", self.max_keep_alive_delay)
+
+        if self.skip_unhandled_packets:
+            logger.info("Packet filter stats: %s", self.skip_stats)
+
+        coalesced = getattr(self.to_send_packets, "coalesced", None)
+        if coalesced:
+            logger.info("Not sent superseded packets: %s", dict(coalesced))
+
+        chat_cache_stats = chat.get_cache_stats()
+        if chat_cache_stats["hits"] or chat_cache_stats["misses"]:
+            # Shared by all games of the process.
+            logger.info("Chat cache stats: %s", chat_cache_stats)
+
+        if isinstance(self.received_packets, ReceiveQueue):
+            # Listener may wait for free space in the queue.
+            self.received_packets.close()
+            logger.info("Received queue stats: %s", self.received_packets.get_stats())
+
+        # Mover would put packets for the next session, see reset_session.
+        self.move_manager.suspend()
+
+        # Makes sender exit, instead of connection.close waiting for it.
+        self.to_send_packets.put(b'')
         self._connection.close()
         self._connection = None
 
+        if self._inflate_stage is not None:
+            # Bounded inflated queue is not emptied by the exited game loop.
+            self._inflate_stage.stop()
+            self._inflate_stage = None
+
         return error_message
 
+    def close_connection(self):
+        """
+        Close connection of the running session, can be called from other thread.
+
+        Listener exits, so the game stops like when the server has closed connection.
+        """
+        connection_ = self._connection
+        if connection_ is not None:
+            connection_.close()
+
+    def reset_session(self):
+        """
+        Prepare stopped game for starting again, see reconnect_manager.ReconnectManager.
+
+        Creates new connection and received queue, drops not sent packets.
+        Keeps hero, world data, metrics, move manager and cached login packets.
+        Move manager stays suspended (walk aborted, targets dropped) until logged in.
+        """
+        if self._connection is not None:
+            self.stop("Session reset.")
+        # Nothing is put into to_send_packets after it is emptied.
+        self.move_manager.suspend()
+
+        self._connection = self._connection_class()
+        self._inflate_stage = None
+        self.received_packets = self._create_receive_queue()
+        while not self.to_send_packets.empty():
+            self.to_send_packets.get_nowait()
+
+        self.data.world_data.compression_threshold = -1
+        self.logged_in_time = None
+
+        if not self.move_manager.is_running():
+            # Thread can not be started twice.
+            self.move_manager = action.move_manager.MoveManager(self.to_send_packets,
+                                                                self.play_packet_creator,
+                                                                self.data.hero,
+                                                                self._get_compression_threshold)
+
     def __del__(self):
         if self._connection is not None:
             self.stop()
@@ -152,13 +454,8 @@ class Game:
         """
         logger.info("Trying to log in in offline mode (non-premium).")
 
-        self.to_send_packets.put(
-            self.login_packet_creator.handshake(
-                self.data.host.get_host_data()))
-
-        self.to_send_packets.put(
-            self.login_packet_creator.login_start(
-                self.data.hero.username))
+        for payload in self._get_login_payloads():
+            self.to_send_packets.put(payload)
 
         packet_data_reader = PacketDataReader()
         packet_data_reader.set_compression_threshold(self._connection.compression_threshold)
@@ -172,37 +469,63 @@ class Game:
                 logger.error("TimeoutError while waiting for nonpremium login responses.")
                 return False
 
-            if not data:
-                logger.error("Received 0 bytes")
-                return False
+            result = self._handle_login_packet(data, packet_data_reader, login_packets_specifics)
+            self._connection.release_frame(data)
+            if result is not None:
+                return result
 
-            try:
-                packet_data_reader.load(packet_data=memoryview(data))
-            except InvalidUncompressedPacketError:
-                logger.error("InvalidUncompressedPacketError while parsing nonpremium login responses.")
-                return False
+        return False
 
-            try:
-                result = self.interpret_packet(packet_data_reader=packet_data_reader,
-                                               state_packets_specifics=login_packets_specifics)
-            except DisconnectedByServerException:
-                self.to_send_packets.put(b'')
-                logger.error("DisconnectedByServerException")
-                return False
-            except Exception as err:
-                logger.critical("<bot#1>Uncaught exception [%s] occurred: %s ",
-                                err.__class__.__name__, err)
-                # print("FOUND UNEXPECTED EXCEPTION\n" * 20)
-                self.to_send_packets.put(b'')
-                return False
+    def _get_login_payloads(self) -> (bytes, bytes):
+        """Return handshake and login start, created once per game."""
+        if self._login_payloads is None:
+            self._login_payloads = (self.login_packet_creator.handshake(self.data.host.get_host_data()),
+                                    self.login_packet_creator.login_start(self.data.hero.username))
+        return self._login_payloads
 
-            if result is True:
-                return True
-            if isinstance(result, int):
-                self.data.world_data.compression_threshold = self._connection.compression_threshold = result
-                packet_data_reader.set_compression_threshold(result)
+    def _handle_login_packet(self, data: bytes,
+                             packet_data_reader: PacketDataReader,
+                             login_packets_specifics: dict) -> Union[bool, None]:
+        """
+        Interpret packet received while logging in.
 
-        return False
+        :param data: received packet
+        :param packet_data_reader: reader with compression threshold of the connection
+        :param login_packets_specifics: actions specific to login packets
+        :return True when logged in, False on error, None when waiting for next packet
+        """
+        if not data:
+            logger.error("Received 0 bytes")
+            return False
+
+        try:
+            packet_data_reader.load(packet_data=memoryview(data))
+        except InvalidUncompressedPacketError:
+            logger.error("InvalidUncompressedPacketError while parsing nonpremium login responses.")
+            return False
+
+        try:
+            result = self.interpret_packet(packet_data_reader=packet_data_reader,
+                                           state_packets_specifics=login_packets_specifics)
+        except DisconnectedByServerException:
+            self.to_send_packets.put(b'')
+            logger.error("DisconnectedByServerException")
+            return False
+        except Exception as err:
+            logger.critical("<bot#1>Uncaught exception [%s] occurred: %s ",
+                            err.__class__.__name__, err)
+            # print("FOUND UNEXPECTED EXCEPTION\n" * 20)
+            self.to_send_packets.put(b'')
+            return False
+
+        if result is True:
+            return True
+        if isinstance(result, int):
+            self.data.world_data.compression_threshold = self._connection.compression_threshold = result
+            packet_data_reader.set_compression_threshold(result)
+            if isinstance(self.received_packets, ReceiveQueue):
+                self.received_packets.set_compression_threshold(result)
+        return None
 
     def _connect_to_server(self, timeout=5) -> bool:
         """
@@ -215,7 +538,7 @@ class Game:
         :rtype: bool
         """
         try:
-            self._connection.connect(self.data.host.get_host_data(), timeout)
+            self._connection.connect(self.server_address or self.data.host.get_host_data(), timeout)
         except OSError as err:
             logger.critical("Can't connect to: %s, reason: %s",
                             self.data.host.socket_data, err)
@@ -235,7 +558,7 @@ class Game:
         if packet_id in state_packets_specifics:
             packet_specific: PacketSpecific = state_packets_specifics[packet_id]
 
-            packet_specific.read_data(packet_data_reader.get_not_parsed_data())
+            packet_specific.read_data(packet_data_reader)
             packet_specific.pre_handler(game_=self)
             default_handler_return = packet_specific.default_handler(game_=self)
             packet_specific.post_handler(game_=self)
@@ -244,6 +567,78 @@ class Game:
 
         return None
 
+    def _interpret_packet_measured(self, data: bytes,
+                                   packet_data_reader: PacketDataReader,
+                                   state_packets_specifics: dict,
+                                   queue_wait_time: float = 0.0,
+                                   measurement: InflateMeasurement = None) -> Any:
+        """
+        Load and interpret received packet like play loop, recording metrics of every phase.
+
+        Raises InvalidUncompressedPacketError like PacketDataReader.load.
+
+        :param data: received packet
+        :param packet_data_reader: reader with compression threshold of the connection
+        :param state_packets_specifics: actions specific to state (play, login, status) and to packets
+        :param queue_wait_time: time packet has waited in received queue
+        :param measurement: wire size and inflate time of packet already inflated by inflate stage
+        :returns result of the default_handler, None when packet is skipped or has no handler
+        """
+        get_perf_time = time.perf_counter
+
+        start = get_perf_time()
+        is_loaded = packet_data_reader.load(packet_data=memoryview(data))
+        decompress_time = get_perf_time() - start
+
+        if is_loaded:
+            inflated_bytes = len(packet_data_reader.get_not_parsed_data())
+            packet_id = packet_data_reader.extract_packet_id()
+        else:
+            inflated_bytes = 0
+            packet_id = None
+
+        if measurement is None:
+            wire_bytes = len(data)
+        else:
+            wire_bytes = measurement.wire_bytes
+            decompress_time += measurement.inflate_time
+        packet_metrics = self._record_packet_metrics(packet_id, wire_bytes, inflated_bytes,
+                                                     queue_wait_time, decompress_time)
+
+        packet_specific: PacketSpecific = state_packets_specifics.get(packet_id)
+        if packet_specific is None:
+            return None
+
+        start = get_perf_time()
+        packet_specific.read_data(packet_data_reader)
+        read_data_end = get_perf_time()
+        packet_specific.pre_handler(game_=self)
+        pre_handler_end = get_perf_time()
+        default_handler_return = packet_specific.default_handler(game_=self)
+        default_handler_end = get_perf_time()
+        packet_specific.post_handler(game_=self)
+
+        packet_metrics.read_data_time += read_data_end - start
+        packet_metrics.pre_handler_time += pre_handler_end - read_data_end
+        packet_metrics.default_handler_time += default_handler_end - pre_handler_end
+        packet_metrics.post_handler_time += get_perf_time() - default_handler_end
+
+        return default_handler_return
+
+    def _record_packet_metrics(self, packet_id: Union[int, None],
+                               wire_bytes: int,
+                               inflated_bytes: int,
+                               queue_wait_time: float,
+                               decompress_time: float) -> PacketIdMetrics:
+        """Count received packet into metrics of packet_id (None for skipped), return these metrics."""
+        packet_metrics = self.metrics.get(packet_id)
+        packet_metrics.count += 1
+        packet_metrics.wire_bytes += wire_bytes
+        packet_metrics.inflated_bytes += inflated_bytes
+        packet_metrics.queue_wait_time += queue_wait_time
+        packet_metrics.decompress_time += decompress_time
+        return packet_metrics
+
     # TODO: Move into reaction_list. Now only for testing.
     def on_death(self):
         """Define what to do when hero died."""
@@ -0,0 +1,205 @@
+"""
+Chat components (https://wiki.vg/Chat) flattened into text.
+
+Usage:
+    text = decode_chat(raw_json)                    # plain text
+    text = decode_chat(raw_json, is_styled=True)    # text with ANSI colors and styles
+
+Decoded text is cached by raw json, servers repeat the same messages (e.g. join, death, spam).
+"""
+
+import functools
+import json
+import re
+from typing import Union
+
+# Decoded messages kept in cache.
+CACHE_SIZE = 1024
+
+# English texts of the most common translation keys, other keys are shown with their arguments.
+TRANSLATIONS = {
+    "chat.type.text": "<%s> %s",
+    "chat.type.emote": "* %s %s",
+    "chat.type.announcement": "[%s] %s",
+    "chat.type.admin": "[%s: %s]",
+    "chat.type.achievement": "%s has just earned the achievement %s",
+    "chat.type.advancement.task": "%s has made the advancement %s",
+    "chat.type.advancement.goal": "%s has reached the goal %s",
+    "chat.type.advancement.challenge": "%s has completed the challenge %s",
+    "multiplayer.player.joined": "%s joined the game",
+    "multiplayer.player.joined.renamed": "%s (formerly known as %s) joined the game",
+    "multiplayer.player.left": "%s left the game",
+    "multiplayer.disconnect.kicked": "Kicked by an operator",
+    "multiplayer.disconnect.server_shutdown": "Server closed",
+    "multiplayer.disconnect.idling": "You have been idle for too long!",
+    "disconnect.timeout": "Timed out",
+    "death.attack.generic": "%s died",
+    "death.attack.player": "%s was slain by %s",
+    "death.attack.mob": "%s was slain by %s",
+    "death.attack.arrow": "%s was shot by %s",
+    "death.attack.explosion.player": "%s was blown up by %s",
+    "death.attack.lava": "%s tried to swim in lava",
+    "death.attack.inFire": "%s went up in flames",
+    "death.attack.onFire": "%s burned to death",
+    "death.attack.drown": "%s drowned",
+    "death.attack.outOfWorld": "%s fell out of the world",
+    "death.attack.starve": "%s starved to death",
+    "death.fell.accident.generic": "%s fell from a high place",
+}
+
+# ANSI SGR parameters of chat colors and styles.
+ANSI_COLORS = {
+    "black": "30", "dark_blue": "34", "dark_green": "32", "dark_aqua": "36",
+    "dark_red": "31", "dark_purple": "35", "gold": "33", "gray": "37",
+    "dark_gray": "90", "blue": "94", "green": "92", "aqua": "96",
+    "red": "91", "light_purple": "95", "yellow": "93", "white": "97",
+}
+ANSI_STYLES = {"bold": "1", "italic": "3", "underlined": "4", "strikethrough": "9"}
+ANSI_RESET = "\033[0m"
+
+# Legacy formatting codes (§ + code) embedded in text.
+_LEGACY_CODE = re.compile("§([0-9a-fk-or])", re.IGNORECASE)
+_LEGACY_ANSI = dict(zip("0123456789abcdef", ANSI_COLORS.values()))
+_LEGACY_ANSI.update({"l": "1", "o": "3", "n": "4", "m": "9", "k": "", "r": "0"})
+
+_PLACEHOLDER = re.compile(r"%(?:(\d+)\$)?s|%%")
+
+
+def _legacy_to_ansi(match: re.Match) -> str:
+    code = _LEGACY_ANSI[match.group(1).lower()]
+    return f"\033[{code}m" if code else ""
+
+
+def _get_ansi_prefix(style: dict) -> str:
+    """Return escape sequence resetting previous style and setting style."""
+    codes = ["0"]
+    color = ANSI_COLORS.get(style.get("color"))
+    if color is not None:
+        codes.append(color)
+    codes.extend(code for name, code in ANSI_STYLES.items() if style.get(name))
+    return f"\033[{';'.join(codes)}m"
+
+
+def _add_text(parts: [str, ], text: str, style: Union[dict, None]):
+    if not text:
+        return
+    if "§" in text:
+        text = _LEGACY_CODE.sub("" if style is None else _legacy_to_ansi, text)
+    if style is None:
+        parts.append(text)
+    else:
+        parts.append(_get_ansi_prefix(style) + text)
+
+
+def _add_translation(parts: [str, ], key: str, args: list, style: Union[dict, None]):
+    """Substitute %s and %1$s of translated key with flattened args."""
+    template = TRANSLATIONS.get(key)
+    if template is None:
+        _add_text(parts, key, style)
+        for arg in args:
+            _add_text(parts, " ", style)
+            _flatten(arg, parts, style)
+        return
+
+    next_arg_idx = 0
+    end = 0
+    for match in _PLACEHOLDER.finditer(template):
+        _add_text(parts, template[end:match.start()], style)
+        end = match.end()
+        if match.group(0) == "%%":
+            _add_text(parts, "%", style)
+            continue
+
+        if match.group(1) is None:
+            arg_idx = next_arg_idx
+            next_arg_idx += 1
+        else:
+            arg_idx = int(match.group(1)) - 1
+        if arg_idx < len(args):
+            _flatten(args[arg_idx], parts, style)
+    _add_text(parts, template[end:], style)
+
+
+def _flatten(component: Union[dict, list, str], parts: [str, ], parent_style: Union[dict, None]):
+    """
+    Append text of component and its children to parts.
+
+    :param parent_style: inherited color and styles, None when not styled
+    """
+    if isinstance(component, str):
+        _add_text(parts, component, parent_style)
+        return
+    if isinstance(component, list):
+        for child in component:
+            _flatten(child, parts, parent_style)
+        return
+    if not isinstance(component, dict):
+        _add_text(parts, str(component), parent_style)
+        return
+
+    style = parent_style
+    if style is not None:
+        style = dict(parent_style)
+        for name in ("color", *ANSI_STYLES):
+            if name in component:
+                style[name] = component[name]
+
+    if "text" in component:
+        _add_text(parts, str(component["text"]), style)
+    elif "translate" in component:
+        _add_translation(parts, component["translate"], component.get("with", ()), style)
+    elif "score" in component:
+        _add_text(parts, str(component["score"].get("value", "")), style)
+    elif "selector" in component:
+        _add_text(parts, component["selector"], style)
+    elif "keybind" in component:
+        _add_text(parts, component["keybind"], style)
+
+    for child in component.get("extra", ()):
+        _flatten(child, parts, style)
+
+
+def flatten(component: Union[dict, list, str], is_styled: bool = False) -> str:
+    """
+    Return text of chat component.
+
+    :param component: parsed chat json
+    :param is_styled: add ANSI escape sequences of colors and styles
+    """
+    parts = []
+    _flatten(component, parts, {} if is_styled else None)
+    if is_styled and parts:
+        parts.append(ANSI_RESET)
+    return "".join(parts)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _decode_chat(raw: bytes, is_styled: bool) -> str:
+    return flatten(json.loads(raw), is_styled)
+
+
+def decode_chat(raw: Union[bytes, memoryview], is_styled: bool = False) -> str:
+    """
+    Return text of chat component json, see flatten.
+
+    :param raw: chat json, memoryview is copied - key of the cache has to be immutable
+    :param is_styled: add ANSI escape sequences of colors and styles
+    """
+    if raw.__class__ is not bytes:
+        raw = bytes(raw)
+    return _decode_chat(raw, is_styled)
+
+
+def get_cache_stats() -> dict:
+    """Return snapshot of decode_chat cache telemetry."""
+    info = _decode_chat.cache_info()
+    lookups = info.hits + info.misses
+    return {"hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+            "size": info.currsize}
+
+
+def clear_cache():
+    """Clear decode_chat cache and its telemetry."""
+    _decode_chat.cache_clear()
@@ -10,3 +10,7 @@ MIN_DOUBLE = -179769313486231570814527423731704356798070567525844996598917476803
 MAX_DOUBLE = 179769313486231570814527423731704356798070567525844996598917476803157260780028538760589558632766878171540458953514382464234321326889464182768467546703537516986049910576551282076245490090389328944075868508455133942304583236903222948165808559332123348274797826204144723168738177180919299881250404026184124858368.0000000000000000
 MAX_UINT = 0x100000000
 
+# Maximal length of uncompressed packet (data_length) allowed by the protocol.
+MAX_UNCOMPRESSED_PACKET_SIZE = 0x200000
+# Maximal length of packet as sent (length prefix), longer are rejected before buffering.
+MAX_FRAME_SIZE = 0x200000
@@ -3,35 +3,42 @@
 import json
 import struct
 import zlib
+from array import array
 from enum import Enum
 
 from data_structures.position import Position
 from misc.consts import MAX_INT, MAX_UINT
 
+
+def _encode_positive_varint(value: int) -> bytes:
+    varint = []
+    while value > 0x7F:
+        varint.append(value & 0x7F | 0x80)
+        value >>= 7
+    varint.append(value)
+    return bytes(varint)
+
+
+# Values encoded in 1 or 2 bytes: packet ids, lengths, most of the counts.
+SMALL_VARINT_LIMIT = 1 << 14
+_SMALL_VARINTS = tuple(_encode_positive_varint(value) for value in range(SMALL_VARINT_LIMIT))
+
+
 def convert_to_varint(value: int) -> bytes:
     """
     Convert int to VarInt.
 
+    Values from 0 to SMALL_VARINT_LIMIT are taken from precomputed encodings.
+
     :raises ValueError when value not fit into int32
     :returns VarInt in hex bytes
     """
 
     # Ifs always return.
-    if value == 0:
-        return bytes(b'\x00')
+    if 0 <= value < SMALL_VARINT_LIMIT:
+        return _SMALL_VARINTS[value]
     if value > 0:
-        # Modified version of
-        # https://gist.github.com/MarshalX/40861e1d02cbbc6f23acd3eced9db1a0
-
-        varint = bytearray()
-
-        while True:
-            byte = value & 0x7F
-            value >>= 7
-            if value == 0:
-                varint.extend(struct.pack('B', byte))
-                return bytes(varint)
-            varint.extend(struct.pack('B', byte | 0x80))
+        return _encode_positive_varint(value)
 
     # When value is negative
     # Negative varint always has 5 bytes
@@ -289,7 +296,71 @@ def extract_json_from_chat(data: memoryview) -> (dict, memoryview):
     return json.loads(string), data[len(string):]
 
 
-# Not tested.
+def decode_varint(data, offset: int = 0) -> (int, int):
+    """
+    Decode VarInt (up to 5 bytes) as int32 starting at offset.
+
+    :raise ValueError: when VarInt not fit into int32
+    :raise IndexError: when data ends before VarInt
+    :param data: bytes, bytearray or memoryview containing VarInt
+    :param offset: index of the first byte of VarInt
+    :returns value, offset of the first byte after VarInt
+    """
+    byte = data[offset]
+    if byte < 0x80:
+        return byte, offset + 1
+
+    number = byte & 0x7F
+    for shift in (7, 14, 21, 28):
+        offset += 1
+        byte = data[offset]
+        number |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+    else:
+        raise ValueError("VarInt is too big!")
+
+    if number > MAX_INT:
+        number -= MAX_UINT
+    return number, offset + 1
+
+
+def decode_varints(data, offset: int, count: int) -> (array, int):
+    """
+    Decode count consecutive VarInts starting at offset.
+
+    :raise ValueError: when VarInt not fit into int32
+    :raise IndexError: when data ends before the last VarInt
+    :param data: bytes, bytearray or memoryview containing VarInts
+    :param offset: index of the first byte of the first VarInt
+    :param count: number of VarInts
+    :returns array('i') of values, offset of the first byte after the last VarInt
+    """
+    values = array("i", bytes(4 * count))
+    for idx in range(count):
+        byte = data[offset]
+        offset += 1
+        if byte < 0x80:
+            values[idx] = byte
+            continue
+
+        number = byte & 0x7F
+        for shift in (7, 14, 21, 28):
+            byte = data[offset]
+            offset += 1
+            number |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+        else:
+            raise ValueError("VarInt is too big!")
+
+        if number > MAX_INT:
+            number -= MAX_UINT
+        values[idx] = number
+
+    return values, offset
+
+
 def extract_varint_as_int(data: memoryview) -> (int, memoryview):
     """
     Extract varint from uncompressed data and returns it as int.
@@ -301,22 +372,8 @@ def extract_varint_as_int(data: memoryview) -> (int, memoryview):
     :param data: bytes of data containing VarInt
     :returns value, memoryview of leftover bytes
     """
-    assert data
-
-    number = 0
-    for i in range(5):
-        assert len(data) > i - 1
-
-        number |= (data[i] & 0x7F) << 7 * i
-        if not data[i] & 0x80:
-            break
-    else:
-        raise ValueError("VarInt is too big!")
-
-    if number > MAX_INT:
-        number -= MAX_UINT
-
-    return number, data[i + 1:]
+    number, offset = decode_varint(data)
+    return number, data[offset:]
 
 
 def decompress(data: memoryview) -> memoryview:
@@ -0,0 +1,79 @@
+"""Per packet id traffic and timing metrics."""
+
+import json
+import time
+from typing import Union
+
+
+class PacketIdMetrics:
+    """Counters of one packet id. Times are in seconds (time.perf_counter)."""
+
+    __slots__ = ("count", "wire_bytes", "inflated_bytes", "queue_wait_time", "decompress_time",
+                 "read_data_time", "pre_handler_time", "default_handler_time", "post_handler_time")
+
+    def __init__(self):
+        self.count: int = 0
+        # Size of frame as received (compressed), without length prefix.
+        self.wire_bytes: int = 0
+        # Size of packet id + data after decompression.
+        self.inflated_bytes: int = 0
+        # Time in received queue, with inflate stage also time inflated packet waited for the game.
+        self.queue_wait_time: float = 0.0
+        # PacketDataReader.load, with inflate stage time of inflating in the stage.
+        self.decompress_time: float = 0.0
+        # PacketSpecific.read_data.
+        self.read_data_time: float = 0.0
+        # PacketSpecific pre_handler, default_handler and post_handler.
+        self.pre_handler_time: float = 0.0
+        self.default_handler_time: float = 0.0
+        self.post_handler_time: float = 0.0
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class PacketMetrics:
+    """
+    Metrics of received packets, keyed by packet id.
+
+    Packets skipped by packet filter (see PacketDataReader.set_packet_filter)
+    are counted under None, as their id is not known.
+    """
+
+    def __init__(self):
+        self.start_time: float = time.time()
+        self._by_packet_id: {Union[int, None]: PacketIdMetrics} = {}
+
+    def get(self, packet_id: Union[int, None]) -> PacketIdMetrics:
+        """Return (created when needed) metrics of packet_id."""
+        metrics = self._by_packet_id.get(packet_id)
+        if metrics is None:
+            metrics = self._by_packet_id[packet_id] = PacketIdMetrics()
+        return metrics
+
+    def reset(self):
+        """Forget everything measured so far."""
+        self.start_time = time.time()
+        self._by_packet_id = {}
+
+    def snapshot(self) -> dict:
+        """
+        Return copy of metrics, e.g.
+            {"start_time": 1600000000.0, "duration": 12.3,
+             "packets": {"0x1f": {"count": 1, "wire_bytes": 10, ...}, "skipped": {...}}}
+        """
+        by_packet_id = dict(self._by_packet_id)
+        return {"start_time": self.start_time,
+                "duration": time.time() - self.start_time,
+                "packets": {"skipped" if packet_id is None else f"0x{packet_id:02x}": metrics.as_dict()
+                            for packet_id, metrics in sorted(by_packet_id.items(),
+                                                             key=lambda item: -1 if item[0] is None else item[0])}}
+
+    def to_json(self) -> str:
+        """Return snapshot as JSON."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump_json(self, path: str):
+        """Write snapshot as JSON into file."""
+        with open(path, "w") as file:
+            file.write(self.to_json())
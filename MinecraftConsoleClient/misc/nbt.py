@@ -0,0 +1,380 @@
+"""
+Streaming NBT (https://wiki.vg/NBT) decoder working at offset of memoryview, like converters.decode_varint.
+
+read_nbt decodes tag into Python objects, skip_nbt steps over tag without building any.
+With is_lazy=True compounds are LazyCompound and lists of compounds (or lists) are LazyList -
+only offsets of their elements are indexed, values are decoded on the first access.
+
+Types of decoded values:
+    Byte, Short, Int, Long -> int, Float, Double -> float, String -> str,
+    Byte Array -> memoryview (not copied), Int Array -> array('i'), Long Array -> array('q'),
+    List -> list (or LazyList), Compound -> dict (or LazyCompound).
+
+Byte Array, LazyCompound and LazyList reference data, like FieldType.REST they have to be used
+before the packet is released.
+"""
+
+import struct
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Union
+
+TAG_END = 0
+TAG_BYTE = 1
+TAG_SHORT = 2
+TAG_INT = 3
+TAG_LONG = 4
+TAG_FLOAT = 5
+TAG_DOUBLE = 6
+TAG_BYTE_ARRAY = 7
+TAG_STRING = 8
+TAG_LIST = 9
+TAG_COMPOUND = 10
+TAG_INT_ARRAY = 11
+TAG_LONG_ARRAY = 12
+
+# Struct format of tags with fixed size payload.
+_FIXED_FORMATS = {TAG_BYTE: "b", TAG_SHORT: "h", TAG_INT: "i", TAG_LONG: "q", TAG_FLOAT: "f", TAG_DOUBLE: "d"}
+_FIXED_UNPACKERS = {tag_type: struct.Struct(">" + fmt).unpack_from for tag_type, fmt in _FIXED_FORMATS.items()}
+_FIXED_SIZES = {tag_type: struct.calcsize(fmt) for tag_type, fmt in _FIXED_FORMATS.items()}
+# Payload size indexed by tag type, 0 when not fixed.
+_SIZES = tuple(_FIXED_SIZES.get(tag_type, 0) for tag_type in range(TAG_LONG_ARRAY + 1))
+# Minimal payload size indexed by tag type: fixed size, length prefix of arrays, strings and lists,
+# TAG_End of empty compound. TAG_End (no payload) counts as 1, so list length is always bounded by data.
+_MIN_SIZES = (1, 1, 2, 4, 8, 4, 8, 4, 2, 5, 1, 4, 4)
+
+_unpack_unsigned_short = struct.Struct(">H").unpack_from
+_unpack_int = struct.Struct(">i").unpack_from
+# Tag type and name length.
+_unpack_tag_header = struct.Struct(">BH").unpack_from
+# Element tag type and length.
+_unpack_list_header = struct.Struct(">Bi").unpack_from
+
+_IS_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def _decode_string(raw: memoryview) -> str:
+    """Decode Java modified UTF-8: NUL as 2 bytes, supplementary characters as surrogate pairs."""
+    try:
+        return str(raw, "utf-8")
+    except UnicodeDecodeError:
+        return bytes(raw).replace(b'\xc0\x80', b'\x00').decode("utf-8", "surrogatepass") \
+            .encode("utf-16", "surrogatepass").decode("utf-16")
+
+
+def _read_length(data: memoryview, offset: int) -> int:
+    length = _unpack_int(data, offset)[0]
+    if length < 0:
+        raise ValueError(f"Negative NBT length: {length}")
+    return length
+
+
+def _read_list_header(data: memoryview, offset: int) -> (int, int):
+    """
+    Return tag type of elements and length of list at offset.
+
+    Length is checked against not read data before anything is allocated for elements.
+    """
+    tag_type, length = _unpack_list_header(data, offset)
+    if length < 0:
+        raise ValueError(f"Negative NBT length: {length}")
+    min_size = _MIN_SIZES[tag_type] if tag_type <= TAG_LONG_ARRAY else 1
+    if length > (len(data) - offset - 5) // min_size:
+        raise ValueError(f"NBT list length {length} exceeds data")
+    return tag_type, length
+
+
+def _read_string(data: memoryview, offset: int) -> (str, int):
+    end = offset + 2 + _unpack_unsigned_short(data, offset)[0]
+    return _decode_string(data[offset + 2:end]), end
+
+
+def _read_array(data: memoryview, offset: int, typecode: str) -> (array, int):
+    values = array(typecode)
+    start = offset + 4
+    end = start + _read_length(data, offset) * values.itemsize
+    values.frombytes(data[start:end])
+    if _IS_LITTLE_ENDIAN:
+        values.byteswap()
+    return values, end
+
+
+def _read_list(data: memoryview, offset: int, is_lazy: bool, is_end_needed: bool = True) -> (list, int):
+    """Return list at offset, offset after it (None when is_end_needed is False and list is LazyList)."""
+    tag_type, length = _read_list_header(data, offset)
+    offset += 5
+
+    fmt = _FIXED_FORMATS.get(tag_type)
+    if fmt is not None:
+        # All elements with one unpack.
+        values = list(struct.unpack_from(f">{length}{fmt}", data, offset))
+        return values, offset + length * _FIXED_SIZES[tag_type]
+
+    if tag_type == TAG_END:
+        return [], offset
+
+    if is_lazy and (tag_type == TAG_COMPOUND or tag_type == TAG_LIST):
+        values = LazyList(data, offset, tag_type, length)
+        return values, values.end if is_end_needed else None
+
+    values = [None] * length
+    for idx in range(length):
+        values[idx], offset = _read_payload(data, offset, tag_type, is_lazy)
+    return values, offset
+
+
+def _read_compound(data: memoryview, offset: int) -> (dict, int):
+    compound = {}
+    while True:
+        tag_type = data[offset]
+        if tag_type == TAG_END:
+            return compound, offset + 1
+
+        name, offset = _read_string(data, offset + 1)
+        compound[name], offset = _read_payload(data, offset, tag_type, False)
+
+
+def _read_payload(data: memoryview, offset: int, tag_type: int, is_lazy: bool) -> (object, int):
+    """Return payload of tag_type at offset, offset after it."""
+    unpack = _FIXED_UNPACKERS.get(tag_type)
+    if unpack is not None:
+        return unpack(data, offset)[0], offset + _FIXED_SIZES[tag_type]
+
+    if tag_type == TAG_STRING:
+        return _read_string(data, offset)
+    if tag_type == TAG_COMPOUND:
+        if is_lazy:
+            compound = LazyCompound(data, offset)
+            return compound, compound.end
+        return _read_compound(data, offset)
+    if tag_type == TAG_LIST:
+        return _read_list(data, offset, is_lazy)
+    if tag_type == TAG_BYTE_ARRAY:
+        end = offset + 4 + _read_length(data, offset)
+        return data[offset + 4:end], end
+    if tag_type == TAG_INT_ARRAY:
+        return _read_array(data, offset, "i")
+    if tag_type == TAG_LONG_ARRAY:
+        return _read_array(data, offset, "q")
+    raise ValueError(f"Invalid NBT tag type: {tag_type}")
+
+
+def _skip_payload(data: memoryview, offset: int, tag_type: int) -> int:
+    """Return offset after payload of tag_type at offset, without decoding it."""
+    size = _FIXED_SIZES.get(tag_type)
+    if size is not None:
+        return offset + size
+
+    if tag_type == TAG_STRING:
+        return offset + 2 + _unpack_unsigned_short(data, offset)[0]
+    if tag_type == TAG_COMPOUND:
+        # Fixed size and string entries are skipped in place, they are the most common.
+        while data[offset]:
+            tag_type, name_length = _unpack_tag_header(data, offset)
+            offset += 3 + name_length
+            size = _SIZES[tag_type] if tag_type <= TAG_LONG_ARRAY else 0
+            if size:
+                offset += size
+            elif tag_type == TAG_STRING:
+                offset += 2 + _unpack_unsigned_short(data, offset)[0]
+            else:
+                offset = _skip_payload(data, offset, tag_type)
+        return offset + 1
+    if tag_type == TAG_LIST:
+        tag_type, length = _read_list_header(data, offset)
+        offset += 5
+        size = _FIXED_SIZES.get(tag_type)
+        if size is not None:
+            return offset + length * size
+        if tag_type != TAG_END:
+            for _ in range(length):
+                offset = _skip_payload(data, offset, tag_type)
+        return offset
+    if tag_type == TAG_BYTE_ARRAY:
+        return offset + 4 + _read_length(data, offset)
+    if tag_type == TAG_INT_ARRAY:
+        return offset + 4 + _read_length(data, offset) * 4
+    if tag_type == TAG_LONG_ARRAY:
+        return offset + 4 + _read_length(data, offset) * 8
+    raise ValueError(f"Invalid NBT tag type: {tag_type}")
+
+
+def _check_end(data: memoryview, offset: int) -> int:
+    if offset > len(data):
+        raise ValueError("NBT is truncated")
+    return offset
+
+
+def read_nbt(data: memoryview, offset: int = 0, is_lazy: bool = False) -> (object, int):
+    """
+    Decode named tag (root of NBT) at offset, name of the root is omitted.
+
+    Raises ValueError or struct.error when NBT is invalid or truncated.
+
+    :param data: buffer with NBT, e.g. PacketDataReader.data
+    :param offset: offset of the tag type byte
+    :param is_lazy: decode compounds as LazyCompound
+    :returns value (None when there is TAG_End - no NBT), offset after the tag
+    """
+    tag_type = data[offset]
+    if tag_type == TAG_END:
+        return None, offset + 1
+
+    offset += 3 + _unpack_unsigned_short(data, offset + 1)[0]
+    value, offset = _read_payload(data, offset, tag_type, is_lazy)
+    return value, _check_end(data, offset)
+
+
+def skip_nbt(data: memoryview, offset: int = 0) -> int:
+    """
+    Return offset after named tag at offset (see read_nbt), without building Python objects.
+
+    Raises ValueError or struct.error when NBT is invalid or truncated.
+    """
+    tag_type = data[offset]
+    if tag_type == TAG_END:
+        return offset + 1
+
+    offset += 3 + _unpack_unsigned_short(data, offset + 1)[0]
+    return _check_end(data, _skip_payload(data, offset, tag_type))
+
+
+class LazyCompound(Mapping):
+    """
+    Compound which indexes offsets of its entries, entry is decoded on the first access.
+
+    Nested compounds are LazyCompound too. Holds data, see module docstring.
+    """
+
+    __slots__ = ("_data", "_entries", "_values", "end")
+
+    def __init__(self, data: memoryview, offset: int):
+        """
+        :param data: buffer with NBT
+        :param offset: offset of the first entry of compound payload
+        """
+        self._data: memoryview = data
+        # name: (tag type, offset of payload)
+        self._entries: {str: (int, int)} = {}
+        self._values: dict = {}
+
+        entries = self._entries
+        while True:
+            tag_type = data[offset]
+            if tag_type == TAG_END:
+                break
+            name, offset = _read_string(data, offset + 1)
+            entries[name] = (tag_type, offset)
+            offset = _skip_payload(data, offset, tag_type)
+
+        # Offset after the compound.
+        self.end: int = _check_end(data, offset + 1)
+
+    def __getitem__(self, name: str):
+        try:
+            return self._values[name]
+        except KeyError:
+            pass
+
+        tag_type, offset = self._entries[name]
+        if tag_type == TAG_LIST:
+            # End of the list is known from the scan, elements are indexed on access.
+            value = _read_list(self._data, offset, True, False)[0]
+        else:
+            value = _read_payload(self._data, offset, tag_type, True)[0]
+        self._values[name] = value
+        return value
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_tag_type(self, name: str) -> int:
+        """Return tag type of entry without decoding it."""
+        return self._entries[name][0]
+
+    def to_dict(self) -> dict:
+        """Return compound decoded like read_nbt without is_lazy."""
+        return {name: _to_plain(self[name]) for name in self._entries}
+
+    def __repr__(self):
+        return f"LazyCompound({list(self._entries)})"
+
+
+class LazyList(Sequence):
+    """
+    List of compounds or lists, element is decoded on the first access.
+
+    Offsets of elements are indexed on demand, up to the accessed one.
+    """
+
+    __slots__ = ("_data", "_tag_type", "_length", "_offsets", "_values")
+
+    def __init__(self, data: memoryview, offset: int, tag_type: int, length: int):
+        """
+        :param data: buffer with NBT
+        :param offset: offset of the first element
+        :param tag_type: tag type of elements
+        :param length: number of elements
+        """
+        self._data: memoryview = data
+        self._tag_type: int = tag_type
+        self._length: int = length
+        # Offsets of indexed elements, and offset after the last indexed element.
+        self._offsets: [int, ] = [offset]
+        # None when not decoded yet.
+        self._values: list = [None] * length
+
+    def _get_offset(self, idx: int) -> int:
+        """Return offset of element idx (or offset after the list when idx == len)."""
+        offsets = self._offsets
+        if idx >= len(offsets):
+            data, tag_type = self._data, self._tag_type
+            offset = offsets[-1]
+            for _ in range(idx - len(offsets) + 1):
+                offset = _skip_payload(data, offset, tag_type)
+                offsets.append(offset)
+        return offsets[idx]
+
+    @property
+    def end(self) -> int:
+        """Offset after the list."""
+        return _check_end(self._data, self._get_offset(self._length))
+
+    def __getitem__(self, idx: Union[int, slice]):
+        if isinstance(idx, slice):
+            return [self[element_idx] for element_idx in range(*idx.indices(self._length))]
+
+        value = self._values[idx]
+        if value is None:
+            if idx < 0:
+                idx += self._length
+            value = _read_payload(self._data, self._get_offset(idx), self._tag_type, True)[0]
+            self._values[idx] = value
+        return value
+
+    def __len__(self) -> int:
+        return self._length
+
+    def to_list(self) -> list:
+        """Return list decoded like read_nbt without is_lazy."""
+        return [_to_plain(element) for element in self]
+
+    def __repr__(self):
+        return f"LazyList({self._length} elements)"
+
+
+def _to_plain(value: Union[LazyCompound, LazyList, list, object]):
+    if isinstance(value, LazyCompound):
+        return value.to_dict()
+    if isinstance(value, LazyList):
+        return value.to_list()
+    if isinstance(value, list):
+        return [_to_plain(element) for element in value]
+    return value
@@ -0,0 +1,131 @@
+"""
+Recording of raw packets into append-only binary file, and its mmap based reader.
+
+File format:
+    CAPTURE_MAGIC,
+    records: RECORD_HEADER(timestamp: double, direction: byte, length: uint32) + frame.
+
+Received (IN) frames are stored as received - without length prefix,
+not decompressed. Sent (OUT) frames are stored as payloads -
+b'VarInt(Packet ID)' + b'Data', before compression.
+"""
+
+import enum
+import mmap
+import struct
+import threading
+import time
+from contextlib import suppress
+
+CAPTURE_MAGIC = b"MCCCAP\x00\x01"
+RECORD_HEADER = struct.Struct("<dBI")
+
+
+class Direction(enum.IntEnum):
+    """Direction of the captured frame."""
+
+    IN = 0
+    OUT = 1
+
+
+class CaptureWriter:
+    """
+    Append frames with timestamp and direction to the capture file.
+
+    Thread-safe, listener and sender write into the same file.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 1 << 20):
+        """
+        Open (create) capture file for appending.
+
+        :param path: path to the capture file
+        :param buffer_size: size of the write buffer
+        """
+        self._file = open(path, "ab", buffering=buffer_size)
+        self._lock: threading.Lock = threading.Lock()
+
+        if self._file.tell() == 0:
+            self._file.write(CAPTURE_MAGIC)
+
+    def write(self, direction: Direction, frame: bytes):
+        """Append one frame."""
+        self.write_frames(direction, (frame,))
+
+    def write_frames(self, direction: Direction, frames: [bytes, ]):
+        """Append frames with the same timestamp."""
+        timestamp = time.time()
+        pack_header = RECORD_HEADER.pack
+        with self._lock:
+            if self._file.closed:
+                return  # Capture has been stopped.
+            write = self._file.write
+            for frame in frames:
+                write(pack_header(timestamp, direction, len(frame)))
+                write(frame)
+
+    def close(self):
+        """Flush and close capture file."""
+        with self._lock:
+            self._file.close()
+
+
+class CaptureReader:
+    """
+    Read capture file through mmap, frames are memoryviews - without copying.
+
+    Frames are valid until close(), e.g. usage:
+        with CaptureReader(path) as capture:
+            for timestamp, direction, frame in capture:
+                ...
+    """
+
+    def __init__(self, path: str):
+        """
+        Map capture file into memory.
+
+        Raises ValueError when file is not a capture file.
+
+        :param path: path to the capture file
+        """
+        with open(path, "rb") as file:
+            self._mmap: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view: memoryview = memoryview(self._mmap)
+
+        if self._view[:len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+            self.close()
+            raise ValueError("Not a capture file.")
+
+    def __iter__(self):
+        """Yield (timestamp, direction, frame) of every complete record."""
+        view = self._view
+        unpack_header = RECORD_HEADER.unpack_from
+        header_size = RECORD_HEADER.size
+        end = len(view)
+
+        pos = len(CAPTURE_MAGIC)
+        while pos + header_size <= end:
+            timestamp, direction, length = unpack_header(view, pos)
+            pos += header_size
+            if pos + length > end:
+                break  # Truncated record - capture has been interrupted.
+            yield timestamp, Direction(direction), view[pos:pos + length]
+            pos += length
+
+    def frames(self, direction: Direction = Direction.IN):
+        """Yield frames of given direction."""
+        for _, frame_direction, frame in self:
+            if frame_direction == direction:
+                yield frame
+
+    def close(self):
+        """Unmap file. When frames are still referenced, mmap is closed when they are released."""
+        self._view.release()
+        with suppress(BufferError):
+            self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
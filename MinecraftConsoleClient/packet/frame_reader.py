@@ -0,0 +1,190 @@
+"""Splitter of the byte stream received from the server into packets."""
+
+from typing import Union
+
+from misc.consts import MAX_FRAME_SIZE
+
+# Initial size of the receive buffer. Grows when packet does not fit.
+DEFAULT_BUFFER_SIZE = 1 << 17  # 128 KiB
+
+
+def peek_packet_id(frame: bytes, is_compression_enabled: bool) -> Union[int, None]:
+    """
+    Return packet id of frame when readable without inflating.
+
+    With compression enabled only packets sent uncompressed (data_length == 0)
+    have readable packet id.
+
+    :param frame: packet without length prefix, as returned by FrameReader
+    :param is_compression_enabled: whether frame starts with data_length
+    :returns packet id, None when packet is compressed or frame is invalid
+    """
+    pos = 0
+    if is_compression_enabled:
+        if frame[0]:
+            return None  # data_length != 0 -> compressed.
+        pos = 1
+
+    # Inlined VarInt decoding - packet id.
+    packet_id = 0
+    for shift in (0, 7, 14, 21, 28):
+        if pos == len(frame):
+            return None
+        byte = frame[pos]
+        pos += 1
+        packet_id |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return packet_id
+    return None
+
+
+class FrameReader:
+    """
+    Buffered reader that splits stream of bytes into packets (frames).
+
+    Every frame sent by the server is prefixed with its length as VarInt.
+    Instead of reading the length byte by byte, reader fills one large,
+    reusable buffer and frames as many complete packets as it holds.
+
+    Can be fed in two ways:
+        read_frames() - calls recv_into once per buffer fill,
+        get_buffer() + buffer_updated() - fits asyncio.BufferedProtocol.
+
+    Returned frames do not contain length prefix and ARE NOT DECOMPRESSED.
+    """
+
+    # Return frames as bytes copied out of the buffer, otherwise as memoryviews into it.
+    _copy_frames: bool = True
+
+    def __init__(self, recv_into: callable = None,
+                 buffer_size: int = DEFAULT_BUFFER_SIZE):
+        """
+        Create FrameReader.
+
+        :param recv_into: function like socket.recv_into, required by read_frames()
+        :param buffer_size: initial size of the receive buffer
+        """
+        self._recv_into: callable = recv_into
+
+        self._buffer: bytearray = bytearray(buffer_size)
+        self._view: memoryview = memoryview(self._buffer)
+
+        # Begin of not yet framed data.
+        self._start: int = 0
+        # End of received data.
+        self._end: int = 0
+        # Size (with length prefix) of incomplete frame at _start, 0 if unknown.
+        self._pending_frame_size: int = 0
+
+    def read_frames(self) -> [bytes, ]:
+        """
+        Receive data once and return all complete frames.
+
+        On error raises standard socket exceptions.
+        Raises ValueError when received invalid length of the packet.
+
+        :returns list of frames (may be empty), None when connection has been closed
+        """
+        received = self._recv_into(self.get_buffer())
+        if not received:
+            return None
+        return self.buffer_updated(received)
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """
+        Return free space of the buffer to receive into.
+
+        Moves not framed data to the beginning of the buffer,
+        or grows the buffer when incomplete frame would not fit.
+
+        :param sizehint: unused, exists to match asyncio.BufferedProtocol
+        :returns writable memoryview
+        """
+        capacity = len(self._buffer)
+        start = self._start
+        required = max(self._pending_frame_size, self._end - start + 1)
+
+        if required > capacity:
+            self._grow(required)
+        elif start and (self._end == capacity or start + required > capacity):
+            pending = self._end - start
+            self._buffer[:pending] = bytes(self._view[start:self._end])
+            self._start, self._end = 0, pending
+
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> [bytes, ]:
+        """
+        Mark nbytes of buffer as received and frame complete packets.
+
+        Raises ValueError when received invalid length of the packet
+        (longer than misc.consts.MAX_FRAME_SIZE too).
+
+        :param nbytes: number of bytes written into get_buffer()
+        :returns list of frames (may be empty)
+        """
+        self._end += nbytes
+
+        buffer = self._buffer
+        view = self._view
+        start = self._start
+        end = self._end
+        frames = []
+        append = frames.append
+        copy_frames = self._copy_frames
+
+        while start < end:
+            # Inlined VarInt decoding - packet length.
+            packet_length = 0
+            pos = start
+            for shift in (0, 7, 14, 21, 28):
+                if pos == end:
+                    break  # Length prefix is incomplete.
+                byte = buffer[pos]
+                pos += 1
+                packet_length |= (byte & 0x7F) << shift
+                if not byte & 0x80:
+                    break
+            else:
+                raise ValueError("VarInt is too big!")
+
+            if pos == end and byte & 0x80:
+                self._pending_frame_size = 0
+                break
+
+            if packet_length > MAX_FRAME_SIZE:
+                # Buffer would grow to fit it.
+                raise ValueError(f"Packet length {packet_length} is bigger than {MAX_FRAME_SIZE}!")
+            if packet_length == 0:
+                raise ValueError("Received packet of zero length.")
+
+            frame_end = pos + packet_length
+            if frame_end > end:
+                self._pending_frame_size = frame_end - start
+                break
+
+            append(bytes(view[pos:frame_end]) if copy_frames else view[pos:frame_end])
+            start = frame_end
+        else:
+            self._pending_frame_size = 0
+
+        if start == end:
+            self._start = self._end = 0
+        else:
+            self._start = start
+
+        return frames
+
+    def _grow(self, required: int):
+        """Replace buffer with bigger one (power of 2) keeping not framed data."""
+        size = len(self._buffer)
+        while size < required:
+            size <<= 1
+
+        pending = self._end - self._start
+        buffer = bytearray(size)
+        buffer[:pending] = self._view[self._start:self._end]
+
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._start, self._end = 0, pending
@@ -0,0 +1,245 @@
+"""Decompression stage between Connection listener and Game loop."""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from misc.exceptions import InvalidUncompressedPacketError
+from packet.packet_data_reader import PacketDataReader, SkipStats
+
+logger = logging.getLogger('mainLogger')
+
+# Compressed packets bigger than this (bytes) are inflated in the thread pool.
+DEFAULT_SIZE_CUTOFF = 1024
+
+
+class InflateMeasurement:
+    """Metrics of one packet passed by InflateStage, times are in seconds (time.perf_counter)."""
+
+    __slots__ = ("wire_bytes", "received_wait_time", "inflate_time", "ready_time")
+
+    def __init__(self, wire_bytes: int, received_wait_time: float):
+        # Size of frame as received (compressed).
+        self.wire_bytes: int = wire_bytes
+        # Time packet waited in received queue (ReceiveQueue.last_wait_time).
+        self.received_wait_time: float = received_wait_time
+        self.inflate_time: float = 0.0
+        # When inflated packet was ready for the game.
+        self.ready_time: float = 0.0
+
+    def get_queue_wait_time(self, get_time: float) -> float:
+        """
+        Return time packet waited in received queue and then, inflated, for the game.
+
+        :param get_time: when game got packet from inflated queue, call after packet is inflated
+        """
+        return self.received_wait_time + max(0.0, get_time - self.ready_time)
+
+
+class InflateStage:
+    """
+    Thread that decompresses received packets before they reach the game loop.
+
+    zlib releases the GIL, so packets bigger than size_cutoff (e.g. ChunkData)
+    are inflated in a thread pool, in parallel with each other and with the game.
+    Smaller packets are inflated right away by the stage thread,
+    so they never wait in the pool queue behind big inflates.
+
+    Order of packets is kept. Items put into inflated queue:
+        memoryview of uncompressed packet (packet id + data),
+        Future returning such memoryview (big packets),
+        None when connection has ended.
+    Packets skipped by packet_filter are not put at all,
+    Future of skipped packet returns None.
+    Future.result() raises InvalidUncompressedPacketError like PacketDataReader.load.
+
+    With collect_metrics every packet is put as tuple (item, InflateMeasurement),
+    skipped packets too, as (None, InflateMeasurement).
+    """
+
+    def __init__(self, received: queue.Queue,
+                 workers: int = 2,
+                 size_cutoff: int = DEFAULT_SIZE_CUTOFF,
+                 packet_filter: frozenset = None,
+                 skip_stats: SkipStats = None,
+                 max_inflated: int = 0,
+                 release_frame: callable = None,
+                 collect_metrics: bool = False):
+        """
+        Create InflateStage.
+
+        :param received: queue with compressed packets (filled by Connection listener)
+        :param workers: number of threads inflating big packets
+        :param size_cutoff: packets bigger than that are inflated in the thread pool
+        :param packet_filter: ids of packets to pass, see PacketDataReader.set_packet_filter
+        :param skip_stats: where to count skipped packets, see SkipStats.merged
+        :param max_inflated: maxsize of inflated queue, stage waits when full (backpressure)
+        :param release_frame: called with every received packet after inflating, see Connection.release_frame
+        :param collect_metrics: put packets with InflateMeasurement,
+            received queue should be ReceiveQueue to measure time packets waited in it
+        """
+        self.inflated: queue.Queue = queue.Queue(max_inflated)
+
+        self._received: queue.Queue = received
+        self._workers: int = workers
+        self._size_cutoff: int = size_cutoff
+        self._compression_threshold: int = -1
+        self._packet_filter: frozenset = packet_filter
+        self._skip_stats: SkipStats = skip_stats
+        self._release_frame: callable = release_frame
+        self._collect_metrics: bool = collect_metrics
+
+        self._local: threading.local = threading.local()
+        self._thread: threading.Thread = None
+        self._is_stopped: bool = False
+
+    def start(self, compression_threshold: int) -> bool:
+        """
+        Start thread-daemon moving packets from received to inflated queue.
+
+        :param compression_threshold: compression threshold of the connection
+        :returns started successfully
+        """
+        if self._thread is not None and self._thread.is_alive():
+            logger.error("Inflate stage already started")
+            return False
+
+        self._compression_threshold = compression_threshold
+        self._is_stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread.is_alive()
+
+    def stop(self, timeout: float = 5.0) -> bool:
+        """
+        Stop thread and its pool, also when game loop has exited and no longer gets inflated packets.
+
+        Not got packets are dropped, inflates not started yet are cancelled.
+
+        :param timeout: how long to wait for the thread (seconds)
+        :returns thread has exited
+        """
+        thread = self._thread
+        if thread is None:
+            return True
+
+        self._is_stopped = True
+        # Wakes thread waiting for received packet, even when listener is still running.
+        self._received.put(None)
+
+        deadline = time.perf_counter() + timeout
+        while True:
+            # Thread may wait for free space in full inflated queue.
+            self._drop_inflated()
+            thread.join(0.01)
+            if not thread.is_alive():
+                break
+            if time.perf_counter() > deadline:
+                logger.error("Inflate stage has not exited in %.1fs", timeout)
+                return False
+        self._drop_inflated()
+        return True
+
+    def _drop_inflated(self):
+        """Drop packets of inflated queue, cancel their inflates."""
+        get_inflated = self.inflated.get_nowait
+        while True:
+            try:
+                item = get_inflated()
+            except queue.Empty:
+                return
+            if item.__class__ is tuple:
+                item = item[0]
+            if item.__class__ is Future:
+                item.cancel()
+
+    def _inflate(self, data: bytes) -> memoryview:
+        """
+        Return uncompressed packet or None when skipped, uses reader specific to the thread.
+
+        Every error of invalid packet (e.g. broken VarInt) is raised as InvalidUncompressedPacketError,
+        which game loop handles like for PacketDataReader.load.
+        """
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            reader = self._local.reader = PacketDataReader()
+            reader.set_compression_threshold(self._compression_threshold)
+            # Workers count into their own parts of skip_stats, not locked.
+            skip_stats = self._skip_stats.create_part() if self._skip_stats is not None else None
+            reader.set_packet_filter(self._packet_filter, skip_stats)
+
+        release_frame = self._release_frame
+        try:
+            if not reader.load(packet_data=memoryview(data)):
+                return None
+            inflated = reader.get_not_parsed_data()
+            if release_frame is not None and inflated.obj is getattr(data, "obj", data):
+                # Not compressed packet, points into received packet.
+                inflated = memoryview(bytes(inflated))
+            return inflated
+        except InvalidUncompressedPacketError:
+            raise
+        except Exception as err:
+            raise InvalidUncompressedPacketError(f"Can not inflate packet: {err!r}") from err
+        finally:
+            if release_frame is not None:
+                release_frame(data)
+
+    def _inflate_measured(self, data: bytes, measurement: InflateMeasurement) -> memoryview:
+        """Return uncompressed packet or None when skipped, set inflate_time and ready_time of measurement."""
+        start = time.perf_counter()
+        try:
+            return self._inflate(data)
+        finally:
+            measurement.ready_time = time.perf_counter()
+            measurement.inflate_time = measurement.ready_time - start
+
+    @staticmethod
+    def _inflate_or_fail(inflate: callable, *args):
+        """Return result of inflate or Future holding raised exception."""
+        try:
+            return inflate(*args)
+        except Exception as err:
+            failed = Future()
+            failed.set_exception(err)
+            return failed
+
+    def _run(self):
+        """Inflate packets until get None (end of connection) or stopped."""
+        get_received = self._received.get
+        put_inflated = self.inflated.put
+        size_cutoff = self._size_cutoff
+        inflate = self._inflate
+        inflate_measured = self._inflate_measured
+        inflate_or_fail = self._inflate_or_fail
+        collect_metrics = self._collect_metrics
+        received = self._received
+
+        with ThreadPoolExecutor(max_workers=self._workers,
+                                thread_name_prefix="inflate") as pool:
+            submit = pool.submit
+            while True:
+                data = get_received()
+
+                if not data or self._is_stopped:
+                    put_inflated(None)
+                    break
+
+                if collect_metrics:
+                    measurement = InflateMeasurement(len(data), getattr(received, "last_wait_time", 0.0))
+                    if len(data) > size_cutoff:
+                        put_inflated((submit(inflate_measured, data, measurement), measurement))
+                    else:
+                        put_inflated((inflate_or_fail(inflate_measured, data, measurement), measurement))
+                    continue
+
+                if len(data) > size_cutoff:
+                    put_inflated(submit(inflate, data))
+                else:
+                    inflated = inflate_or_fail(inflate, data)
+                    if inflated is not None:
+                        put_inflated(inflated)
+
+        logger.info("Exiting inflate stage")
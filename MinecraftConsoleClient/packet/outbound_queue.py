@@ -0,0 +1,205 @@
+"""Outbound packets scheduler - packets of higher priority are sent first."""
+
+import enum
+import functools
+import queue
+from collections import Counter, deque
+
+
+class PacketPriority(enum.IntEnum):
+    """Outbound class of the packet, lower value is sent first."""
+
+    # Keep-alive, teleport confirms - server kicks when they are late.
+    CONTROL = 0
+    DEFAULT = 1
+    # Steps of the move manager, there may be a lot of them queued.
+    MOVEMENT = 2
+
+
+class CoalesceKey:
+    """
+    Keys of outbound packets superseding previously queued ones.
+
+    Only the newest queued packet with given key is sent.
+    """
+
+    OWN_POSITION = "own_position"
+    OWN_LOOK = "own_look"
+    OWN_POSITION_AND_LOOK = "own_position_and_look"
+
+    # Packets made stale by the server setting hero position and look.
+    OWN_MOVEMENT = (OWN_POSITION, OWN_LOOK, OWN_POSITION_AND_LOOK)
+
+
+class OutboundPacket(bytes):
+    """
+    Payload (b'VarInt(Packet ID)' + b'Data') carrying its outbound class
+    and coalescing key (see CoalesceKey).
+
+    Plain bytes are treated as PacketPriority.DEFAULT without coalescing key.
+
+    Framed packets (see packet.packet_template) already have length prefix
+    and compression header for compression_threshold, payload starts at payload_offset.
+    """
+
+    __slots__ = ()
+    priority: PacketPriority = PacketPriority.DEFAULT
+    coalesce_key: str = None
+    is_framed: bool = False
+    compression_threshold: int = None
+    payload_offset: int = 0
+
+
+@functools.lru_cache(maxsize=None)
+def _get_packet_class(priority: PacketPriority, coalesce_key: str) -> type:
+    """Return OutboundPacket subclass with given priority and coalescing key."""
+    return type(f"{priority.name.capitalize()}Packet", (OutboundPacket,),
+                {"__slots__": (), "priority": priority, "coalesce_key": coalesce_key})
+
+
+def outbound_packet(priority: PacketPriority, coalesce_key: str = None):
+    """
+    Decorate packet creator to set outbound class of created packets.
+
+    :param priority: outbound class of packets created by decorated function
+    :param coalesce_key: created packet supersedes queued packet with the same key
+    """
+    packet_class = _get_packet_class(priority, coalesce_key)
+
+    def decorator(create_packet: callable) -> callable:
+        @functools.wraps(create_packet)
+        def wrapper(*args, **kwargs) -> OutboundPacket:
+            return packet_class(create_packet(*args, **kwargs))
+
+        wrapper.priority = priority
+        wrapper.coalesce_key = coalesce_key
+        wrapper.packet_class = packet_class
+        return wrapper
+
+    return decorator
+
+
+class PriorityDeque:
+    """
+    FIFO per outbound class, popleft returns the oldest packet of the highest class.
+
+    Packet with coalesce_key drops queued packet with the same key and is queued
+    at the end, so it is never sent before packets queued in the meantime.
+    Dropped packets are counted per key in coalesced.
+
+    Has deque interface used by queue.Queue and asyncio.Queue,
+    so it can replace their internal deque.
+    """
+
+    def __init__(self):
+        self._deques: (deque, ) = tuple(deque() for _ in PacketPriority)
+        self._size: int = 0
+
+        # Coalescing key -> [packet] queued in _deques, [None] once superseded.
+        self._keyed: {str: list} = {}
+        self.coalesced: Counter = Counter()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        for packets in self._deques:
+            for packet in packets:
+                if packet.__class__ is list:
+                    packet = packet[0]
+                    if packet is None:
+                        continue
+                yield packet
+
+    def append(self, packet: bytes) -> bool:
+        """
+        Queue packet.
+
+        :returns False when packet superseded queued one (size has not changed)
+        """
+        priority = getattr(packet, "priority", PacketPriority.DEFAULT)
+        coalesce_key = getattr(packet, "coalesce_key", None)
+        if coalesce_key is None:
+            self._deques[priority].append(packet)
+            self._size += 1
+            return True
+
+        holder = [packet]
+        self._deques[priority].append(holder)
+        superseded = self._keyed.get(coalesce_key)
+        self._keyed[coalesce_key] = holder
+
+        if superseded is None:
+            self._size += 1
+            return True
+
+        superseded[0] = None
+        self.coalesced[coalesce_key] += 1
+        return False
+
+    def popleft(self) -> bytes:
+        for packets in self._deques:
+            while packets:
+                packet = packets.popleft()
+                if packet.__class__ is list:
+                    packet = packet[0]
+                    if packet is None:
+                        continue  # Superseded.
+                    del self._keyed[packet.coalesce_key]
+                self._size -= 1
+                return packet
+        raise IndexError("pop from an empty PriorityDeque")
+
+    def discard(self, *coalesce_keys: str) -> int:
+        """
+        Drop queued packets with any of given coalescing keys.
+
+        :returns number of dropped packets
+        """
+        discarded = 0
+        for coalesce_key in coalesce_keys:
+            holder = self._keyed.pop(coalesce_key, None)
+            if holder is not None:
+                # Holder stays in _deques, popleft skips it.
+                holder[0] = None
+                discarded += 1
+        self._size -= discarded
+        return discarded
+
+
+class OutboundQueue(queue.Queue):
+    """
+    queue.Queue with strict priority of outbound classes (see PacketPriority).
+
+    Packets of the same class keep their order,
+    only the newest packet per coalescing key is kept (see PriorityDeque).
+    """
+
+    def _init(self, maxsize: int):
+        self.queue = PriorityDeque()
+
+    def _put(self, packet: bytes):
+        if not self.queue.append(packet):
+            # Superseded packet will never be got, do not wait for its task_done.
+            self.unfinished_tasks -= 1
+
+    def discard(self, *coalesce_keys: str) -> int:
+        """
+        Drop queued packets with any of given coalescing keys (see PriorityDeque.discard).
+
+        :returns number of dropped packets
+        """
+        with self.mutex:
+            discarded = self.queue.discard(*coalesce_keys)
+            if discarded:
+                # Dropped packets will never be got, do not wait for their task_done.
+                self.unfinished_tasks -= discarded
+                if not self.unfinished_tasks:
+                    self.all_tasks_done.notify_all()
+                self.not_full.notify(discarded)
+        return discarded
+
+    @property
+    def coalesced(self) -> Counter:
+        """Return number of packets dropped per coalescing key."""
+        return self.queue.coalesced
@@ -1,7 +1,88 @@
+import json
+import struct
+import threading
+import time
 import zlib
+from array import array
+from typing import Union
 
-from misc.converters import TypeToExtractFunction
+from data_structures.position import Position
+from misc.chat import decode_chat
+from misc.consts import MAX_UNCOMPRESSED_PACKET_SIZE
+from misc.converters import TypeToExtractFunction, decode_varint, decode_varints, extract_varint_as_int
 from misc.exceptions import InvalidUncompressedPacketError
+from misc.nbt import LazyCompound, read_nbt, skip_nbt
+
+_unpack_byte = struct.Struct(">b").unpack_from
+_unpack_short = struct.Struct(">h").unpack_from
+_unpack_unsigned_short = struct.Struct(">H").unpack_from
+_unpack_int = struct.Struct(">i").unpack_from
+_unpack_long = struct.Struct(">q").unpack_from
+_unpack_unsigned_long = struct.Struct(">Q").unpack_from
+_unpack_float = struct.Struct(">f").unpack_from
+_unpack_double = struct.Struct(">d").unpack_from
+
+
+class SkipStats:
+    """
+    Counters of packets skipped by PacketDataReader packet filter.
+
+    Counters are not locked, so readers in other threads count into their own part
+    (see create_part), merged() sums counters of all parts.
+
+    Time is measured in seconds (time.perf_counter).
+    """
+
+    _COUNTERS = ("skipped_packets", "skipped_compressed_bytes", "skipped_inflated_bytes",
+                 "peek_time", "inflated_bytes", "inflate_time")
+
+    def __init__(self):
+        self.skipped_packets: int = 0
+        # Compressed bytes thrown away without inflating.
+        self.skipped_compressed_bytes: int = 0
+        # Declared data_length of packets skipped without inflating.
+        self.skipped_inflated_bytes: int = 0
+        # Time spent peeking packet ids of compressed packets.
+        self.peek_time: float = 0.0
+        # Packets fully inflated while filter was enabled, base for estimations.
+        self.inflated_bytes: int = 0
+        self.inflate_time: float = 0.0
+
+        self._parts: [SkipStats, ] = []
+        self._parts_lock: threading.Lock = threading.Lock()
+
+    def create_part(self) -> "SkipStats":
+        """Return new stats for reader in another thread, counted by merged()."""
+        part = SkipStats()
+        with self._parts_lock:
+            self._parts.append(part)
+        return part
+
+    def merged(self) -> "SkipStats":
+        """Return new stats with counters of this stats and all its parts summed."""
+        with self._parts_lock:
+            parts = [part.merged() for part in self._parts]
+
+        total = SkipStats()
+        for stats in (self, *parts):
+            for name in self._COUNTERS:
+                setattr(total, name, getattr(total, name) + getattr(stats, name))
+        return total
+
+    @property
+    def estimated_time_saved(self) -> float:
+        """Return time which inflating skipped packets would take, minus peeking time (without parts)."""
+        if not self.inflated_bytes:
+            return 0.0
+        inflate_time_per_byte = self.inflate_time / self.inflated_bytes
+        return self.skipped_inflated_bytes * inflate_time_per_byte - self.peek_time
+
+    def __repr__(self):
+        stats = self.merged()
+        return (f"skipped packets: {stats.skipped_packets}, "
+                f"skipped bytes: {stats.skipped_compressed_bytes} compressed "
+                f"({stats.skipped_inflated_bytes} inflated), "
+                f"estimated time saved: {stats.estimated_time_saved:.6f}s")
 
 
 class PacketDataReader:
@@ -9,42 +90,292 @@ class PacketDataReader:
 
     is_compression_enabled: bool
     data: memoryview - raw [uncompressed] packet data received from server
+    pos: int - offset of the first not read byte of data
+    max_packet_size: int - packets declaring bigger data_length are rejected
+
+    read_* methods return value at pos and move pos after it,
+    instead of reslicing data like misc.converters extract_* functions.
     """
+
+    max_packet_size: int = MAX_UNCOMPRESSED_PACKET_SIZE
+    # Compressed packets with smaller data_length are inflated whole instead of peeked,
+    # because peeking costs about as much as inflating small packet.
+    peek_min_data_length: int = 1024
+
     def __init__(self):
         self._compression_threshold: int = -1
         self._is_compression_enabled: bool = False
         self.data: memoryview = memoryview(b"-1")
+        self.pos: int = 0
+        # Not used decompressor, copied for every compressed packet (zlib objects can not be reset).
+        self._decompressor = zlib.decompressobj()
+
+        self._packet_filter: Union[frozenset, None] = None
+        self.skip_stats: SkipStats = SkipStats()
+
+    def set_packet_filter(self, packet_ids: Union[frozenset, None],
+                          skip_stats: SkipStats = None):
+        """
+        Make load() skip packets with id not in packet_ids.
+
+        Compressed packets are inflated only as far as needed to read
+        the packet id, the rest of not wanted packet is not inflated at all.
+
+        :param packet_ids: ids of packets to load, None disables filter
+        :param skip_stats: where to count skipped packets, readers in different threads
+            need different stats (see SkipStats.create_part)
+        """
+        self._packet_filter = packet_ids
+        if skip_stats is not None:
+            self.skip_stats = skip_stats
 
     def set_compression_threshold(self, compression_threshold: int):
         self._compression_threshold = compression_threshold
         self._is_compression_enabled = not (compression_threshold < 0)
 
-    def load(self, packet_data: memoryview):
-        """ Load raw data to reader. """
+    def load(self, packet_data: memoryview) -> bool:
+        """
+        Load raw data to reader.
 
+        :returns False when packet has been skipped by packet filter, otherwise True
+        """
         self.data = packet_data
+        self.pos = 0
         if self._is_compression_enabled:
-            self._decompress()
+            return self._decompress()
+
+        if self._packet_filter is not None:
+            return self._is_wanted()
+        return True
 
     def get_not_parsed_data(self) -> memoryview:
-        return self.data
+        return self.data[self.pos:]
 
-    def _decompress(self):
-        data_length = self.extract(TypeToExtractFunction.VARINT_AS_INT)
+    def _is_wanted(self) -> bool:
+        """Return whether packet passes filter, count skipped one. Does not move pos."""
+        pos = self.pos
+        packet_id = self.read_varint()
+        self.pos = pos
+        if packet_id in self._packet_filter:
+            return True
+        self.skip_stats.skipped_packets += 1
+        return False
+
+    def _decompress(self) -> bool:
+        """
+        Inflate packet straight from the received memoryview.
+
+        Output is allocated once - sized from declared data_length,
+        which has to fit into [compression_threshold, max_packet_size].
+
+        :returns False when packet has been skipped by packet filter, otherwise True
+        """
+        data_length = self.read_varint()
         if data_length == 0:
-            return  # Compression disabled for packet
+            # Compression disabled for packet
+            if self._packet_filter is not None:
+                return self._is_wanted()
+            return True
+
+        if data_length < self._compression_threshold or data_length > self.max_packet_size:
+            raise InvalidUncompressedPacketError(
+                f"data_length {data_length} not in "
+                f"[{self._compression_threshold}, {self.max_packet_size}]")
 
-        self._data = self.data = memoryview(zlib.decompress(bytes(self.data)))
+        if self._packet_filter is not None:
+            return self._peek_and_inflate(data_length)
 
-        if data_length != len(self.data) or data_length <= self._compression_threshold:
+        self._inflate(data_length)
+        return True
+
+    def _inflate(self, data_length: int):
+        """
+        Inflate whole packet, data_length has to be validated.
+
+        Output is limited to data_length + 1 bytes, so stream inflating into more
+        than declared is rejected without inflating the rest of it.
+        """
+        decompressor = self._decompressor.copy()
+        try:
+            data = decompressor.decompress(self.data[self.pos:], data_length + 1)
+        except zlib.error as err:
+            raise InvalidUncompressedPacketError(err) from err
+
+        if len(data) != data_length or not decompressor.eof or decompressor.unconsumed_tail:
             raise InvalidUncompressedPacketError(
-                "data_length != len(self.data) or data_length < self._compression_threshold")
+                f"Inflated packet does not match data_length {data_length}")
+
+        self.data = memoryview(data)
+        self.pos = 0
+
+    def _peek_and_inflate(self, data_length: int) -> bool:
+        """
+        Inflate only packet id, then the rest of packet when it passes filter.
+
+        :returns False when packet has been skipped by packet filter, otherwise True
+        """
+        stats = self.skip_stats
+        get_perf_time = time.perf_counter
+
+        if data_length >= self.peek_min_data_length:
+            start = get_perf_time()
+            try:
+                # Packet id is VarInt - up to 5 bytes.
+                head = self._decompressor.copy().decompress(self.data[self.pos:], 5)
+                packet_id = extract_varint_as_int(memoryview(head))[0]
+            except (zlib.error, AssertionError, IndexError, ValueError) as err:
+                raise InvalidUncompressedPacketError(err) from err
+            stats.peek_time += get_perf_time() - start
+
+            if packet_id not in self._packet_filter:
+                stats.skipped_packets += 1
+                stats.skipped_compressed_bytes += len(self.data) - self.pos
+                stats.skipped_inflated_bytes += data_length
+                return False
+
+        start = get_perf_time()
+        self._inflate(data_length)
+        stats.inflate_time += get_perf_time() - start
+        stats.inflated_bytes += data_length
 
+        return self._is_wanted()
 
     def extract(self, type_to_extract: TypeToExtractFunction.BOOL):
-        value, self.data = type_to_extract(self.data)
+        """Extract value using misc.converters function, prefer read_* methods."""
+        value, self.data = type_to_extract(self.data[self.pos:])
+        self.pos = 0
         return value
 
     def extract_packet_id(self) -> int:
-        return self.extract(TypeToExtractFunction.VARINT_AS_INT)
+        return self.read_varint()
+
+    def read_bool(self) -> bool:
+        value = self.data[self.pos]
+        self.pos += 1
+        return bool(value)
+
+    def read_byte(self) -> int:
+        value = _unpack_byte(self.data, self.pos)[0]
+        self.pos += 1
+        return value
+
+    def read_unsigned_byte(self) -> int:
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def read_short(self) -> int:
+        value = _unpack_short(self.data, self.pos)[0]
+        self.pos += 2
+        return value
+
+    def read_unsigned_short(self) -> int:
+        value = _unpack_unsigned_short(self.data, self.pos)[0]
+        self.pos += 2
+        return value
+
+    def read_int(self) -> int:
+        value = _unpack_int(self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def read_long(self) -> int:
+        value = _unpack_long(self.data, self.pos)[0]
+        self.pos += 8
+        return value
+
+    def read_unsigned_long(self) -> int:
+        value = _unpack_unsigned_long(self.data, self.pos)[0]
+        self.pos += 8
+        return value
+
+    def read_float(self) -> float:
+        value = _unpack_float(self.data, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def read_double(self) -> float:
+        value = _unpack_double(self.data, self.pos)[0]
+        self.pos += 8
+        return value
+
+    def read_varint(self) -> int:
+        """
+        Read VarInt (up to 5 bytes) as int32.
+
+        :raise ValueError: when VarInt not fit into int32
+        """
+        data = self.data
+        pos = self.pos
+
+        # One byte VarInt inlined, the most common one.
+        byte = data[pos]
+        if byte < 0x80:
+            self.pos = pos + 1
+            return byte
+
+        number, self.pos = decode_varint(data, pos)
+        return number
+
+    def read_varints(self, count: int) -> array:
+        """Read count consecutive VarInts as array('i') of int32."""
+        values, self.pos = decode_varints(self.data, self.pos, count)
+        return values
+
+    def read_bytes(self, n_of_bytes: int) -> memoryview:
+        """Return next n_of_bytes without copying."""
+        pos = self.pos
+        self.pos = pos + n_of_bytes
+        return self.data[pos:self.pos]
+
+    def read_rest(self) -> memoryview:
+        """Return all not read bytes without copying."""
+        data = self.data[self.pos:]
+        self.pos = len(self.data)
+        return data
+
+    def read_string_bytes(self) -> bytes:
+        """Read string prefixed with its length as VarInt, return its bytes (utf-8)."""
+        string_len = self.read_varint()
+        return bytes(self.read_bytes(string_len))
+
+    def read_string(self) -> str:
+        return self.read_string_bytes().decode("utf-8")
+
+    def read_json(self) -> Union[dict, list, str]:
+        """Read json string (e.g. chat)."""
+        return json.loads(self.read_string_bytes())
+
+    def read_chat(self) -> str:
+        """Read chat json flattened into text, see misc.chat.decode_chat."""
+        string_len = self.read_varint()
+        return decode_chat(self.read_bytes(string_len))
+
+    def read_nbt(self, is_lazy: bool = True) -> Union[LazyCompound, dict, None]:
+        """
+        Read NBT, see misc.nbt.read_nbt.
+
+        :param is_lazy: decode compounds on access, they reference data (like read_rest)
+        :returns root compound, None when there is no NBT (TAG_End)
+        """
+        value, self.pos = read_nbt(self.data, self.pos, is_lazy)
+        return value
+
+    def skip_nbt(self):
+        """Step over NBT without decoding it."""
+        self.pos = skip_nbt(self.data, self.pos)
+
+    def read_position(self) -> Position:
+        """Read Position(x, y, z) packed into long."""
+        val = self.read_long()
+
+        z = val & 0x3ffffff
+        val >>= 26
+        y = val & 0xfff
+        x = val >> 12
+
+        if z >= 0x2000000:  # 2 ** 25
+            z -= 0x4000000  # 2 ** 26
+
+        return Position(x, y, z)
 
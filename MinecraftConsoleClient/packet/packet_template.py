@@ -0,0 +1,76 @@
+"""
+Preframed serverbound packets of fixed layout, only their fields are packed per packet.
+
+Usage:
+    template = PacketTemplate(play.player_position, play_ids.PLAYER_POSITION, "ddd?", compression_threshold)
+    send_queue.put(template.create(x, y, z, on_ground))
+"""
+
+import functools
+import struct
+
+from misc.converters import convert_to_varint
+from packet.outbound_queue import OutboundPacket
+
+
+@functools.lru_cache(maxsize=None)
+def _get_framed_packet_class(packet_class: type, compression_threshold: int, payload_offset: int) -> type:
+    """Return subclass of packet_class with packets framed for compression_threshold."""
+    return type(f"Framed{packet_class.__name__}", (packet_class,),
+                {"__slots__": (), "is_framed": True,
+                 "compression_threshold": compression_threshold, "payload_offset": payload_offset})
+
+
+def get_payload(packet: bytes) -> bytes:
+    """Return b'VarInt(Packet ID)' + b'Data' of packet, framed or not."""
+    if getattr(packet, "is_framed", False):
+        return packet[packet.payload_offset:]
+    return packet
+
+
+class PacketTemplate:
+    """
+    Frame (length prefix, compression header, packet id and fields) of packets created by create_packet.
+
+    Length and packet id never change, so they are written once,
+    create packs only fields into the frame and returns its copy.
+    Created packets are framed for compression_threshold (see OutboundPacket),
+    except packets long enough to be compressed - they are plain payloads.
+
+    Not thread safe.
+    """
+
+    def __init__(self, create_packet: callable, packet_id: bytes, fields_format: str, compression_threshold: int):
+        """
+        :param create_packet: creator decorated with outbound_packet, gives outbound class of packets
+        :param packet_id: b'VarInt(Packet ID)'
+        :param fields_format: struct format of fields, big-endian
+        :param compression_threshold: negative when compression is disabled
+        """
+        fields = struct.Struct(">" + fields_format)
+        payload_len = len(packet_id) + fields.size
+        packet_class = getattr(create_packet, "packet_class", OutboundPacket)
+
+        if compression_threshold < 0:
+            header = convert_to_varint(payload_len)
+        elif payload_len < compression_threshold:
+            header = convert_to_varint(payload_len + 1) + b'\x00'
+        else:
+            # Compressed data changes with fields.
+            header = b''
+
+        if header:
+            packet_class = _get_framed_packet_class(packet_class, compression_threshold, len(header))
+
+        self.compression_threshold: int = compression_threshold
+        self.is_framed: bool = packet_class.is_framed
+        self.buffer: bytearray = bytearray(header + packet_id + bytes(fields.size))
+
+        # Packs fields into the buffer, after packet id.
+        self._pack_fields: callable = functools.partial(fields.pack_into, self.buffer, len(header) + len(packet_id))
+        self._packet_class: type = packet_class
+
+    def create(self, *fields) -> OutboundPacket:
+        """Pack fields into the frame and return packet ready to queue."""
+        self._pack_fields(*fields)
+        return self._packet_class(self.buffer)
@@ -0,0 +1,107 @@
+"""
+Writer of framed serverbound packets into one reusable buffer.
+
+Usage:
+    writer = PacketWriter()
+
+    writer.clear()
+    for payload in payloads:
+        writer.add_frame(payload, compression_threshold)
+    connection.sendall(writer.get_frames())
+"""
+
+import zlib
+
+from misc.converters import convert_to_varint
+
+# Headers of payloads shorter than 256 bytes: packet length when compression is disabled,
+# packet length and b'\x00' data length when payload is shorter than compression threshold.
+_HEADERS = [convert_to_varint(payload_len) for payload_len in range(256)]
+_NOT_COMPRESSED_HEADERS = [convert_to_varint(payload_len + 1) + b'\x00' for payload_len in range(256)]
+
+
+class PacketWriter:
+    """
+    Writes length prefix, compression header and payload of packets one after another
+    into reusable bytearray, instead of joining them into new bytes for every packet.
+
+    Returned memoryview points into the buffer and is valid until the next clear.
+    Not thread safe.
+    """
+
+    def __init__(self, size: int = 4096):
+        self.buffer: bytearray = bytearray(size)
+        # Writing through memoryview is much faster than slice assignment to bytearray.
+        self._view: memoryview = memoryview(self.buffer)
+        self.pos: int = 0
+
+    def _grow(self, end: int):
+        """
+        Replace buffer with bigger one.
+
+        New buffer instead of resizing - bytearray can not be resized
+        while memoryviews of it are alive.
+        """
+        buffer = bytearray(max(end, 2 * len(self.buffer)))
+        buffer[:self.pos] = self._view[:self.pos]
+        self.buffer = buffer
+        self._view = memoryview(buffer)
+
+    def clear(self):
+        """Start writing from the beginning of the buffer, previous frames are overwritten."""
+        self.pos = 0
+
+    def add_frame(self, payload: bytes, compression_threshold: int):
+        """
+        Write payload prefixed with its length, compressed when exceeds compression_threshold.
+
+        Frame is written after previously added ones. Produces the same bytes as connection.frame_packet.
+
+        :param payload: b'VarInt(Packet ID)' + b'Data', or framed packet (see packet.packet_template)
+        :param compression_threshold: negative when compression is disabled
+        """
+        if getattr(payload, "is_framed", False):
+            if payload.compression_threshold == compression_threshold:
+                self._write(payload)
+                return
+            payload = payload[payload.payload_offset:]
+
+        payload_len = len(payload)
+
+        if compression_threshold < 0:
+            header = _HEADERS[payload_len] if payload_len < 256 else convert_to_varint(payload_len)
+        elif payload_len < compression_threshold:
+            if payload_len < 256:
+                header = _NOT_COMPRESSED_HEADERS[payload_len]
+            else:
+                header = convert_to_varint(payload_len + 1) + b'\x00'
+        else:
+            data_length = convert_to_varint(payload_len)
+            payload = zlib.compress(payload)
+            payload_len = len(payload)
+            header = convert_to_varint(len(data_length) + payload_len) + data_length
+
+        pos = self.pos
+        payload_pos = pos + len(header)
+        end = payload_pos + payload_len
+        if end > len(self.buffer):
+            self._grow(end)
+
+        view = self._view
+        view[pos:payload_pos] = header
+        view[payload_pos:end] = payload
+        self.pos = end
+
+    def _write(self, frame: bytes):
+        """Write frame as it is."""
+        pos = self.pos
+        end = pos + len(frame)
+        if end > len(self.buffer):
+            self._grow(end)
+
+        self._view[pos:end] = frame
+        self.pos = end
+
+    def get_frames(self) -> memoryview:
+        """Return frames added since the last clear, ready to send."""
+        return self._view[:self.pos]
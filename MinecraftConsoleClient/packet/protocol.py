@@ -0,0 +1,95 @@
+"""
+Packets generated from machine-readable protocol description.
+
+Description is json file with packets of every state:
+    {"play": {"0x0B": {"name": "BlockChange", "fields": [["position", "POSITION"], ["block_id", "VARINT"]]}}}
+Field types are names of packet.schema.FieldType.
+
+Class of every packet is generated with schema from the description, deriving from hand-written
+class of the same name (when handlers module has one), which keeps its handlers, properties
+and own read_data. Adding packet, or field to it, is a change of the description only.
+
+To print generated decoders, run from MinecraftConsoleClient directory:
+    python -m packet.protocol versions/v1_12_2/packet/clientbound/protocol.json
+"""
+
+import json
+from types import ModuleType
+
+from packet.schema import FieldType, SchemaReader, compile_schema
+
+HANDLERS = ("pre_handler", "default_handler", "post_handler")
+
+
+def load_protocol(path: str) -> dict:
+    """
+    Load protocol description.
+
+    Raises ValueError when description is invalid.
+
+    :param path: path to json description
+    :returns: {state: {packet id: (class name, schema)}}
+    """
+    with open(path, encoding="utf-8") as file:
+        description = json.load(file)
+
+    protocol = {}
+    for state, packets in description.items():
+        # Not states, e.g. release_name.
+        if not isinstance(packets, dict):
+            continue
+
+        protocol[state] = state_protocol = {}
+        for packet_id, packet in packets.items():
+            try:
+                schema = tuple((field_name, FieldType[type_name])
+                               for field_name, type_name in packet["fields"])
+                state_protocol[int(packet_id, 16)] = (packet["name"], schema)
+            except (KeyError, TypeError, ValueError) as err:
+                raise ValueError(f"Invalid {state} packet {packet_id} in {path}: {err!r}") from err
+
+    return protocol
+
+
+def generate_packets(state_protocol: dict, handlers: ModuleType, base: type) -> dict:
+    """
+    Create packet specific of every packet of the state.
+
+    :param state_protocol: {packet id: (class name, schema)} of one state, see load_protocol
+    :param handlers: module with hand-written classes, named as in description
+    :param base: base class of packets without hand-written class, subclass of SchemaReader
+    :returns: {packet id: packet specific}
+    """
+    packets = {}
+    for packet_id, (name, schema) in state_protocol.items():
+        handwritten = getattr(handlers, name, base)
+        if not issubclass(handwritten, SchemaReader):
+            raise TypeError(f"{handlers.__name__}.{name} is not a SchemaReader")
+
+        packet_class = type(name, (handwritten,), {"schema": schema,
+                                                   "__module__": handlers.__name__,
+                                                   "__qualname__": name,
+                                                   "__doc__": handwritten.__doc__})
+        packets[packet_id] = packet_class()
+    return packets
+
+
+def has_handler(packet_specific: SchemaReader, base: type) -> bool:
+    """Return whether packet overrides any of base handlers."""
+    packet_class = type(packet_specific)
+    return any(getattr(packet_class, handler) is not getattr(base, handler) for handler in HANDLERS)
+
+
+def get_handled(packets: dict, base: type) -> dict:
+    """Return {packet id: packet specific} of packets with handler, see has_handler."""
+    return {packet_id: packet_specific for packet_id, packet_specific in packets.items()
+            if has_handler(packet_specific, base)}
+
+
+if __name__ == "__main__":
+    import sys
+
+    for state_, state_protocol_ in load_protocol(sys.argv[1]).items():
+        for packet_id_, (name_, schema_) in state_protocol_.items():
+            print(f"# {state_} 0x{packet_id_:02X}")
+            print(compile_schema(schema_, f"{name_}_read_schema").source, end="\n\n")
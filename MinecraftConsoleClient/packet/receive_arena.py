@@ -0,0 +1,168 @@
+"""Recycled receive buffers (slabs) handing out frames as memoryviews."""
+
+import threading
+
+from packet.frame_reader import DEFAULT_BUFFER_SIZE, FrameReader
+
+
+class _Slab:
+    """Receive buffer with number of frames handed out and not yet released."""
+
+    __slots__ = ("buffer", "n_of_frames", "is_retired")
+
+    def __init__(self, buffer: bytearray):
+        self.buffer: bytearray = buffer
+        self.n_of_frames: int = 0
+        # Reader does not receive into it anymore.
+        self.is_retired: bool = False
+
+
+class ReceiveArena:
+    """
+    Pool of large bytearrays (slabs) received into by ArenaFrameReader.
+
+    Slab returns to the pool when reader has moved to the next slab
+    and every frame pointing into it has been released (see release).
+
+    Thread-safe - frames are handed out by listener and released by game thread.
+    """
+
+    def __init__(self, slab_size: int = DEFAULT_BUFFER_SIZE, max_free_slabs: int = 8):
+        """
+        Create ReceiveArena.
+
+        :param slab_size: size of pooled slabs, bigger frames get their own slab
+        :param max_free_slabs: number of free slabs kept for reuse
+        """
+        self.slab_size: int = slab_size
+        self.max_free_slabs: int = max_free_slabs
+
+        self._lock: threading.Lock = threading.Lock()
+        self._free: [bytearray, ] = []
+        # id(slab.buffer) -> slab, for slabs in use.
+        self._slabs: {int: _Slab} = {}
+
+        self.allocated_slabs: int = 0
+        self.reused_slabs: int = 0
+
+    def acquire(self, min_size: int) -> bytearray:
+        """Return slab (free one when possible) of size at least min_size."""
+        with self._lock:
+            if min_size <= self.slab_size and self._free:
+                buffer = self._free.pop()
+                self.reused_slabs += 1
+            else:
+                buffer = bytearray(max(self.slab_size, min_size))
+                self.allocated_slabs += 1
+            self._slabs[id(buffer)] = _Slab(buffer)
+        return buffer
+
+    def add_frames(self, buffer: bytearray, n_of_frames: int):
+        """Count frames handed out from slab."""
+        with self._lock:
+            self._slabs[id(buffer)].n_of_frames += n_of_frames
+
+    def retire(self, buffer: bytearray):
+        """Mark slab as no longer received into, free it when it has no frames."""
+        with self._lock:
+            slab = self._slabs[id(buffer)]
+            slab.is_retired = True
+            if not slab.n_of_frames:
+                self._free_slab(slab)
+
+    def release(self, frame: memoryview):
+        """Release frame handed out from slab, frames from outside the arena are ignored."""
+        with self._lock:
+            slab = self._slabs.get(id(getattr(frame, "obj", None)))
+            if slab is None:
+                return
+            slab.n_of_frames -= 1
+            if not slab.n_of_frames and slab.is_retired:
+                self._free_slab(slab)
+
+    def has_frames(self, buffer: bytearray) -> bool:
+        """Return whether any frame of slab has not been released yet."""
+        with self._lock:
+            return self._slabs[id(buffer)].n_of_frames > 0
+
+    def _free_slab(self, slab: _Slab):
+        del self._slabs[id(slab.buffer)]
+        if len(slab.buffer) == self.slab_size and len(self._free) < self.max_free_slabs:
+            self._free.append(slab.buffer)
+
+
+class ArenaFrameReader(FrameReader):
+    """
+    FrameReader receiving into slabs of ReceiveArena.
+
+    Frames are memoryviews into the slab - not copied out of it.
+    Every frame has to be released with ReceiveArena.release when not needed anymore,
+    data of released frame may be overwritten.
+    """
+
+    _copy_frames: bool = False
+
+    def __init__(self, arena: ReceiveArena, recv_into: callable = None):
+        """
+        Create ArenaFrameReader.
+
+        :param arena: where to get slabs from
+        :param recv_into: function like socket.recv_into, required by read_frames()
+        """
+        super().__init__(recv_into, buffer_size=0)
+        self._arena: ReceiveArena = arena
+        self._set_slab(arena.acquire(arena.slab_size))
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """
+        Return free space of the slab to receive into.
+
+        Moves to the next slab when incomplete frame would not fit,
+        frames handed out from the slab stay untouched.
+        """
+        capacity = len(self._buffer)
+        start = self._start
+        required = max(self._pending_frame_size, self._end - start + 1)
+
+        if start + required > capacity:
+            if start and required <= capacity and not self._arena.has_frames(self._buffer):
+                # Nothing points into the slab, reuse it in place.
+                return super().get_buffer(sizehint)
+            self._move_to_next_slab(required)
+
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> [memoryview, ]:
+        end = self._end + nbytes
+        frames = super().buffer_updated(nbytes)
+        if frames:
+            self._arena.add_frames(self._buffer, len(frames))
+
+        if self._end == 0 and self._arena.has_frames(self._buffer):
+            # Everything has been framed, but handed out frames must stay untouched.
+            self._start = self._end = end
+        return frames
+
+    def close(self):
+        """Give current slab back to the arena."""
+        self._arena.retire(self._buffer)
+
+    def _move_to_next_slab(self, required: int):
+        """Continue in next slab, copy not framed data into it, retire current one."""
+        old_buffer = self._buffer
+        pending = self._end - self._start
+
+        buffer = self._arena.acquire(required)
+        buffer[:pending] = self._view[self._start:self._end]
+        self._set_slab(buffer)
+        self._end = pending
+
+        self._arena.retire(old_buffer)
+
+    def _set_slab(self, buffer: bytearray):
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._start = self._end = 0
+
+    def _grow(self, required: int):
+        self._move_to_next_slab(required)
@@ -0,0 +1,174 @@
+"""Bounded channel between Connection listener and game loop."""
+
+import enum
+import queue
+import time
+from collections import Counter
+
+from packet.frame_reader import peek_packet_id
+
+
+class ReceivePolicy(enum.Enum):
+    """What to do with received packet when receive queue is overloaded."""
+
+    # Wait until game loop drains queue to the low water mark (backpressure).
+    BLOCK = "block"
+    # Discard packet.
+    DROP = "drop"
+    # Replace queued packet with the same id, e.g. newer state supersedes older.
+    MERGE = "merge"
+
+
+class ReceiveQueue(queue.Queue):
+    """
+    queue.Queue holding received packets with overload handling.
+
+    Queue becomes overloaded when its depth reaches high_water,
+    and stays overloaded until depth falls to low_water.
+    When overloaded, packet is handled by policy of its id (see ReceivePolicy),
+    packets with unknown id (compressed) and ids without policy are BLOCKed.
+    None (end of connection) is always queued.
+
+    Telemetry:
+        qsize() - current depth, max_depth - the highest reached depth,
+        overloads - how many times queue became overloaded,
+        blocked_time - time (seconds) listener has waited on BLOCK,
+        last_wait_time, total_wait_time - time (seconds) packets spent in queue,
+        dropped, merged - number of discarded packets per packet id.
+    """
+
+    def __init__(self, high_water: int, low_water: int = None,
+                 policies: {int: ReceivePolicy} = None,
+                 on_discard: callable = None):
+        """
+        Create ReceiveQueue.
+
+        :param high_water: depth making queue overloaded
+        :param low_water: depth ending overload, default half of high_water
+        :param policies: packet id -> policy used when overloaded
+        :param on_discard: called with every dropped or merged (replaced) packet
+        """
+        super().__init__()
+
+        self.high_water: int = high_water
+        self.low_water: int = high_water // 2 if low_water is None else low_water
+        self.policies: {int: ReceivePolicy} = policies or {}
+        self.on_discard: callable = on_discard
+        self.is_compression_enabled: bool = False
+
+        self._is_overloaded: bool = False
+        self._is_closed: bool = False
+        # Packet id -> the newest queued item of MERGE policy.
+        self._mergeable: {int: list} = {}
+
+        self.max_depth: int = 0
+        self.overloads: int = 0
+        self.blocked_time: float = 0.0
+        self.last_wait_time: float = 0.0
+        self.total_wait_time: float = 0.0
+        self.dropped: Counter = Counter()
+        self.merged: Counter = Counter()
+
+    def set_compression_threshold(self, compression_threshold: int):
+        """Set compression threshold of the connection, needed to read ids of packets."""
+        self.is_compression_enabled = compression_threshold >= 0
+
+    def put(self, packet: bytes, block: bool = True, timeout: float = None):
+        """
+        Put packet into queue, or drop / merge it when overloaded.
+
+        Blocks only on BLOCK policy, block and timeout are ignored.
+        """
+        with self.not_full:
+            if packet is not None and self._check_overload():
+                packet_id = peek_packet_id(packet, self.is_compression_enabled)
+                policy = self.policies.get(packet_id, ReceivePolicy.BLOCK)
+
+                if policy is ReceivePolicy.DROP:
+                    self.dropped[packet_id] += 1
+                    self._discard(packet)
+                    return
+
+                if policy is ReceivePolicy.MERGE and packet_id in self._mergeable:
+                    item = self._mergeable[packet_id]
+                    replaced, item[1] = item[1], packet
+                    self.merged[packet_id] += 1
+                    self._discard(replaced)
+                    return
+
+                if policy is ReceivePolicy.BLOCK:
+                    self._wait_for_low_water()
+                    if self._is_closed:
+                        self._discard(packet)
+                        return
+
+            self._put(packet)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def close(self):
+        """Stop blocking putters, following BLOCKed packets are discarded."""
+        with self.not_full:
+            self._is_closed = True
+            self.not_full.notify_all()
+
+    def get_stats(self) -> dict:
+        """Return snapshot of telemetry."""
+        with self.mutex:
+            return {"depth": self._qsize(),
+                    "max_depth": self.max_depth,
+                    "overloads": self.overloads,
+                    "blocked_time": self.blocked_time,
+                    "last_wait_time": self.last_wait_time,
+                    "total_wait_time": self.total_wait_time,
+                    "dropped": dict(self.dropped),
+                    "merged": dict(self.merged)}
+
+    def _check_overload(self) -> bool:
+        """Update and return whether queue is overloaded."""
+        depth = len(self.queue)
+        if self._is_overloaded:
+            if depth <= self.low_water:
+                self._is_overloaded = False
+        elif depth >= self.high_water:
+            self._is_overloaded = True
+            self.overloads += 1
+        return self._is_overloaded
+
+    def _wait_for_low_water(self):
+        """Wait until game loop drains queue to low_water or queue is closed."""
+        start = time.perf_counter()
+        while len(self.queue) > self.low_water and not self._is_closed:
+            self.not_full.wait()
+        self._is_overloaded = False
+        self.blocked_time += time.perf_counter() - start
+
+    def _discard(self, packet: bytes):
+        if self.on_discard is not None:
+            self.on_discard(packet)
+
+    # Items are [put time, packet, id of MERGE packet or None].
+    def _put(self, packet: bytes):
+        packet_id = None
+        if self.policies and packet is not None:
+            packet_id = peek_packet_id(packet, self.is_compression_enabled)
+            if self.policies.get(packet_id) is not ReceivePolicy.MERGE:
+                packet_id = None
+
+        item = [time.perf_counter(), packet, packet_id]
+        self.queue.append(item)
+        if packet_id is not None:
+            self._mergeable[packet_id] = item
+
+        if len(self.queue) > self.max_depth:
+            self.max_depth = len(self.queue)
+
+    def _get(self) -> bytes:
+        item = self.queue.popleft()
+        put_time, packet, packet_id = item
+        if packet_id is not None and self._mergeable.get(packet_id) is item:
+            del self._mergeable[packet_id]
+
+        self.last_wait_time = time.perf_counter() - put_time
+        self.total_wait_time += self.last_wait_time
+        return packet
@@ -0,0 +1,215 @@
+"""
+Declarative packet schemas compiled into decoders.
+
+Schema is a tuple of (attribute name, FieldType) pairs in the order of fields in the packet, e.g.
+    schema = (("x", FieldType.DOUBLE), ("y", FieldType.DOUBLE), ("teleport_id", FieldType.VARINT))
+
+compile_schema generates function reading all fields from PacketDataReader into attributes,
+consecutive fixed size fields are read with one precompiled struct.Struct.unpack_from.
+
+Fields listed in lazy_fields (see LazyField) are only skipped, they are decoded on the first access.
+"""
+
+import enum
+import json
+import struct
+
+from misc.chat import decode_chat
+from packet.packet_data_reader import PacketDataReader
+
+
+class FieldType(enum.Enum):
+    """Type of packet field: struct format of fixed size field, PacketDataReader method otherwise."""
+
+    BOOL = "?"
+    BYTE = "b"
+    UNSIGNED_BYTE = "B"
+    SHORT = "h"
+    UNSIGNED_SHORT = "H"
+    INT = "i"
+    LONG = "q"
+    UNSIGNED_LONG = "Q"
+    FLOAT = "f"
+    DOUBLE = "d"
+    # Rotation in steps of 1/256 of a full turn, alias of UNSIGNED_BYTE.
+    ANGLE = "B"
+    # Read as 16 bytes.
+    UUID = "16s"
+
+    VARINT = "read_varint"
+    STRING = "read_string"
+    STRING_BYTES = "read_string_bytes"
+    JSON = "read_json"
+    # Chat component flattened into text, see misc.chat.
+    CHAT = "read_chat"
+    POSITION = "read_position"
+    # NBT with lazily decoded compounds, see misc.nbt.
+    NBT = "read_nbt"
+    # All not read bytes, has to be the last field.
+    REST = "read_rest"
+
+    @property
+    def is_fixed_size(self) -> bool:
+        return not self.value.startswith("read_")
+
+
+def _decode_string(raw: memoryview) -> str:
+    return str(raw, "utf-8")
+
+
+def _decode_json(raw: memoryview):
+    return json.loads(bytes(raw))
+
+
+# Decoders of raw bytes (without length prefix) of fields which can be lazy.
+_LAZY_DECODERS = {
+    FieldType.STRING: _decode_string,
+    FieldType.STRING_BYTES: bytes,
+    FieldType.JSON: _decode_json,
+    FieldType.CHAT: decode_chat,
+}
+
+
+class LazyField:
+    """
+    Attribute decoded on the first access, then cached until the next read.
+
+    Read stores raw bytes of the field in _raw_<name> and removes cached value,
+    so handlers ignoring the field do not pay for its decoding.
+
+    Raw bytes are memoryview of received data (like FieldType.REST),
+    lazy field has to be accessed before the packet is released, e.g. in handlers.
+    """
+
+    def __init__(self, name: str, field_type: FieldType):
+        if field_type not in _LAZY_DECODERS:
+            raise ValueError(f"Field {name!r} of type {field_type} can not be lazy")
+
+        self.name: str = name
+        self.raw_name: str = f"_raw_{name}"
+        self.field_type: FieldType = field_type
+        self._decode: callable = _LAZY_DECODERS[field_type]
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        try:
+            raw = instance.__dict__[self.raw_name]
+        except KeyError:
+            raise AttributeError(f"Field {self.name!r} has not been read") from None
+
+        # Instance attribute shadows this (non-data) descriptor until the next read.
+        value = instance.__dict__[self.name] = self._decode(raw)
+        return value
+
+    def read(self, instance, reader: PacketDataReader):
+        """Read raw bytes of the field, prefixed with VarInt length, for hand-written read_data."""
+        instance.__dict__[self.raw_name] = reader.read_bytes(reader.read_varint())
+        instance.__dict__.pop(self.name, None)
+
+
+def _split_into_runs(schema: ((str, FieldType), )) -> [[(str, FieldType), ], ]:
+    """Group consecutive fixed size fields, every other field is a run on its own."""
+    runs = []
+    for name, field_type in schema:
+        if not isinstance(field_type, FieldType):
+            raise TypeError(f"Field {name!r} has invalid type: {field_type!r}")
+        if not name.isidentifier():
+            raise ValueError(f"Field name {name!r} is not valid identifier")
+        if field_type.is_fixed_size and runs and runs[-1][0][1].is_fixed_size:
+            runs[-1].append((name, field_type))
+        else:
+            runs.append([(name, field_type)])
+
+    for run in runs[:-1]:
+        if run[0][1] is FieldType.REST:
+            raise ValueError("FieldType.REST has to be the last field")
+    return runs
+
+
+def compile_schema(schema: ((str, FieldType), ), name: str = "read_schema", lazy_fields: (str, ) = ()) -> callable:
+    """
+    Return function(target, reader: PacketDataReader) setting fields of schema as attributes of target.
+
+    Raises struct.error or IndexError when data is too short.
+
+    :param schema: (attribute name, FieldType) pairs
+    :param name: name of generated function, shown in tracebacks and profiles
+    :param lazy_fields: names of fields stored raw for LazyField, instead of decoded
+    """
+    unknown_fields = set(lazy_fields).difference(field_name for field_name, _ in schema)
+    if unknown_fields:
+        raise ValueError(f"Lazy fields {sorted(unknown_fields)} are not in schema")
+
+    namespace = {}
+    lines = [f"def {name}(target, reader):"]
+    if lazy_fields:
+        lines.append("    fields = target.__dict__")
+
+    for idx, run in enumerate(_split_into_runs(schema)):
+        if run[0][1].is_fixed_size:
+            unpacker = struct.Struct(">" + "".join(field_type.value for _, field_type in run))
+            unpack_name = f"_unpack_{idx}"
+            namespace[unpack_name] = unpacker.unpack_from
+
+            targets = "".join(f"target.{field_name}, " for field_name, _ in run)
+            lines.append(f"    {targets}= {unpack_name}(reader.data, reader.pos)")
+            lines.append(f"    reader.pos += {unpacker.size}")
+        else:
+            field_name, field_type = run[0]
+            if field_name in lazy_fields:
+                if field_type not in _LAZY_DECODERS:
+                    raise ValueError(f"Field {field_name!r} of type {field_type} can not be lazy")
+                lines.append(f"    fields['_raw_{field_name}'] = reader.read_bytes(reader.read_varint())")
+                lines.append(f"    fields.pop('{field_name}', None)")
+            else:
+                lines.append(f"    target.{field_name} = reader.{field_type.value}()")
+
+    if len(lines) == 1:
+        lines.append("    pass")
+
+    source = "\n".join(lines)
+    exec(compile(source, f"<schema {name}>", "exec"), namespace)
+
+    decoder = namespace[name]
+    decoder.source = source
+    decoder.is_schema_reader = True
+    return decoder
+
+
+class SchemaReader:
+    """
+    Mixin compiling class attribute schema into read_schema(reader) method.
+
+    read_data is set to read_schema, unless class (or its base) defines its own read_data
+    (which e.g. reads schema, then something more).
+
+    Fields named in lazy_fields become LazyField attributes, decoded on the first access.
+    """
+
+    schema: ((str, FieldType), ) = None
+    lazy_fields: (str, ) = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+
+        schema = cls.__dict__.get("schema")
+        if schema is None:
+            return
+
+        cls.read_schema = compile_schema(schema, f"{cls.__name__}_read_schema", cls.lazy_fields)
+        field_types = dict(schema)
+        for field_name in cls.lazy_fields:
+            setattr(cls, field_name, LazyField(field_name, field_types[field_name]))
+        if getattr(cls.read_data, "is_schema_reader", False):
+            cls.read_data = cls.read_schema
+
+    def read_schema(self, reader: PacketDataReader):
+        pass
+
+    def read_data(self, reader: PacketDataReader):
+        pass
+
+    read_schema.is_schema_reader = True
+    read_data.is_schema_reader = True
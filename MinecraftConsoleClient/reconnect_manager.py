@@ -0,0 +1,141 @@
+"""
+Keeping game connected - starting it again after server restart or kick.
+
+Reconnects reuse the same Game: hero, world data, metrics and login packets
+are kept, host is resolved once, see Game.reset_session and Game.server_address.
+"""
+
+import logging
+import random
+import socket
+import threading
+import time
+from typing import Union
+
+from async_game import AsyncGame
+from game import Game
+
+logger = logging.getLogger("mainLogger")
+
+
+class ReconnectAttempt:
+    """Outcome of one game session. Times are in seconds."""
+
+    __slots__ = ("number", "start_time", "time_to_play", "play_time", "result")
+
+    def __init__(self, number: int, start_time: float):
+        self.number: int = number
+        # time.perf_counter() of the attempt start.
+        self.start_time: float = start_time
+        # From the attempt start to logged in, None when has not logged in.
+        self.time_to_play: Union[float, None] = None
+        # From logged in to game stop.
+        self.play_time: float = 0.0
+        # Returned by Game.start.
+        self.result: Union[str, None] = None
+
+    def __repr__(self):
+        time_to_play = "-" if self.time_to_play is None else f"{self.time_to_play * 1000:.1f}ms"
+        return (f"ReconnectAttempt(#{self.number}, time_to_play={time_to_play}, "
+                f"play_time={self.play_time:.1f}s, result={self.result!r})")
+
+
+class ReconnectManager:
+    """
+    Start game, and start it again whenever it stops, waiting
+    jittered exponential backoff after sessions which have not played long enough.
+
+    Runs synchronous Game only, AsyncGame (start is a coroutine) is rejected.
+
+    Usage:
+        manager = ReconnectManager(game)
+        manager.run()  # Blocks, stop() from other thread ends it.
+    """
+
+    # Delay after the first failure, doubled after every next one.
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    # Part of the delay randomly taken off, spreads reconnects of many bots.
+    jitter: float = 0.5
+    # Session which played this long resets backoff.
+    stable_play_time: float = 30.0
+
+    def __init__(self, game_: Game, max_attempts: Union[int, None] = None):
+        """
+        Create ReconnectManager.
+
+        :param game_: game to keep connected, not AsyncGame
+        :param max_attempts: number of sessions to start, None for no limit
+        :raises TypeError: game_ is AsyncGame
+        """
+        if isinstance(game_, AsyncGame):
+            raise TypeError("ReconnectManager runs synchronous Game only, AsyncGame is not supported")
+
+        self.game: Game = game_
+        self.max_attempts: Union[int, None] = max_attempts
+
+        self.attempts: [ReconnectAttempt, ] = []
+        self._failures: int = 0
+        self._stopped: threading.Event = threading.Event()
+
+    def run(self) -> Union[str, None]:
+        """
+        Start game sessions until stop() or max_attempts.
+
+        :return: result of the last session
+        """
+        game_ = self.game
+        result = None
+        while not self._stopped.is_set():
+            if self.max_attempts is not None and len(self.attempts) >= self.max_attempts:
+                break
+
+            if self.attempts:
+                game_.reset_session()
+            if game_.server_address is None:
+                game_.server_address = self._resolve()
+
+            attempt = ReconnectAttempt(len(self.attempts) + 1, time.perf_counter())
+            self.attempts.append(attempt)
+
+            result = attempt.result = game_.start()
+
+            end_time = time.perf_counter()
+            if game_.logged_in_time is not None:
+                attempt.time_to_play = game_.logged_in_time - attempt.start_time
+                attempt.play_time = end_time - game_.logged_in_time
+            logger.info("Session of %s ended: %s", game_.data.hero.username, attempt)
+
+            if attempt.play_time >= self.stable_play_time:
+                self._failures = 0
+            else:
+                if attempt.time_to_play is None:
+                    # Host might have moved, resolve it again.
+                    game_.server_address = None
+                self._failures += 1
+                self._stopped.wait(self.get_delay())
+
+        return result
+
+    def stop(self):
+        """Do not start next session, close connection of the current one."""
+        self._stopped.set()
+        self.game.close_connection()
+
+    def get_delay(self) -> float:
+        """Return delay before next session, based on number of failures in a row."""
+        if not self._failures:
+            return 0.0
+        delay = min(self.max_delay, self.base_delay * 2 ** (self._failures - 1))
+        return delay * (1 - self.jitter * random.random())
+
+    def _resolve(self) -> Union[tuple, None]:
+        """Return (ip, port) of the host, None when can not resolve - connect will try."""
+        host, port = self.game.data.host.get_host_data()
+        try:
+            # Connection uses IPv4 TCP socket.
+            addresses = socket.getaddrinfo(host, port, socket.AF_INET, socket.SOCK_STREAM)
+        except OSError as err:
+            logger.error("Can't resolve: %s, reason: %s", host, err)
+            return None
+        return addresses[0][4]
@@ -1,6 +1,7 @@
+from array import array
 from typing import Union
 
-from misc.converters import extract_varint_as_int
+from misc.converters import decode_varint, decode_varints
 
 """     PALETTE DIFFER FROM VERSION TO VERSION!    """
 
@@ -108,8 +109,8 @@ class DirectPalette(PaletteBase):
 
     def load(self, data: memoryview) -> bytes:
         # dummy_palette_length should always be 0. Only exists to mirror the format used elsewhere.
-        _, data = extract_varint_as_int(data)
-        return data
+        _, offset = decode_varint(data)
+        return data[offset:]
 
     def parse_block_data(self, array_of_longs: (int,)) -> (int,) * 4096:
         indices = extract_blocks_from_compacted_data_array(array_of_longs, 13)
@@ -124,16 +125,12 @@ class IndirectPalette(PaletteBase):
 
     def __init__(self, bits_per_block: int):
         self.bits_per_block = bits_per_block
-        self.palette = [bytes, ]
+        self.palette: array = array("i")
 
     def load(self, data: memoryview):
-        palette_length, data = extract_varint_as_int(data)
-
-        self.palette = [None] * palette_length
-        for idx in range(palette_length):
-            self.palette[idx], data = extract_varint_as_int(data)
-
-        return data
+        palette_length, offset = decode_varint(data)
+        self.palette, offset = decode_varints(data, offset, palette_length)
+        return data[offset:]
 
     # TODO: Optimize A.F.F.
     def parse_block_data(self, array_of_longs: (int,)) -> (int,) * 4096:
@@ -20,7 +20,9 @@ class VersionData(versions.base.VersionData):
     import versions.v1_12_2.serverbound.packet_creator as packet_creator
 
     packets_specifics: dict
-    from versions.v1_12_2.packet.clientbound import packets_specifics
+    receive_policies: dict
+    keep_alive_packet_id: int
+    from versions.v1_12_2.packet.clientbound import packets_specifics, receive_policies, keep_alive_packet_id
 
     from versions.v1_12_2.defaults import Defaults
     defaults: Defaults = Defaults()
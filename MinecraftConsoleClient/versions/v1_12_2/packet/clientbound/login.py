@@ -1,6 +1,5 @@
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
-from misc import converters
 from misc.exceptions import DisconnectedByServerException
 from misc.logger import get_logger
 from versions.v1_12_2.packet.clientbound.packet_specific import PacketSpecific
@@ -15,9 +14,6 @@ if TYPE_CHECKING:
 class SetCompression(PacketSpecific):
     threshold: int
 
-    def read_data(self, data: memoryview):
-        self.threshold = converters.extract_varint_as_int(data)[0]
-
     def default_handler(self, game_: "game.Game"):
         # TODO PARSER_ADD_THRESHOLD: add call game.set_threshold
         game_._connection.compression_threshold = self.threshold
@@ -36,9 +32,6 @@ class SetCompression(PacketSpecific):
 class LoginSuccess(PacketSpecific):
     uuid: int
 
-    def read_data(self, data: memoryview):
-        self.uuid = converters.extract_string_bytes(data)[0].decode('utf-8')
-
     def default_handler(self, game_: "game.Game"):
         game_.data.hero.uuid = self.uuid
         logger.info("Successfully logged to the server, UUID: %s", game_.data.hero.uuid)
@@ -46,18 +39,10 @@ class LoginSuccess(PacketSpecific):
 
 
 class Disconnect(PacketSpecific):
-    reason: Any
-
-    def read_data(self, data: memoryview):
-        # TODO: After implementing chat interpreter do sth here.
-        # reason should be dict Chat type.
-        self.reason, _ = converters.extract_json_from_chat(data)
+    # Text of chat component.
+    reason: str
 
     def default_handler(self, game_: "game.Game"):
-        try:
-            logger.error("%s has been disconnected by server. Reason: '%s'",
-                         game_.data.hero.username, self.reason['text'])
-        except Exception:
-            logger.error("%s has been disconnected by server. Reason: '%s'",
-                         game_.data.hero.username, self.reason)
+        logger.error("%s has been disconnected by server. Reason: '%s'",
+                     game_.data.hero.username, self.reason)
         raise DisconnectedByServerException("Disconnected by server.")
@@ -1,12 +1,19 @@
 from typing import  TYPE_CHECKING
 
+from packet.schema import SchemaReader
+
 if TYPE_CHECKING:
     import game
 
 
-class PacketSpecific:
-    def read_data(self, data: memoryview):
-        pass
+class PacketSpecific(SchemaReader):
+    """
+    Reads and handles one packet.
+
+    Fields are declared in protocol.json (see packet.protocol) and read into attributes,
+    packets which can not be declared override read_data.
+    """
+
     def pre_handler(self, game_: "game.Game"):
         pass
     def default_handler(self, game_: "game.Game"):
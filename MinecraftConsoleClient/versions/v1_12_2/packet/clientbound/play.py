@@ -1,13 +1,15 @@
 """Module with functions related to given packet."""
 
 import logging
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING
 
 from commands import chat_commands
 from data_structures.position import Position
-from misc import converters
 from misc.exceptions import DisconnectedByServerException
 from misc.hashtables import GAMEMODE, GAME_DIFFICULTY
+from packet.outbound_queue import CoalesceKey
+from packet.packet_data_reader import PacketDataReader
+from packet.schema import FieldType, LazyField
 from versions.v1_12_2.packet.clientbound.packet_specific import PacketSpecific
 from versions.v1_12_2.serverbound import packet_creator
 from versions.v1_12_2.view.view import gui
@@ -24,20 +26,23 @@ class CombatEvent(PacketSpecific):
     and end combat completely ignored by the Notchain client)'
     """
 
+    # Death message, decoded only when used.
+    message = LazyField("message", FieldType.CHAT)
+
     def __init__(self):
         self.event: int = -1
         self.player_id: int = -1
         self.entity_id: int = -1
-        self.message: Any = None
+        self.message: str = ""
 
-    def read_data(self, data: memoryview):
-        self.event, data = converters.extract_varint_as_int(data)
+    def read_data(self, reader: PacketDataReader):
+        self.event = reader.read_varint()
 
         # TODO: Extract to const
         if self.event == 2:  # Entity dead
-            self.player_id, data = converters.extract_varint_as_int(data)
-            self.entity_id, data = converters.extract_int(data)
-            self.message = converters.extract_json_from_chat(data)
+            self.player_id = reader.read_varint()
+            self.entity_id = reader.read_int()
+            CombatEvent.message.read(self, reader)
 
     def default_handler(self, game_: "game.Game"):
         if self.event == 2:
@@ -49,9 +54,13 @@ class CombatEvent(PacketSpecific):
                           f"death message: '{self.message}' "
 
                 game_.on_death()
-            else:
+
+            # Deaths of other entities are frequent, message is decoded only when logged.
+            elif logger.isEnabledFor(logging.INFO):
                 message = f"Entity: {self.player_id} has been " \
                           f"killed by: {self.entity_id}, death message: '{self.message}' "
+            else:
+                return
 
             logger.info(message)
             gui.add_to_hotbar(message)
@@ -72,18 +81,12 @@ class PlayerPositionAndLook(PacketSpecific):
         self.yaw: float = -1
         self.pitch: float = -1
         self.flags: int = -1
+        # VarInt, sent back as it is.
         self.teleport_id = None
 
-    def read_data(self, data: memoryview):
-        self.data = data
-
-        self.x, data = converters.extract_double(data)
-        self.y, data = converters.extract_double(data)
-        self.z, data = converters.extract_double(data)
-        self.yaw, data = converters.extract_float(data)
-        self.pitch, data = converters.extract_float(data)
-        self.flags, self.teleport_id = converters.extract_byte(data)
-
+    def read_data(self, reader: PacketDataReader):
+        self.data = reader.get_not_parsed_data()
+        self.read_schema(reader)
 
     def default_handler(self, game_: "game.Game"):
         world_data = game_.data.world_data
@@ -138,7 +141,13 @@ class PlayerPositionAndLook(PacketSpecific):
                            ("pitch", player_data.entity.look.pitch),
                            ("------------------", '------------------'))
 
-            add_packet = game_.to_send_packets.put
+            to_send_packets = game_.to_send_packets
+            add_packet = to_send_packets.put
+
+            # Queued steps are from before the teleport, server would apply them after the confirm.
+            discarded = to_send_packets.discard(*CoalesceKey.OWN_MOVEMENT)
+            if discarded:
+                logger.info("Discarded %i queued movement packets", discarded)
 
             # Teleport confirm.
             add_packet(packet_creator.play.teleport_confirm(teleport_id))
@@ -175,12 +184,6 @@ class Respawn(PacketSpecific):
         self.gamemode = None
         self.level_type: bytes = b'-1'
 
-    def read_data(self, data: memoryview):
-        self.dimension, data = converters.extract_int(data)
-        self.difficulty = data[0]
-        self.gamemode = data[1]
-        self.level_type, _ = converters.extract_string_bytes(data[2:])
-
     def default_handler(self, game_: "game.Game"):
         world_data = game_.data.world_data
 
@@ -228,8 +231,6 @@ class HeldItemChange(PacketSpecific):
     def __init__(self):
         self.active_slot: int = -1
 
-    def read_data(self, data: memoryview):
-        self.active_slot, _ = converters.extract_byte(data)
     def default_handler(self, game_: "game.Game"):
         player = game_.data.hero
 
@@ -269,11 +270,6 @@ class UpdateHealth(PacketSpecific):
         self.food: int = -1
         self.food_saturation: float = -1
 
-    def read_data(self, data: memoryview):
-        self.health, data = converters.extract_float(data)
-        self.food, data = converters.extract_varint_as_int(data)
-        self.food_saturation = converters.extract_float(data)[0]
-
     def default_handler(self, game_: "game.Game"):
         """Auto-respawn player."""
 
@@ -315,8 +311,6 @@ class SpawnPosition(PacketSpecific):
         # noinspection PyTypeChecker
         self.position: Position = None
 
-    def read_data(self, data: memoryview):
-        self.position, _ = converters.extract_position(data)
     def default_handler(self, game_: "game.Game"):
         logger.info("Changed player spawn position to %s", self.position)
 
@@ -408,9 +402,6 @@ class EntityStatus(PacketSpecific):
         self.entity_id: int = -1
         self.status:int = -1
 
-    def read_data(self, data: memoryview):
-        self.entity_id, data = converters.extract_int(data)  # data is 1 byte
-        self.status, _ = converters.extract_byte(data)
     def default_handler(self, game_: "game.Game"):
         logger.debug("Entity with id: %i status changed to: %i",
                      self.entity_id, self.status)
@@ -458,17 +449,15 @@ class MultiBlockChange(PacketSpecific):
 
 class ChatMessage(PacketSpecific):
     def __init__(self):
-        self.json_data: Any = None
-
-        # noinspection PyTypeChecker
-        self.position: Position = None
+        # Text of chat component.
+        self.message: str = ""
+        # 0: chat (chat box), 1: system message (chat box), 2: game info (above hotbar).
+        self.position: int = -1
 
-    def read_data(self, data: memoryview):
-        self.json_data, self.position = converters.extract_json_from_chat(data)
     def default_handler(self, game_: "game.Game"):
-        chat_commands.interpret(game_, str(self.json_data))
+        chat_commands.interpret(game_, self.message)
 
-        gui.add_to_chat(f"{self.position}: {self.json_data}")
+        gui.add_to_chat(f"{self.position}: {self.message}")
 
 
 class TabComplete(PacketSpecific):
@@ -482,11 +471,11 @@ class UpdateBlockEntity(PacketSpecific):
 class ServerDifficulty(PacketSpecific):
     def __init__(self):
         self.difficulty: int = -1
-        self.difficulty_name: str = "-1"
 
-    def read_data(self, data: memoryview):
-        self.difficulty, _ = converters.extract_unsigned_byte(data)
-        self.difficulty_name = GAME_DIFFICULTY[self.difficulty]
+    @property
+    def difficulty_name(self) -> str:
+        return GAME_DIFFICULTY[self.difficulty]
+
     def default_handler(self, game_: "game.Game"):
         game_.data.world_data.difficulty = self.difficulty
 
@@ -510,10 +499,6 @@ class BlockChange(PacketSpecific):
         self.position: Position = None
         self.block_id: int = -1
 
-    def read_data(self, data: memoryview):
-        self.position, data = converters.extract_position(data)
-        self.block_id, _ = converters.extract_varint_as_int(data)
-
     def default_handler(self, game_: "game.Game"):
         # For debug purposes.
         from versions.base.consts import BLOCK as ID_
@@ -527,11 +512,9 @@ class BlockChange(PacketSpecific):
 
 class ChangeGameState(PacketSpecific):
     def __init__(self):
+        self.reason: int = -1
         self.value: float = -1
 
-    def read_data(self, data: memoryview):
-        self.value, _ = converters.extract_float(data[1:])
-        # reason = data[0]  # reason = utils.extract_unsigned_byte()[0]
     def default_handler(self, game_: "game.Game"):
         world_data = game_.data.world_data
 
@@ -579,11 +562,10 @@ class KeepAlive(PacketSpecific):
     def __init__(self):
         self.data: memoryview = memoryview(b"-1")
 
-    def read_data(self, data: memoryview):
-        self.data = data
-
     def default_handler(self, game_: "game.Game"):
-        """Auto-sends keep alive packet."""
+        """Auto-sends keep alive packet, unless listener has already sent it."""
+        if game_.is_keep_alive_answered(self.data):
+            return
 
         game_.to_send_packets.put(packet_creator.play.keep_alive(self.data))
 
@@ -592,8 +574,6 @@ class ChunkData(PacketSpecific):
     def __init__(self):
         self.data: bytes = b'-1'
 
-    def read_data(self, data: memoryview):
-        self.data = data
     def default_handler(self, game_: "game.Game"):
         game_.data.world_data.world.parse_chunk_packet(self.data)
 
@@ -610,31 +590,25 @@ class JoinGame(PacketSpecific):
     def __init__(self):
         self.entity_id: int = -1
         self.gamemode: int = -1
-        self.gamemode_name: str = "-1"
-        self.is_hardcore: bool = False
         self.dimension: int = -1
         self.difficulty: int = -1
-        self.difficulty_name: str = "-1"
+        # Was once used by the client to draw the player list, but now is ignored.
+        self.max_players: int = -1
+        # default, flat, largeBiomes, amplified, default_1_1
         self.level_type:bytes = b"-1"
+        self.reduced_debug_info: bool = False
 
-    def read_data(self, data: memoryview):
-        self.entity_id, data = converters.extract_int(data)
-
-        self.gamemode, data = converters.extract_unsigned_byte(data)
-        self.gamemode_name = GAMEMODE[self.gamemode & 0b00000111]
-        self.is_hardcore = bool(self.gamemode & 0b00001000)
+    @property
+    def gamemode_name(self) -> str:
+        return GAMEMODE[self.gamemode & 0b00000111]
 
-        self.dimension, data = converters.extract_int(data)
+    @property
+    def is_hardcore(self) -> bool:
+        return bool(self.gamemode & 0b00001000)
 
-        self.difficulty, data = converters.extract_unsigned_byte(data)
-        self.difficulty_name = GAME_DIFFICULTY[self.difficulty]
-
-        # Was once used by the client to draw the player list, but now is ignored.
-        # player.player._server_data["max_players"], data =  utils.extract_unsigned_byte(data)
-
-        data = data[1:]
-        # default, flat, largeBiomes, amplified, default_1_1
-        self.level_type, _ = converters.extract_string_bytes(data)
+    @property
+    def difficulty_name(self) -> str:
+        return GAME_DIFFICULTY[self.difficulty]
 
     def default_handler(self, game_: "game.Game"):
         world_data = game_.data.world_data
@@ -713,23 +687,24 @@ class CraftRecipeResponse(PacketSpecific):
 class PlayerAbilities(PacketSpecific):
     def __init__(self):
         self.flags: int = -1
-        self.is_invulnerable: bool = False
-        self.is_flying: bool = False
-        self.is_allow_flying: bool = False
-        self.is_creative_mode: bool = False
         self.flying_speed: float = -1
         self.fov_modifier: float = -1
 
-    def read_data(self, data: memoryview):
-        self.flags, data = converters.extract_byte(data)
-        self.is_invulnerable = bool(self.flags & 0x01)
-        self.is_flying = bool(self.flags & 0x02)
-        self.is_allow_flying = bool(self.flags & 0x04)
-        self.is_creative_mode = bool(self.flags & 0x08)
+    @property
+    def is_invulnerable(self) -> bool:
+        return bool(self.flags & 0x01)
+
+    @property
+    def is_flying(self) -> bool:
+        return bool(self.flags & 0x02)
 
-        self.flying_speed, data = converters.extract_float(data)
+    @property
+    def is_allow_flying(self) -> bool:
+        return bool(self.flags & 0x04)
 
-        self.fov_modifier, _ = converters.extract_float(data)
+    @property
+    def is_creative_mode(self) -> bool:
+        return bool(self.flags & 0x08)
 
     def default_handler(self, game_: "game.Game"):
         player = game_.data.world_data
@@ -759,15 +734,12 @@ class PlayerAbilities(PacketSpecific):
 
 class Disconnect(PacketSpecific):
     def __init__(self):
-        self.reason: dict = {-1:-1}
-
-    def read_data(self, data: memoryview):
-        self.reason, _ = converters.extract_json_from_chat(data)
+        # Text of chat component.
+        self.reason: str = ""
 
     def default_handler(self, game_: "game.Game"):
         player = game_.data.hero
 
-        # reason should be dict Chat type.
-        logger.error("% has been disconnected by server. Reason: '%r'",
-                     player.username, self.reason['text'])
+        logger.error("%s has been disconnected by server. Reason: '%s'",
+                     player.username, self.reason)
         raise DisconnectedByServerException("Disconnected by server.")
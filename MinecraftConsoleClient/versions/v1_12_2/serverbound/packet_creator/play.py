@@ -1,14 +1,26 @@
 """Provides functions which generate given packet."""
 
+import struct
+
 from misc import converters
+from packet.outbound_queue import CoalesceKey, PacketPriority, outbound_packet
+from packet.packet_template import PacketTemplate
 from versions.v1_12_2.serverbound.packet_id import play
 
+# Packet id and all fields of fixed size packets, packed with one call.
+# id, x, y, z, on_ground
+_PLAYER_POSITION = struct.Struct(f">{len(play.PLAYER_POSITION)}sddd?")
+# id, x, y, z, yaw, pitch, on_ground
+_PLAYER_POSITION_AND_LOOK = struct.Struct(f">{len(play.PLAYER_POSITION_AND_LOOK)}sdddff?")
+# id, yaw, pitch, on_ground
+_PLAYER_LOOK = struct.Struct(f">{len(play.PLAYER_LOOK)}sff?")
+
 
+@outbound_packet(PacketPriority.CONTROL)
 def teleport_confirm(teleport_id: bytes) -> bytes:
     """Return packet with confirmation for Player Position And Look."""
 
-    return b''.join((play.TELEPORT_CONFIRM,
-                     teleport_id))
+    return play.TELEPORT_CONFIRM + teleport_id
 
 
 def tabcomplete() -> bytes:
@@ -63,8 +75,9 @@ def use_entity() -> bytes:
     return packed_packet
 
 
+@outbound_packet(PacketPriority.CONTROL)
 def keep_alive(keep_alive_id: memoryview) -> bytes:
-    return b''.join((play.KEEP_ALIVE, keep_alive_id))
+    return play.KEEP_ALIVE + keep_alive_id
 
 
 def player() -> bytes:
@@ -72,19 +85,25 @@ def player() -> bytes:
     return packed_packet
 
 
+@outbound_packet(PacketPriority.MOVEMENT, CoalesceKey.OWN_POSITION)
 def player_position(position: (float, float, float), on_ground: bool) -> bytes:
     """
     :param position: (x, y, z) of destination
     :param on_ground: determines whether is player on ground
     """
-    return b''.join((play.PLAYER_POSITION,
-                     converters.pack_double(position[0]),
-                     converters.pack_double(position[1]),
-                     converters.pack_double(position[2]),
-                     converters.pack_bool(on_ground))
-                    )
+    return _PLAYER_POSITION.pack(play.PLAYER_POSITION, position[0], position[1], position[2], on_ground)
+
+
+def player_position_template(compression_threshold: int) -> PacketTemplate:
+    """
+    Return template of player_position packets framed for compression_threshold.
+
+    template.create(x, y, z, on_ground)
+    """
+    return PacketTemplate(player_position, play.PLAYER_POSITION, "ddd?", compression_threshold)
 
 
+@outbound_packet(PacketPriority.CONTROL)
 def player_position_and_look_confirm(data: bytes, on_ground: bool = False):
     """
     Confirm for player_position_and_look sent by server.
@@ -97,6 +116,7 @@ def player_position_and_look_confirm(data: bytes, on_ground: bool = False):
                      converters.pack_bool(on_ground)))
 
 
+@outbound_packet(PacketPriority.MOVEMENT, CoalesceKey.OWN_POSITION_AND_LOOK)
 def player_position_and_look(position: (float, float, float),
                              look: (float, float),
                              on_ground: bool) -> bytes:
@@ -105,22 +125,22 @@ def player_position_and_look(position: (float, float, float),
     :param look: (yaw, pitch) how to set head
     :param on_ground: determines whether is player on ground
     """
-    return b''.join((play.PLAYER_POSITION_AND_LOOK,
-                     converters.pack_double(position[0]),
-                     converters.pack_double(position[1]),
-                     converters.pack_double(position[2]),
-                     converters.pack_float(look[0]),
-                     converters.pack_float(look[1]),
-                     converters.pack_bool(on_ground))
-                    )
+    return _PLAYER_POSITION_AND_LOOK.pack(play.PLAYER_POSITION_AND_LOOK, position[0], position[1], position[2],
+                                          look[0], look[1], on_ground)
+
+
+def player_position_and_look_template(compression_threshold: int) -> PacketTemplate:
+    """
+    Return template of player_position_and_look packets framed for compression_threshold.
+
+    template.create(x, y, z, yaw, pitch, on_ground)
+    """
+    return PacketTemplate(player_position_and_look, play.PLAYER_POSITION_AND_LOOK, "dddff?", compression_threshold)
 
 
+@outbound_packet(PacketPriority.MOVEMENT, CoalesceKey.OWN_LOOK)
 def player_look(look: (float, float), on_ground: bool) -> bytes:
-    return b''.join((play.PLAYER_LOOK,
-                     converters.pack_float(look[0]),
-                     converters.pack_float(look[1]),
-                     converters.pack_bool(on_ground))
-                    )
+    return _PLAYER_LOOK.pack(play.PLAYER_LOOK, look[0], look[1], on_ground)
 
 
 def vehicle_move() -> bytes:
@@ -0,0 +1,66 @@
+"""
+Compare decoding of chat messages with the previous implementation.
+
+Before: PacketDataReader.read_json (json.loads), ChatMessage handler formatting the dict.
+After: PacketDataReader.read_chat (misc.chat.decode_chat), text cached by raw json.
+
+Flood repeats the same few messages, unique messages always miss the cache.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_chat.py
+"""
+
+import json
+import timeit
+
+from misc import chat, converters
+from packet.packet_data_reader import PacketDataReader
+
+N_OF_MESSAGES = 10000
+
+
+def chat_message(name: str, text: str) -> dict:
+    return {"translate": "chat.type.text",
+            "with": [{"text": name, "color": "gold",
+                      "clickEvent": {"action": "suggest_command", "value": f"/msg {name} "},
+                      "hoverEvent": {"action": "show_entity",
+                                     "value": {"text": f"{{name:\"{name}\",id:\"0-0-0-0-0\"}}"}}},
+                     {"text": text, "extra": [{"text": "!", "bold": True}]}]}
+
+
+FLOOD = [memoryview(converters.pack_string(json.dumps(chat_message(f"Bot{idx % 8}", "buy diamonds"))))
+         for idx in range(N_OF_MESSAGES)]
+UNIQUE = [memoryview(converters.pack_string(json.dumps(chat_message("Bob", f"message {idx}"))))
+          for idx in range(N_OF_MESSAGES)]
+
+
+def read_json(messages: [memoryview, ]):
+    reader = PacketDataReader()
+    for message in messages:
+        reader.load(message)
+        str(reader.read_json())
+
+
+def read_chat(messages: [memoryview, ]):
+    reader = PacketDataReader()
+    for message in messages:
+        reader.load(message)
+        reader.read_chat()
+
+
+def report(name: str, messages: [memoryview, ]):
+    before = min(timeit.repeat(lambda: read_json(messages), number=1, repeat=5)) / len(messages)
+
+    def after_run():
+        chat.clear_cache()
+        read_chat(messages)
+
+    after = min(timeit.repeat(after_run, number=1, repeat=5)) / len(messages)
+    print(f"{name}: {chat.get_cache_stats()}")
+    print(f"    before: {before * 1e9:6.0f}ns")
+    print(f"    after:  {after * 1e9:6.0f}ns ({before / after:.2f}x)")
+
+
+if __name__ == "__main__":
+    report("flood", FLOOD)
+    report("unique", UNIQUE)
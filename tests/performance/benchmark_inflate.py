@@ -0,0 +1,126 @@
+"""
+Compare memory allocated and time spent while inflating packets.
+
+Before: zlib.decompress(bytes(data)) - copy of compressed data,
+output growing block by block, then joined.
+After: PacketDataReader.load - copy of reader's decompressor inflating at most data_length + 1 bytes.
+
+Allocations are counted by raw memory allocator hook (installed through ctypes),
+which sees buffers bigger than 512 bytes and zlib state, not small Python objects.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_inflate.py
+"""
+
+import ctypes
+import time
+import tracemalloc
+import zlib
+from random import randint, seed
+
+from misc.converters import convert_to_varint, extract_varint_as_int
+from packet.packet_data_reader import PacketDataReader
+
+N_OF_REPEATS = 200
+
+
+def prepare_packets() -> [(str, memoryview), ]:
+    """Return compressed packets (data_length + zlib data) of different sizes."""
+    seed(0)
+    packets = []
+    for name, size in (("keep alive sized", 300),
+                       ("entity metadata sized", 3000),
+                       ("chunk data sized", 60000),
+                       ("big chunk data sized", 400000)):
+        data = bytes(randint(0, 15) for _ in range(size))
+        packets.append((name, memoryview(convert_to_varint(size) + zlib.compress(data))))
+    return packets
+
+
+def legacy_load(packet: memoryview) -> memoryview:
+    """Inflate the way PacketDataReader did before."""
+    data_length, data = extract_varint_as_int(packet)
+    data = memoryview(zlib.decompress(bytes(data)))
+    assert data_length == len(data)
+    return data
+
+
+def new_load(packet: memoryview, reader=PacketDataReader()) -> memoryview:
+    """Inflate using PacketDataReader."""
+    reader.set_compression_threshold(256)
+    reader.load(packet)
+    return reader.get_not_parsed_data()
+
+
+_MALLOC = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t)
+_CALLOC = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t)
+_REALLOC = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t)
+_PYMEM_DOMAIN_RAW = ctypes.c_int(0)
+
+
+class _Allocator(ctypes.Structure):
+    """PyMemAllocatorEx."""
+    _fields_ = [("ctx", ctypes.c_void_p), ("malloc", ctypes.c_void_p), ("calloc", ctypes.c_void_p),
+                ("realloc", ctypes.c_void_p), ("free", ctypes.c_void_p)]
+
+
+def count_allocations(load: callable, packet: memoryview) -> int:
+    """Return number of raw allocations (malloc, calloc, realloc) made by one load."""
+    original = _Allocator()
+    ctypes.pythonapi.PyMem_GetAllocator(_PYMEM_DOMAIN_RAW, ctypes.byref(original))
+    malloc, calloc = _MALLOC(original.malloc), _CALLOC(original.calloc)
+    realloc = _REALLOC(original.realloc)
+    n_of_allocations = 0
+
+    def counting_malloc(_, size):
+        nonlocal n_of_allocations
+        n_of_allocations += 1
+        return malloc(original.ctx, size)
+
+    def counting_calloc(_, n_of_elements, size):
+        nonlocal n_of_allocations
+        n_of_allocations += 1
+        return calloc(original.ctx, n_of_elements, size)
+
+    def counting_realloc(_, ptr, size):
+        nonlocal n_of_allocations
+        n_of_allocations += 1
+        return realloc(original.ctx, ptr, size)
+
+    # Callbacks have to outlive the hook.
+    callbacks = (_MALLOC(counting_malloc), _CALLOC(counting_calloc), _REALLOC(counting_realloc))
+    counting = _Allocator(original.ctx, *(ctypes.cast(callback, ctypes.c_void_p) for callback in callbacks),
+                          original.free)
+
+    load(packet)  # Warm up, e.g. lazily created objects.
+    ctypes.pythonapi.PyMem_SetAllocator(_PYMEM_DOMAIN_RAW, ctypes.byref(counting))
+    try:
+        load(packet)
+    finally:
+        ctypes.pythonapi.PyMem_SetAllocator(_PYMEM_DOMAIN_RAW, ctypes.byref(original))
+    return n_of_allocations
+
+
+def measure(load: callable, packet: memoryview) -> (float, int, int):
+    """Return time of one inflate, number of allocations, and bytes allocated besides the result."""
+    start = time.perf_counter()
+    for _ in range(N_OF_REPEATS):
+        load(packet)
+    elapsed = (time.perf_counter() - start) / N_OF_REPEATS
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    result = load(packet)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, count_allocations(load, packet), peak - len(result)
+
+
+if __name__ == "__main__":
+    for name, packet in prepare_packets():
+        print(f"{name} ({len(packet)} bytes compressed):")
+        for label, load in (("before", legacy_load), ("after", new_load)):
+            elapsed, n_of_allocations, extra = measure(load, packet)
+            print(f"    {label + ':':7} {elapsed * 1e6:9.1f}us, {n_of_allocations:3} allocations, "
+                  f"{extra:8} bytes allocated besides result")
@@ -0,0 +1,64 @@
+"""
+Compare reading packet with JSON (chat) and string fields decoded eagerly and lazily.
+
+Before: every field decoded by read_data.
+After: lazy_fields skipped by read_data, decoded on the first access.
+Lazy field pays for descriptor call on the first access, so it is worth only
+for fields which are expensive to decode (JSON) and not always used.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_lazy.py
+"""
+
+import json
+import struct
+import timeit
+
+from misc import converters
+from packet.packet_data_reader import PacketDataReader
+from packet.schema import FieldType, SchemaReader
+
+N_OF_REPEATS = 100000
+
+SCHEMA = (("player_id", FieldType.VARINT), ("entity_id", FieldType.INT),
+          ("message", FieldType.JSON), ("level_type", FieldType.STRING_BYTES))
+MESSAGE = {"translate": "death.attack.player", "with": [{"text": "Bob"}, {"text": "Alice", "color": "red"}]}
+DATA = memoryview(b''.join((converters.convert_to_varint(300), struct.pack(">i", 42),
+                            converters.pack_string(json.dumps(MESSAGE)), converters.pack_string("default"))))
+
+
+class EagerPacket(SchemaReader):
+    schema = SCHEMA
+
+
+class LazyPacket(SchemaReader):
+    schema = SCHEMA
+    lazy_fields = ("message", "level_type")
+
+
+def read(packet: SchemaReader, reader: PacketDataReader):
+    reader.load(DATA)
+    packet.read_data(reader)
+
+
+def read_and_access(packet: SchemaReader, reader: PacketDataReader):
+    reader.load(DATA)
+    packet.read_data(reader)
+    return packet.message, packet.level_type
+
+
+def report(name: str, before: callable, after: callable):
+    before_time = min(timeit.repeat(before, number=N_OF_REPEATS, repeat=9)) / N_OF_REPEATS
+    after_time = min(timeit.repeat(after, number=N_OF_REPEATS, repeat=9)) / N_OF_REPEATS
+    print(f"{name}:")
+    print(f"    before: {before_time * 1e9:6.0f}ns")
+    print(f"    after:  {after_time * 1e9:6.0f}ns ({before_time / after_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    reader_ = PacketDataReader()
+    eager, lazy = EagerPacket(), LazyPacket()
+    assert read_and_access(eager, reader_) == read_and_access(lazy, reader_) == (MESSAGE, b"default")
+
+    report("fields not accessed", lambda: read(eager, reader_), lambda: read(lazy, reader_))
+    report("fields accessed", lambda: read_and_access(eager, reader_), lambda: read_and_access(lazy, reader_))
@@ -0,0 +1,113 @@
+"""
+Compare ways of decoding NBT of block entities with misc.nbt.
+
+Before: no decoder, NBT kept as raw bytes (FieldType.REST).
+After: read_nbt decoding everything, lazy read_nbt decoding only accessed entries
+(one item of chest, one line of sign), skip_nbt stepping over NBT without building objects.
+Lazy compound decodes names of all its entries, so it pays off for large compounds
+(chest), small ones (sign) cost about as much as reading everything.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_nbt.py
+"""
+
+import json
+import struct
+import timeit
+
+from misc import nbt
+
+N_OF_REPEATS = 2000
+
+
+def pack_string(string: str) -> bytes:
+    raw = string.encode()
+    return struct.pack(">H", len(raw)) + raw
+
+
+def pack_named(tag_type: int, name: str, payload: bytes) -> bytes:
+    return bytes((tag_type, )) + pack_string(name) + payload
+
+
+def pack_compound(*entries: bytes) -> bytes:
+    return b''.join(entries) + b'\x00'
+
+
+def pack_list(tag_type: int, payloads: [bytes, ]) -> bytes:
+    return struct.pack(">Bi", tag_type, len(payloads)) + b''.join(payloads)
+
+
+def pack_block_entity(entity_id: str, *entries: bytes) -> bytes:
+    return pack_named(nbt.TAG_COMPOUND, "", pack_compound(
+        pack_named(nbt.TAG_STRING, "id", pack_string(entity_id)),
+        pack_named(nbt.TAG_INT, "x", struct.pack(">i", 100)),
+        pack_named(nbt.TAG_INT, "y", struct.pack(">i", 64)),
+        pack_named(nbt.TAG_INT, "z", struct.pack(">i", -100)),
+        *entries))
+
+
+def pack_item(slot: int) -> bytes:
+    enchantments = [pack_compound(pack_named(nbt.TAG_SHORT, "id", struct.pack(">h", ench_id)),
+                                  pack_named(nbt.TAG_SHORT, "lvl", struct.pack(">h", 5)))
+                    for ench_id in (0, 34, 70)]
+    display = pack_compound(
+        pack_named(nbt.TAG_STRING, "Name", pack_string(f"Sword of slot {slot}")),
+        pack_named(nbt.TAG_LIST, "Lore", pack_list(nbt.TAG_STRING, [pack_string(f"Lore line {idx}")
+                                                                     for idx in range(3)])))
+    return pack_compound(
+        pack_named(nbt.TAG_BYTE, "Slot", struct.pack(">b", slot)),
+        pack_named(nbt.TAG_STRING, "id", pack_string("minecraft:diamond_sword")),
+        pack_named(nbt.TAG_BYTE, "Count", b'\x01'),
+        pack_named(nbt.TAG_SHORT, "Damage", struct.pack(">h", slot)),
+        pack_named(nbt.TAG_COMPOUND, "tag", pack_compound(
+            pack_named(nbt.TAG_COMPOUND, "display", display),
+            pack_named(nbt.TAG_LIST, "ench", pack_list(nbt.TAG_COMPOUND, enchantments)))))
+
+
+CHEST = memoryview(pack_block_entity(
+    "minecraft:chest",
+    pack_named(nbt.TAG_STRING, "CustomName", pack_string("Loot")),
+    pack_named(nbt.TAG_LIST, "Items", pack_list(nbt.TAG_COMPOUND, [pack_item(slot) for slot in range(27)]))))
+
+SIGN = memoryview(pack_block_entity(
+    "minecraft:sign",
+    *(pack_named(nbt.TAG_STRING, f"Text{idx}",
+                 pack_string(json.dumps({"text": f"line {idx}", "color": "dark_blue", "bold": True})))
+      for idx in range(1, 5))))
+
+
+def read_chest():
+    return nbt.read_nbt(CHEST)[0]["Items"][13]["tag"]["display"]["Name"]
+
+
+def read_chest_lazily():
+    return nbt.read_nbt(CHEST, is_lazy=True)[0]["Items"][13]["tag"]["display"]["Name"]
+
+
+def read_sign():
+    return nbt.read_nbt(SIGN)[0]["Text1"]
+
+
+def read_sign_lazily():
+    return nbt.read_nbt(SIGN, is_lazy=True)[0]["Text1"]
+
+
+def report(name: str, data: memoryview, read: callable, read_lazily: callable):
+    def measure(function: callable) -> float:
+        return min(timeit.repeat(function, number=N_OF_REPEATS, repeat=7)) / N_OF_REPEATS
+
+    full = measure(read)
+    print(f"{name} ({len(data)} bytes):")
+    print(f"    read: {full * 1e6:8.2f}us")
+    for mode, function in (("lazy", read_lazily), ("skip", lambda: nbt.skip_nbt(data))):
+        mode_time = measure(function)
+        print(f"    {mode}: {mode_time * 1e6:8.2f}us ({full / mode_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    assert read_chest() == read_chest_lazily() == "Sword of slot 13"
+    assert read_sign() == read_sign_lazily()
+    assert nbt.skip_nbt(CHEST) == len(CHEST) and nbt.skip_nbt(SIGN) == len(SIGN)
+
+    report("chest", CHEST, read_chest, read_chest_lazily)
+    report("sign", SIGN, read_sign, read_sign_lazily)
@@ -0,0 +1,111 @@
+"""
+Compare reading packet fields with misc.converters tuple API, PacketDataReader read_* methods
+and schema compiled decoders.
+
+Tuple API: value, data = extract_*(data) - new memoryview and tuple per field.
+Reader: PacketDataReader.read_*() - struct.unpack_from at integer offset.
+Schema: packet.schema.compile_schema - one unpack_from per run of fixed size fields.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_reader.py
+"""
+
+import timeit
+
+from misc import converters
+from packet.packet_data_reader import PacketDataReader
+from packet.schema import FieldType, compile_schema
+
+N_OF_REPEATS = 200000
+
+# Player Position And Look: 3 doubles, 2 floats, byte, VarInt.
+POSITION_AND_LOOK = memoryview(b''.join((converters.pack_double(1.5) * 3,
+                                         converters.pack_float(90.0) * 2,
+                                         converters.pack_byte(0),
+                                         converters.convert_to_varint(300))))
+# Join Game: int, unsigned byte, int, 2 unsigned bytes, string.
+JOIN_GAME = memoryview(b''.join((b'\x00\x00\x00\x01', b'\x01', b'\x00\x00\x00\x00', b'\x02\x14',
+                                 converters.pack_string("default"))))
+
+
+def tuple_position_and_look(data: memoryview):
+    x, data = converters.extract_double(data)
+    y, data = converters.extract_double(data)
+    z, data = converters.extract_double(data)
+    yaw, data = converters.extract_float(data)
+    pitch, data = converters.extract_float(data)
+    flags, data = converters.extract_byte(data)
+    teleport_id, _ = converters.extract_varint_as_int(data)
+    return x, y, z, yaw, pitch, flags, teleport_id
+
+
+def reader_position_and_look(reader: PacketDataReader):
+    return (reader.read_double(), reader.read_double(), reader.read_double(),
+            reader.read_float(), reader.read_float(), reader.read_byte(), reader.read_varint())
+
+
+POSITION_AND_LOOK_SCHEMA = compile_schema((("x", FieldType.DOUBLE), ("y", FieldType.DOUBLE),
+                                           ("z", FieldType.DOUBLE), ("yaw", FieldType.FLOAT),
+                                           ("pitch", FieldType.FLOAT), ("flags", FieldType.BYTE),
+                                           ("teleport_id", FieldType.VARINT)))
+
+
+def tuple_join_game(data: memoryview):
+    entity_id, data = converters.extract_int(data)
+    gamemode, data = converters.extract_unsigned_byte(data)
+    dimension, data = converters.extract_int(data)
+    difficulty, data = converters.extract_unsigned_byte(data)
+    data = data[1:]
+    level_type, _ = converters.extract_string_bytes(data)
+    return entity_id, gamemode, dimension, difficulty, level_type
+
+
+def reader_join_game(reader: PacketDataReader):
+    entity_id = reader.read_int()
+    gamemode = reader.read_unsigned_byte()
+    dimension = reader.read_int()
+    difficulty = reader.read_unsigned_byte()
+    reader.pos += 1
+    return entity_id, gamemode, dimension, difficulty, reader.read_string_bytes()
+
+
+JOIN_GAME_SCHEMA = compile_schema((("entity_id", FieldType.INT), ("gamemode", FieldType.UNSIGNED_BYTE),
+                                   ("dimension", FieldType.INT), ("difficulty", FieldType.UNSIGNED_BYTE),
+                                   ("max_players", FieldType.UNSIGNED_BYTE),
+                                   ("level_type", FieldType.STRING_BYTES)))
+
+
+class Target:
+    pass
+
+
+def measure(name: str, read_tuple: callable, read_reader: callable, schema: callable, packet: memoryview):
+    reader = PacketDataReader()
+    load = reader.load
+    target = Target()
+
+    def read_with_reader():
+        load(packet)
+        return read_reader(reader)
+
+    def read_with_schema():
+        load(packet)
+        schema(target, reader)
+
+    assert read_tuple(packet) == read_with_reader()
+    read_with_schema()
+    assert tuple(vars(target).values())[:4] == read_tuple(packet)[:4]
+
+    before = timeit.timeit(lambda: read_tuple(packet), number=N_OF_REPEATS) / N_OF_REPEATS
+    after = timeit.timeit(read_with_reader, number=N_OF_REPEATS) / N_OF_REPEATS
+    compiled = timeit.timeit(read_with_schema, number=N_OF_REPEATS) / N_OF_REPEATS
+    print(f"{name}:")
+    print(f"    tuple API: {before * 1e9:7.0f}ns")
+    print(f"    reader:    {after * 1e9:7.0f}ns ({before / after:.2f}x)")
+    print(f"    schema:    {compiled * 1e9:7.0f}ns ({before / compiled:.2f}x)")
+
+
+if __name__ == "__main__":
+    measure("Player Position And Look", tuple_position_and_look, reader_position_and_look,
+            POSITION_AND_LOOK_SCHEMA, POSITION_AND_LOOK)
+    measure("Join Game", tuple_join_game, reader_join_game, JOIN_GAME_SCHEMA, JOIN_GAME)
@@ -0,0 +1,88 @@
+"""
+Compare receiving packets using recv(1) per VarInt byte with FrameReader,
+and FrameReader with receiving into recycled slabs (ReceiveArena).
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_receive.py
+"""
+
+import queue
+import socket
+import threading
+import time
+from random import randint, seed
+
+from connection import Connection
+from misc.converters import convert_to_varint
+
+N_OF_PACKETS = 200000
+
+
+def prepare_stream(n_of_packets: int) -> bytes:
+    """Return framed packets, mostly small ones with some big chunk-like."""
+    seed(0)
+    packets = []
+    for idx in range(n_of_packets):
+        size = randint(2000, 20000) if idx % 100 == 0 else randint(3, 60)
+        packets.append(convert_to_varint(size) + b'\x01' * size)
+    return b''.join(packets)
+
+
+def consume(connection: Connection, received: queue.Queue, n_of_packets: [int, ]):
+    """Get packets until the end marker, release them like Game does."""
+    release_frame = connection.release_frame
+    while True:
+        packet = received.get()
+        if packet is None:
+            return
+        n_of_packets[0] += 1
+        release_frame(packet)
+
+
+def measure(use_buffered_receive: bool, stream: bytes, use_receive_arena: bool = False) -> float:
+    """Return time of receiving and consuming whole stream through Connection._listen."""
+    client, server = socket.socketpair()
+
+    connection = Connection()
+    connection._connection.close()
+    connection._connection = client
+    connection.use_buffered_receive = use_buffered_receive
+    connection.use_receive_arena = use_receive_arena
+
+    received = queue.Queue()
+    n_of_packets = [0]
+    consumer = threading.Thread(target=consume, args=(connection, received, n_of_packets), daemon=True)
+    sender = threading.Thread(target=lambda: (server.sendall(stream),
+                                              server.shutdown(socket.SHUT_WR)),
+                              daemon=True)
+
+    start = time.perf_counter()
+    sender.start()
+    consumer.start()
+    connection.start_listener(received)
+    connection._listener.join()
+    consumer.join()
+    elapsed = time.perf_counter() - start
+
+    assert n_of_packets[0] == N_OF_PACKETS
+    if use_receive_arena:
+        print(f"Arena slabs: {connection._arena.allocated_slabs} allocated, "
+              f"{connection._arena.reused_slabs} reused")
+
+    server.close()
+    connection.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    data = prepare_stream(N_OF_PACKETS)
+
+    legacy = measure(False, data)
+    buffered = measure(True, data)
+    arena = measure(True, data, use_receive_arena=True)
+
+    print(f"{N_OF_PACKETS} packets, {len(data)} bytes")
+    print(f"recv(1) per VarInt byte: {legacy:.3f}s ({N_OF_PACKETS / legacy:.0f} packets/s)")
+    print(f"FrameReader:             {buffered:.3f}s ({N_OF_PACKETS / buffered:.0f} packets/s)")
+    print(f"FrameReader + arena:     {arena:.3f}s ({N_OF_PACKETS / arena:.0f} packets/s)")
+    print(f"Speedup: {legacy / buffered:.2f}x, with arena: {legacy / arena:.2f}x")
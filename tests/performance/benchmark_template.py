@@ -0,0 +1,48 @@
+"""
+Compare encode cost of one move manager step (player position packet ready to send).
+
+Before: player_position creator, connection.frame_payload in the sender.
+After: PacketTemplate.create, connection.frame_packet in the sender returns it as it is.
+
+Creator is the same as in versions.v1_12_2.serverbound.packet_creator.play
+(which can not be imported without GUI).
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_template.py
+"""
+
+import struct
+import timeit
+
+from connection import frame_packet, frame_payload
+from packet.outbound_queue import CoalesceKey, PacketPriority, outbound_packet
+from packet.packet_template import PacketTemplate
+
+N_OF_REPEATS = 200000
+
+PLAYER_POSITION = b'\x0D'
+
+_PLAYER_POSITION = struct.Struct(f">{len(PLAYER_POSITION)}sddd?")
+
+
+@outbound_packet(PacketPriority.MOVEMENT, CoalesceKey.OWN_POSITION)
+def player_position(position: (float, float, float), on_ground: bool) -> bytes:
+    return _PLAYER_POSITION.pack(PLAYER_POSITION, position[0], position[1], position[2], on_ground)
+
+
+def best_time(function: callable) -> float:
+    return min(timeit.repeat(function, number=N_OF_REPEATS, repeat=5)) / N_OF_REPEATS
+
+
+if __name__ == "__main__":
+    for threshold in (-1, 256):
+        template = PacketTemplate(player_position, PLAYER_POSITION, "ddd?", threshold)
+        create = template.create
+        assert frame_packet(create(1.5, 64.0, -3.25, False), threshold) \
+               == frame_payload(player_position((1.5, 64.0, -3.25), False), threshold)
+
+        before = best_time(lambda: frame_payload(player_position((1.5, 64.0, -3.25), False), threshold))
+        after = best_time(lambda: frame_packet(create(1.5, 64.0, -3.25, False), threshold))
+        print(f"compression threshold {threshold}:")
+        print(f"    before: {before * 1e9:6.0f}ns")
+        print(f"    after:  {after * 1e9:6.0f}ns ({before / after:.2f}x)")
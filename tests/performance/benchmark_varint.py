@@ -0,0 +1,88 @@
+"""
+Compare VarInt codec with the previous per byte implementation.
+
+Before: struct.pack per encoded byte, extract_varint_as_int reslicing memoryview per VarInt.
+After: precomputed encodings of small values, decode_varint(s) at integer offset.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_varint.py
+"""
+
+import random
+import struct
+import timeit
+
+from misc import converters
+from misc.consts import MAX_INT, MAX_UINT
+from versions.base.data_structures.world.palette import IndirectPalette
+
+N_OF_REPEATS = 200000
+N_OF_PALETTE_REPEATS = 20000
+
+random.seed(0)
+# Palette of 8 bits per block section: up to 256 block states (id << 4 | metadata).
+PALETTE_ENTRIES = [random.randrange(1, 256) << 4 | random.randrange(16) for _ in range(256)]
+PALETTE = memoryview(b''.join(converters.convert_to_varint(value)
+                              for value in [len(PALETTE_ENTRIES)] + PALETTE_ENTRIES))
+
+
+def old_convert_to_varint(value: int) -> bytes:
+    varint = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value == 0:
+            varint.extend(struct.pack('B', byte))
+            return bytes(varint)
+        varint.extend(struct.pack('B', byte | 0x80))
+
+
+def old_extract_varint_as_int(data: memoryview) -> (int, memoryview):
+    number = 0
+    for i in range(5):
+        number |= (data[i] & 0x7F) << 7 * i
+        if not data[i] & 0x80:
+            break
+    else:
+        raise ValueError("VarInt is too big!")
+
+    if number > MAX_INT:
+        number -= MAX_UINT
+
+    return number, data[i + 1:]
+
+
+def old_load_palette(data: memoryview):
+    palette_length, data = old_extract_varint_as_int(data)
+
+    palette = [None] * palette_length
+    for idx in range(palette_length):
+        palette[idx], data = old_extract_varint_as_int(data)
+
+    return palette, data
+
+
+def report(name: str, before: callable, after: callable, number: int):
+    before_time = timeit.timeit(before, number=number) / number
+    after_time = timeit.timeit(after, number=number) / number
+    print(f"{name}:")
+    print(f"    before: {before_time * 1e9:9.0f}ns")
+    print(f"    after:  {after_time * 1e9:9.0f}ns ({before_time / after_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    for value in (1, 300, 25565, MAX_INT):
+        assert old_convert_to_varint(value) == converters.convert_to_varint(value)
+        report(f"encode {value}", lambda: old_convert_to_varint(value),
+               lambda: converters.convert_to_varint(value), N_OF_REPEATS)
+
+    for value in (1, 300, 25565, MAX_INT):
+        varint = memoryview(converters.convert_to_varint(value))
+        report(f"decode {value}", lambda: old_extract_varint_as_int(varint),
+               lambda: converters.decode_varint(varint, 0), N_OF_REPEATS)
+
+    palette = IndirectPalette(8)
+    assert bytes(palette.load(PALETTE)) == b''
+    assert list(palette.palette) == old_load_palette(PALETTE)[0] == PALETTE_ENTRIES
+    report(f"load palette of {len(PALETTE_ENTRIES)} entries", lambda: old_load_palette(PALETTE),
+           lambda: palette.load(PALETTE), N_OF_PALETTE_REPEATS)
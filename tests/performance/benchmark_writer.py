@@ -0,0 +1,165 @@
+"""
+Compare encode cost per serverbound packet.
+
+Payload - before: b''.join of per field struct.pack, after: one precompiled struct.Struct with packet id.
+Batch - before: frame_payload_parts (removed from connection) of every packet sent with one sendmsg,
+        after: PacketWriter.add_frame of every packet into one reusable buffer sent with one sendall.
+Single frames stay on connection.frame_payload, PacketWriter does not pay off for one packet.
+
+Creators are the same as in versions.v1_12_2.serverbound.packet_creator.play
+(which can not be imported without GUI), without outbound_packet copy.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/benchmark_writer.py
+"""
+
+import socket
+import struct
+import threading
+import timeit
+import zlib
+
+from misc import converters
+from packet.packet_writer import PacketWriter
+
+N_OF_REPEATS = 100000
+BATCH_SIZE = 64
+
+TELEPORT_CONFIRM = b'\x00'
+KEEP_ALIVE = b'\x0B'
+PLAYER_POSITION = b'\x0D'
+PLAYER_POSITION_AND_LOOK = b'\x0E'
+
+_PLAYER_POSITION = struct.Struct(f">{len(PLAYER_POSITION)}sddd?")
+_PLAYER_POSITION_AND_LOOK = struct.Struct(f">{len(PLAYER_POSITION_AND_LOOK)}sdddff?")
+
+
+def frame_payload_parts(payload: bytes, compression_threshold: int) -> (bytes, bytes):
+    """
+    Like connection.frame_payload, but does not join prefixes with (compressed) payload.
+
+    :param payload: b'VarInt(Packet ID)' + b'VarInt(Data)'
+    :param compression_threshold: negative when compression is disabled
+    :returns length and compression prefixes, (compressed) payload
+    """
+    to_varint = converters.convert_to_varint
+    payload_len = len(payload)
+
+    # Compression is disabled
+    if compression_threshold < 0:
+        return to_varint(payload_len), payload
+
+    # When compression disabled for this packet
+    if payload_len < compression_threshold:
+        return to_varint(payload_len + 1) + b'\x00', payload
+
+    # Compression is enabled
+    data_length = to_varint(payload_len)
+    payload = zlib.compress(payload)
+    return to_varint(len(data_length) + len(payload)) + data_length, payload
+
+
+def join_teleport_confirm(teleport_id: bytes) -> bytes:
+    return b''.join((TELEPORT_CONFIRM, teleport_id))
+
+
+def join_keep_alive(keep_alive_id: bytes) -> bytes:
+    return b''.join((KEEP_ALIVE, keep_alive_id))
+
+
+def join_player_position(position: (float, float, float), on_ground: bool) -> bytes:
+    return b''.join((PLAYER_POSITION,
+                     converters.pack_double(position[0]),
+                     converters.pack_double(position[1]),
+                     converters.pack_double(position[2]),
+                     converters.pack_bool(on_ground)))
+
+
+def join_player_position_and_look(position: (float, float, float), look: (float, float),
+                                  on_ground: bool) -> bytes:
+    return b''.join((PLAYER_POSITION_AND_LOOK,
+                     converters.pack_double(position[0]),
+                     converters.pack_double(position[1]),
+                     converters.pack_double(position[2]),
+                     converters.pack_float(look[0]),
+                     converters.pack_float(look[1]),
+                     converters.pack_bool(on_ground)))
+
+
+def teleport_confirm(teleport_id: bytes) -> bytes:
+    return TELEPORT_CONFIRM + teleport_id
+
+
+def keep_alive(keep_alive_id: bytes) -> bytes:
+    return KEEP_ALIVE + keep_alive_id
+
+
+def player_position(position: (float, float, float), on_ground: bool) -> bytes:
+    return _PLAYER_POSITION.pack(PLAYER_POSITION, position[0], position[1], position[2], on_ground)
+
+
+def player_position_and_look(position: (float, float, float), look: (float, float), on_ground: bool) -> bytes:
+    return _PLAYER_POSITION_AND_LOOK.pack(PLAYER_POSITION_AND_LOOK, position[0], position[1], position[2],
+                                          look[0], look[1], on_ground)
+
+
+def start_drained_socket() -> socket.socket:
+    sending, receiving = socket.socketpair()
+
+    def drain():
+        while receiving.recv(1 << 20):
+            pass
+
+    threading.Thread(target=drain, daemon=True).start()
+    return sending
+
+
+def best_time(function: callable, number: int = N_OF_REPEATS) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def report(name: str, before: float, after: float):
+    print(f"    {name:8} before: {before * 1e9:6.0f}ns, after: {after * 1e9:6.0f}ns ({before / after:.2f}x)")
+
+
+def measure(name: str, join_packet: callable, create_packet: callable, args: tuple, compression_threshold: int,
+            sending: socket.socket):
+    writer = PacketWriter()
+    payload = create_packet(*args)
+    assert join_packet(*args) == payload
+
+    def join_batch():
+        parts = []
+        for _ in range(BATCH_SIZE):
+            parts.extend(frame_payload_parts(join_packet(*args), compression_threshold))
+        sending.sendmsg(parts)
+
+    writer.clear()
+    writer.add_frame(payload, compression_threshold)
+    assert writer.get_frames() == b''.join(frame_payload_parts(payload, compression_threshold))
+
+    def write_batch():
+        writer.clear()
+        add_frame = writer.add_frame
+        for _ in range(BATCH_SIZE):
+            add_frame(create_packet(*args), compression_threshold)
+        sending.sendall(writer.get_frames())
+
+    print(f"{name}:")
+    report("payload", best_time(lambda: join_packet(*args)), best_time(lambda: create_packet(*args)))
+    report("batch", best_time(join_batch, N_OF_REPEATS // BATCH_SIZE) / BATCH_SIZE,
+           best_time(write_batch, N_OF_REPEATS // BATCH_SIZE) / BATCH_SIZE)
+
+
+if __name__ == "__main__":
+    socket_ = start_drained_socket()
+    for threshold in (-1, 256):
+        print(f"compression threshold: {threshold}")
+        measure("teleport_confirm", join_teleport_confirm, teleport_confirm,
+                (converters.convert_to_varint(300),), threshold, socket_)
+        measure("keep_alive", join_keep_alive, keep_alive, (b'\x00\x00\x00\x00\x00\x00\x04\xd2',), threshold,
+                socket_)
+        measure("player_position", join_player_position, player_position, ((1.5, 64.0, -3.25), True), threshold,
+                socket_)
+        measure("player_position_and_look", join_player_position_and_look, player_position_and_look,
+                ((1.5, 64.0, -3.25), (90.0, 0.0), True), threshold, socket_)
@@ -0,0 +1,351 @@
+"""
+Stand-in 1.12.2 server for load and latency testing, without network and real server.
+
+Logs every client in (handshake, login start, SetCompression, LoginSuccess),
+then sends JoinGame, PlayerPositionAndLook and chunks around the spawn,
+and keeps streaming KeepAlive, PlayerPositionAndLook and ChunkData at configurable rates.
+Records what clients send back, measures keep-alive round trip time.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/fake_server.py --port 25565
+"""
+
+import argparse
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+
+from connection import frame_payload
+from misc.converters import convert_to_varint, pack_string
+from packet.capture import CaptureWriter, Direction
+from packet.frame_reader import FrameReader
+from packet.packet_data_reader import PacketDataReader
+
+PROTOCOL_VERSION = 340
+
+# Clientbound.
+SET_COMPRESSION = b'\x03'
+LOGIN_SUCCESS = b'\x02'
+CHUNK_DATA = b'\x20'
+JOIN_GAME = b'\x23'
+KEEP_ALIVE = b'\x1f'
+PLAYER_POSITION_AND_LOOK = b'\x2f'
+
+# Serverbound play.
+KEEP_ALIVE_ID = 0x0B
+
+
+def create_chunk_data(chunk_x: int, chunk_z: int) -> bytes:
+    """Return ChunkData payload - ground-up chunk with the lowest section only (mask=1)."""
+    palette = (0, 1 << 4, 2 << 4, 3 << 4)  # Air, stone, grass, dirt.
+    # 4096 blocks, 4 bits per block => 256 longs.
+    longs = [random.getrandbits(64) & 0x3333333333333333 for _ in range(256)]
+
+    section = b''.join((
+        b'\x04',  # Bits per block.
+        convert_to_varint(len(palette)),
+        b''.join(map(convert_to_varint, palette)),
+        convert_to_varint(len(longs)),
+        struct.pack(f">{len(longs)}Q", *longs),
+        b'\xff' * 2048,  # Block light.
+        b'\xff' * 2048,  # Sky light.
+    ))
+    data = section + b'\x01' * 256  # Biomes.
+
+    return b''.join((CHUNK_DATA,
+                     struct.pack(">ii?", chunk_x, chunk_z, True),
+                     convert_to_varint(1),  # Primary bit mask.
+                     convert_to_varint(len(data)),
+                     data,
+                     convert_to_varint(0)))  # Number of block entities.
+
+
+class SessionStats:
+    """Statistics of one client."""
+
+    def __init__(self):
+        self.start_time: float = time.perf_counter()
+        self.end_time: float = 0.0
+        self.sent_packets: int = 0
+        self.sent_bytes: int = 0
+        self.received_packets: Counter = Counter()
+        self.received_bytes: int = 0
+        self.keep_alive_rtt: [float, ] = []
+
+    def report(self) -> str:
+        duration = (self.end_time or time.perf_counter()) - self.start_time
+        n_of_received = sum(self.received_packets.values())
+        rtt = self.keep_alive_rtt
+        rtt_info = (f"keep-alive rtt min/avg/max: {min(rtt) * 1000:.2f}/"
+                    f"{sum(rtt) / len(rtt) * 1000:.2f}/{max(rtt) * 1000:.2f} ms"
+                    if rtt else "keep-alive rtt: -")
+        return (f"{duration:.1f}s, "
+                f"sent {self.sent_packets} packets ({self.sent_packets / duration:.0f}/s, "
+                f"{self.sent_bytes} bytes), "
+                f"received {n_of_received} packets ({n_of_received / duration:.0f}/s, "
+                f"{self.received_bytes} bytes) "
+                f"{ {hex(packet_id): n for packet_id, n in self.received_packets.items()} }, "
+                f"{rtt_info}")
+
+
+class ClientHandler(socketserver.BaseRequestHandler):
+    """Serve one client: log in, then stream play packets until client disconnects or duration."""
+
+    server: "FakeServer"
+
+    def setup(self):
+        self.stats = SessionStats()
+        self.compression_threshold: int = -1
+        self.frame_reader: FrameReader = FrameReader(self.request.recv_into)
+        self.reader: PacketDataReader = PacketDataReader()
+        self.keep_alive_sent: {int: float} = {}
+        self.is_connected: bool = True
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            username = self._log_in()
+            if username is None:
+                return
+            threading.Thread(target=self._receive_play, daemon=True).start()
+            self._play()
+        except OSError:
+            pass
+        finally:
+            self.is_connected = False
+            self.stats.end_time = time.perf_counter()
+            self.server.add_session(self.client_address, self.stats)
+
+    def _send(self, payload: bytes):
+        frame = frame_payload(payload, self.compression_threshold)
+        self.request.sendall(frame)
+        self.stats.sent_packets += 1
+        self.stats.sent_bytes += len(frame)
+
+    def _receive(self) -> [memoryview, ]:
+        """Return uncompressed payloads of received packets, None when disconnected."""
+        frames = self.frame_reader.read_frames()
+        if frames is None:
+            return None
+
+        payloads = []
+        for frame in frames:
+            self.stats.received_bytes += len(frame)
+            self.reader.load(memoryview(frame))
+            payloads.append(self.reader.get_not_parsed_data())
+        return payloads
+
+    def _log_in(self) -> str:
+        """Run login sequence, return username or None on error."""
+        payloads = []
+        while len(payloads) < 2:
+            received = self._receive()
+            if received is None:
+                return None
+            payloads.extend(received)
+
+        handshake, login_start = payloads[:2]
+        if handshake[-1] != 2:  # Next state: login.
+            return None
+        username = bytes(login_start[2:]).decode()
+
+        threshold = self.server.compression_threshold
+        if threshold >= 0:
+            self._send(SET_COMPRESSION + convert_to_varint(threshold))
+            self.compression_threshold = threshold
+            self.reader.set_compression_threshold(threshold)
+
+        uuid = "00000000-0000-3000-8000-{:012x}".format(random.getrandbits(48))
+        self._send(LOGIN_SUCCESS + pack_string(uuid) + pack_string(username))
+        return username
+
+    def _play(self):
+        """Send spawn, then stream packets at configured rates."""
+        server = self.server
+        self._send(JOIN_GAME + struct.pack(">iBiBB", random.getrandbits(31), 0, 0, 1, 20)
+                   + pack_string("default") + b'\x00')
+        self._send_position()
+
+        radius = server.view_distance
+        for chunk_x in range(-radius, radius + 1):
+            for chunk_z in range(-radius, radius + 1):
+                self._send(create_chunk_data(chunk_x, chunk_z))
+
+        # (interval, function) streamed packets.
+        schedule = [[1 / rate, send] for rate, send in ((server.keep_alive_rate, self._send_keep_alive),
+                                                         (server.position_rate, self._send_position),
+                                                         (server.chunk_rate, self._send_chunk))
+                    if rate > 0]
+        now = time.perf_counter()
+        for event in schedule:
+            event.append(now + event[0])  # Next time.
+
+        end_time = now + server.duration if server.duration > 0 else float("inf")
+        while self.is_connected:
+            now = time.perf_counter()
+            if now >= end_time:
+                break
+
+            next_time = end_time
+            for event in schedule:
+                interval, send, event_time = event
+                if event_time <= now:
+                    send()
+                    event[2] = event_time = event_time + interval
+                next_time = min(next_time, event_time)
+
+            time.sleep(max(0.0, min(next_time - time.perf_counter(), 0.1)))
+
+        self.request.shutdown(socket.SHUT_RDWR)
+
+    def _send_keep_alive(self):
+        keep_alive_id = random.getrandbits(63)
+        self.keep_alive_sent[keep_alive_id] = time.perf_counter()
+        self._send(KEEP_ALIVE + struct.pack(">q", keep_alive_id))
+
+    def _send_position(self):
+        self._send(PLAYER_POSITION_AND_LOOK
+                   + struct.pack(">dddffb", 0.5, 64.0, 0.5, 0.0, 0.0, 0)
+                   + convert_to_varint(random.getrandbits(20)))
+
+    def _send_chunk(self):
+        radius = self.server.view_distance + 1
+        self._send(create_chunk_data(random.randint(-radius, radius), random.randint(-radius, radius)))
+
+    def _receive_play(self):
+        """Record packets sent by client, measure keep-alive round trip time."""
+        stats = self.stats
+        capture = self.server.capture
+        try:
+            while self.is_connected:
+                payloads = self._receive()
+                if payloads is None:
+                    break
+                now = time.perf_counter()
+                for payload in payloads:
+                    packet_id = payload[0]
+                    stats.received_packets[packet_id] += 1
+                    if capture is not None:
+                        capture.write(Direction.OUT, payload)
+                    if packet_id == KEEP_ALIVE_ID:
+                        keep_alive_id = struct.unpack_from(">q", payload, 1)[0]
+                        sent_time = self.keep_alive_sent.pop(keep_alive_id, None)
+                        if sent_time is not None:
+                            stats.keep_alive_rtt.append(now - sent_time)
+        except (OSError, ValueError):
+            pass
+        self.is_connected = False
+
+
+class FakeServer(socketserver.ThreadingTCPServer):
+    """Server streaming play packets to every connected client, see ClientHandler."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: (str, int),
+                 compression_threshold: int = 256,
+                 view_distance: int = 3,
+                 keep_alive_rate: float = 1.0,
+                 position_rate: float = 0.2,
+                 chunk_rate: float = 0.0,
+                 duration: float = 0.0,
+                 record_path: str = None,
+                 verbose: bool = True):
+        """
+        Create server, serve_forever() starts it.
+
+        :param address: (host, port), port 0 binds any free port (see server_address)
+        :param compression_threshold: negative disables compression
+        :param view_distance: chunks sent around the spawn (radius)
+        :param keep_alive_rate: KeepAlive packets per second
+        :param position_rate: PlayerPositionAndLook packets per second
+        :param chunk_rate: ChunkData packets per second after the spawn
+        :param duration: disconnect client after that many seconds, 0 means never
+        :param record_path: capture file recording packets sent by clients
+        :param verbose: print stats of every disconnected client
+        """
+        self.compression_threshold = compression_threshold
+        self.view_distance = view_distance
+        self.keep_alive_rate = keep_alive_rate
+        self.position_rate = position_rate
+        self.chunk_rate = chunk_rate
+        self.duration = duration
+        self.verbose = verbose
+
+        self.capture: CaptureWriter = None if record_path is None else CaptureWriter(record_path)
+        self.sessions: [SessionStats, ] = []
+        self._sessions_lock: threading.Lock = threading.Lock()
+
+        super().__init__(address, ClientHandler)
+
+    def add_session(self, client_address: (str, int), stats: SessionStats):
+        with self._sessions_lock:
+            self.sessions.append(stats)
+        if self.verbose:
+            print(f"{client_address}: {stats.report()}")
+
+    def report(self) -> str:
+        """Return summary of all finished sessions."""
+        with self._sessions_lock:
+            sessions = list(self.sessions)
+        if not sessions:
+            return "No finished sessions."
+
+        rtt = sorted(value for stats in sessions for value in stats.keep_alive_rtt)
+        sent = sum(stats.sent_packets for stats in sessions)
+        received = sum(sum(stats.received_packets.values()) for stats in sessions)
+        duration = max(stats.end_time for stats in sessions) - min(stats.start_time for stats in sessions)
+        rtt_info = (f"keep-alive rtt p50/p99/max: {rtt[len(rtt) // 2] * 1000:.2f}/"
+                    f"{rtt[int(len(rtt) * 0.99)] * 1000:.2f}/{rtt[-1] * 1000:.2f} ms"
+                    if rtt else "keep-alive rtt: -")
+        return (f"{len(sessions)} sessions in {duration:.1f}s, "
+                f"sent {sent} packets ({sent / duration:.0f}/s), "
+                f"received {received} packets ({received / duration:.0f}/s), {rtt_info}")
+
+    def server_close(self):
+        super().server_close()
+        if self.capture is not None:
+            self.capture.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=25565)
+    parser.add_argument("--threshold", type=int, default=256,
+                        help="compression threshold, negative disables compression")
+    parser.add_argument("--view-distance", type=int, default=3,
+                        help="radius of chunks sent around the spawn")
+    parser.add_argument("--keep-alive-rate", type=float, default=1.0, help="KeepAlive packets/s")
+    parser.add_argument("--position-rate", type=float, default=0.2, help="PlayerPositionAndLook packets/s")
+    parser.add_argument("--chunk-rate", type=float, default=0.0, help="ChunkData packets/s after spawn")
+    parser.add_argument("--duration", type=float, default=0.0,
+                        help="disconnect clients after that many seconds, 0 means never")
+    parser.add_argument("--record", default=None, help="capture file for packets sent by clients")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = FakeServer((args.host, args.port),
+                        compression_threshold=args.threshold,
+                        view_distance=args.view_distance,
+                        keep_alive_rate=args.keep_alive_rate,
+                        position_rate=args.position_rate,
+                        chunk_rate=args.chunk_rate,
+                        duration=args.duration,
+                        record_path=args.record)
+    print(f"Listening on {server.server_address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.report())
@@ -0,0 +1,63 @@
+"""
+Run N bots (AsyncGame, one event loop) against fake_server in one process.
+
+Reports packets/s, keep-alive round trip time and memory of the process.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient:tests/performance python tests/performance/load_test.py --clients 100
+"""
+
+import argparse
+import resource
+import threading
+import time
+
+from async_game import AsyncGame, start_games
+from data_structures.hero import Hero
+from data_structures.host import Host
+from fake_server import FakeServer
+from versions.version import CurrentVersion, VersionVersion
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of play per client")
+    parser.add_argument("--threshold", type=int, default=256)
+    parser.add_argument("--view-distance", type=int, default=3)
+    parser.add_argument("--keep-alive-rate", type=float, default=1.0)
+    parser.add_argument("--position-rate", type=float, default=0.2)
+    parser.add_argument("--chunk-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    CurrentVersion.select(VersionVersion.V1_12_2)
+
+    server = FakeServer(("127.0.0.1", 0),
+                        compression_threshold=args.threshold,
+                        view_distance=args.view_distance,
+                        keep_alive_rate=args.keep_alive_rate,
+                        position_rate=args.position_rate,
+                        chunk_rate=args.chunk_rate,
+                        duration=args.duration,
+                        verbose=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    games = [AsyncGame(Host(host, port), Hero(username=f"Bot{idx}")) for idx in range(args.clients)]
+
+    start = time.perf_counter()
+    start_games(games)
+    elapsed = time.perf_counter() - start
+
+    # Handlers record sessions after clients disconnect.
+    deadline = time.perf_counter() + 5
+    while len(server.sessions) < args.clients and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    server.shutdown()
+    server.server_close()
+
+    print(f"{args.clients} clients in {elapsed:.1f}s")
+    print(server.report())
+    # ru_maxrss is in kilobytes on Linux.
+    print(f"Peak memory of the process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
@@ -0,0 +1,44 @@
+"""
+Replay capture file recorded with Game.capture_path, measure (profile) parsing.
+
+Run from the repository root:
+    PYTHONPATH=MinecraftConsoleClient python tests/performance/replay_capture.py capture.bin
+"""
+
+import argparse
+import cProfile
+import pstats
+import time
+
+from data_structures.hero import Hero
+from data_structures.host import Host
+from game import Game
+from versions.version import CurrentVersion, VersionVersion
+
+
+def replay(path: str) -> (int, float):
+    """Return number of interpreted play packets and elapsed time of one replay."""
+    game = Game(Host("127.0.0.1", 25565), Hero(username="Bob"))
+    start = time.perf_counter()
+    n_of_packets = game.replay_capture(path)
+    return n_of_packets, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="capture file")
+    parser.add_argument("--repeat", type=int, default=5, help="number of replays")
+    parser.add_argument("--profile", action="store_true", help="print cProfile stats of the last replay")
+    args = parser.parse_args()
+
+    CurrentVersion.select(VersionVersion.V1_12_2)
+
+    for _ in range(args.repeat - args.profile):
+        packets, elapsed = replay(args.path)
+        print(f"{packets} packets in {elapsed:.3f}s ({packets / elapsed:.0f} packets/s)")
+
+    if args.profile:
+        profiler = cProfile.Profile()
+        profiler.runcall(replay, args.path)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
@@ -0,0 +1,43 @@
+import sys
+import types
+
+import pytest as pytest
+
+
+class HeadlessGUI:
+    """Records what would be shown by versions.v1_12_2.view.gui_tkinter.gui.GUI, without window."""
+
+    def __init__(self):
+        self.calls = []
+
+    def add_to_chat(self, message):
+        self.calls.append(("add_to_chat", message))
+
+    def add_to_hotbar(self, message):
+        self.calls.append(("add_to_hotbar", message))
+
+    def set_labels(self, *labels):
+        self.calls.append(("set_labels", labels))
+
+    def close(self):
+        pass
+
+
+# Packet handlers import gui from view, which opens Tk window (needs display).
+_view = types.ModuleType("versions.v1_12_2.view.view")
+_view.gui = HeadlessGUI()
+for _name in ("versions.v1_12_2.view.view", "MinecraftConsoleClient.versions.v1_12_2.view.view"):
+    sys.modules.setdefault(_name, _view)
+
+
+@pytest.fixture
+def gui() -> HeadlessGUI:
+    _view.gui.calls.clear()
+    return _view.gui
+
+
+@pytest.fixture
+def version_1_12_2():
+    # Game code imports versions.version from MinecraftConsoleClient directory.
+    from versions.version import CurrentVersion, VersionVersion
+    CurrentVersion.select(VersionVersion.V1_12_2)
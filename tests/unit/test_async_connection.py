@@ -0,0 +1,144 @@
+import asyncio
+import socket
+
+from MinecraftConsoleClient.async_connection import AsyncConnection
+from MinecraftConsoleClient.connection import frame_payload
+
+COMPRESSION_THRESHOLD = 64
+
+# Uncompressed and compressed (>= COMPRESSION_THRESHOLD) payloads.
+PAYLOADS = [b'\x1f' + bytes(8), b'\x20' + b'chunk' * 100, b'\x0f' + b'x' * 300, b'\x1f\x01', b'\x00']
+
+
+def run(coroutine_function: callable, handle_client: callable):
+    """Run coroutine_function(connection, received) against local server handling client with handle_client."""
+
+    async def main():
+        server = await asyncio.start_server(handle_client, "127.0.0.1", 0)
+        connection = AsyncConnection()
+        connection.compression_threshold = COMPRESSION_THRESHOLD
+        received = asyncio.Queue()
+        try:
+            await connection.connect(server.sockets[0].getsockname(), received)
+            return await asyncio.wait_for(coroutine_function(connection, received), 10)
+        finally:
+            connection.close()
+            server.close()
+
+    return asyncio.run(main())
+
+
+async def get_packets(received: asyncio.Queue) -> [bytes, ]:
+    """Return packets until None (end of connection)."""
+    packets = []
+    while (packet := await received.get()) is not None:
+        packets.append(bytes(packet))
+    return packets
+
+
+def serve_frames(data: bytes, chunk_size: int):
+    """Return client handler sending data in chunks of chunk_size bytes, then closing connection."""
+
+    async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for start in range(0, len(data), chunk_size):
+            writer.write(data[start:start + chunk_size])
+            await writer.drain()
+            await asyncio.sleep(0.001)
+        writer.close()
+
+    return handle_client
+
+
+def strip_length(frame: bytes) -> bytes:
+    """Return frame without VarInt length prefix."""
+    for idx, byte in enumerate(frame):
+        if not byte & 0x80:
+            return frame[idx + 1:]
+
+
+class TestAsyncConnection:
+    def test_framing_across_chunks(self):
+        data = b''.join(frame_payload(payload, COMPRESSION_THRESHOLD) for payload in PAYLOADS)
+        expected = [strip_length(frame_payload(payload, COMPRESSION_THRESHOLD)) for payload in PAYLOADS]
+
+        async def receive_all(connection, received):
+            return await get_packets(received)
+
+        for chunk_size in (1, 2, 3, 7, 100):
+            assert run(receive_all, serve_frames(data, chunk_size)) == expected
+
+    def test_packet_filter(self):
+        data = b''.join(frame_payload(payload, COMPRESSION_THRESHOLD) for payload in PAYLOADS)
+
+        async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            # Filter is set before anything arrives.
+            await reader.readexactly(1)
+            await serve_frames(data, 100)(reader, writer)
+
+        async def receive_with_filter(connection, received):
+            connection.set_packet_filter(frozenset((0x1f, 0x0f)))
+            connection._protocol.transport.write(b'\x00')
+            return await get_packets(received), connection.dropped_packets
+
+        packets, dropped_packets = run(receive_with_filter, handle_client)
+
+        # Compressed packets are passed (id is not known without inflating), game reader filters them.
+        assert packets == [strip_length(frame_payload(payload, COMPRESSION_THRESHOLD)) for payload in PAYLOADS[:4]]
+        assert dropped_packets == 1
+
+    def test_send_backpressure(self):
+        payload = b'\x09' + bytes(range(256)) * 256
+        state = {}
+
+        async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            # Does not read until client is blocked.
+            await state["is_reading"].wait()
+            state["received"] = await reader.read(-1)
+            state["is_received"].set()
+            writer.close()
+
+        async def send_until_blocked(connection):
+            connection.compression_threshold = -1
+            connection._protocol.transport.set_write_buffer_limits(high=4096)
+
+            sent = 0
+            while True:
+                sending = asyncio.ensure_future(connection.send(payload))
+                # Not blocked send returns in the first step of the task.
+                await asyncio.sleep(0)
+                sent += 1
+                if not sending.done():
+                    break
+                assert sent < 10000, "send never waited for the transport"
+
+            # Server starts reading, transport write buffer drains, send returns.
+            state["is_reading"].set()
+            await asyncio.wait_for(sending, 5)
+            connection.close()
+            await state["is_received"].wait()
+            return sent
+
+        async def main():
+            state["is_reading"], state["is_received"] = asyncio.Event(), asyncio.Event()
+            server = await asyncio.start_server(handle_client, "127.0.0.1", 0)
+            connection = AsyncConnection()
+            try:
+                await connection.connect(server.sockets[0].getsockname(), asyncio.Queue())
+                return await asyncio.wait_for(send_until_blocked(connection), 10)
+            finally:
+                server.close()
+
+        sent = asyncio.run(main())
+
+        assert sent > 1
+        assert state["received"] == frame_payload(payload, -1) * sent
+
+    def test_end_of_connection(self):
+        async def receive_all(connection, received):
+            return await get_packets(received), connection.is_closing()
+
+        async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            writer.close()
+
+        assert run(receive_all, handle_client) == ([], True)
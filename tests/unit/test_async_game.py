@@ -0,0 +1,77 @@
+import asyncio
+import struct
+
+from MinecraftConsoleClient.connection import frame_payload
+from MinecraftConsoleClient.misc.converters import convert_to_varint, pack_string
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+
+COMPRESSION_THRESHOLD = 64
+ENTITY_ID = 1
+KEEP_ALIVE_ID = struct.pack(">q", 1234)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """Return frame without VarInt length prefix."""
+    length, shift = 0, 0
+    while True:
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return await reader.readexactly(length)
+        shift += 7
+
+
+def payload_of(frame: bytes, compression_threshold: int) -> bytes:
+    reader = PacketDataReader()
+    reader.set_compression_threshold(compression_threshold)
+    reader.load(memoryview(frame))
+    return bytes(reader.get_not_parsed_data())
+
+
+class FakeServer:
+    """Logs client in, sends JoinGame and KeepAlive, records frames sent back until client answers keep alive."""
+
+    def __init__(self):
+        self.login_payloads = []
+        self.play_payloads = []
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        for _ in range(2):  # Handshake, login start.
+            self.login_payloads.append(payload_of(await read_frame(reader), -1))
+
+        writer.write(frame_payload(b'\x03' + convert_to_varint(COMPRESSION_THRESHOLD), -1))
+        for payload in (b'\x02' + pack_string("uuid") + pack_string("Bob"),
+                        b'\x23' + struct.pack(">iBiBB", ENTITY_ID, 1, 0, 1, 20) + pack_string("flat") + b'\x00',
+                        b'\x1f' + KEEP_ALIVE_ID):
+            writer.write(frame_payload(payload, COMPRESSION_THRESHOLD))
+        await writer.drain()
+
+        while not self.play_payloads or self.play_payloads[-1][0] != 0x0b:
+            self.play_payloads.append(payload_of(await read_frame(reader), COMPRESSION_THRESHOLD))
+        writer.close()
+
+
+class TestAsyncGame:
+    def test_login_and_play(self, version_1_12_2, gui):
+        from async_game import AsyncGame
+        from data_structures.hero import Hero
+        from data_structures.host import Host
+
+        fake_server = FakeServer()
+
+        async def main():
+            server = await asyncio.start_server(fake_server.handle_client, "127.0.0.1", 0)
+            game_ = AsyncGame(Host("127.0.0.1", server.sockets[0].getsockname()[1]), Hero("Bob"))
+            try:
+                return game_, await asyncio.wait_for(game_.start(), 10)
+            finally:
+                server.close()
+
+        game_, result = asyncio.run(main())
+
+        assert result == "Received 0 bytes"
+        assert fake_server.login_payloads[1] == b'\x00' + pack_string("Bob")
+        # Login packets set compression, JoinGame and KeepAlive are dispatched through play packets_specifics.
+        assert game_.data.world_data.compression_threshold == COMPRESSION_THRESHOLD
+        assert game_.data.hero.entity_id == ENTITY_ID
+        assert fake_server.play_payloads[-1] == b'\x0b' + KEEP_ALIVE_ID
@@ -0,0 +1,44 @@
+import pytest as pytest
+
+from MinecraftConsoleClient.packet.capture import CaptureReader, CaptureWriter, Direction
+
+
+class TestCapture:
+    def test_write_and_read(self, tmp_path):
+        path = str(tmp_path / "capture.bin")
+
+        capture = CaptureWriter(path)
+        capture.write_frames(Direction.IN, [b'\x00\x1f\x01', b'\x03\x40'])
+        capture.write(Direction.OUT, b'\x0b\x01')
+        capture.close()
+
+        # Appends to existing capture.
+        capture = CaptureWriter(path)
+        capture.write(Direction.IN, b'\x00\x23')
+        capture.close()
+
+        with CaptureReader(path) as capture:
+            records = [(direction, bytes(frame)) for _, direction, frame in capture]
+            frames = [bytes(frame) for frame in capture.frames(Direction.IN)]
+
+        assert records == [(Direction.IN, b'\x00\x1f\x01'), (Direction.IN, b'\x03\x40'),
+                           (Direction.OUT, b'\x0b\x01'), (Direction.IN, b'\x00\x23')]
+        assert frames == [b'\x00\x1f\x01', b'\x03\x40', b'\x00\x23']
+
+    def test_truncated_record(self, tmp_path):
+        path = tmp_path / "capture.bin"
+        capture = CaptureWriter(str(path))
+        capture.write(Direction.IN, b'\x01' * 10)
+        capture.write(Direction.IN, b'\x02' * 10)
+        capture.close()
+        path.write_bytes(path.read_bytes()[:-1])
+
+        with CaptureReader(str(path)) as capture:
+            assert [bytes(frame) for frame in capture.frames()] == [b'\x01' * 10]
+
+    def test_not_capture_file(self, tmp_path):
+        path = tmp_path / "capture.bin"
+        path.write_bytes(b'not a capture')
+
+        with pytest.raises(ValueError):
+            CaptureReader(str(path))
@@ -0,0 +1,75 @@
+import json
+
+import pytest as pytest
+
+from MinecraftConsoleClient.misc import converters
+from MinecraftConsoleClient.misc.chat import ANSI_RESET, clear_cache, decode_chat, flatten, get_cache_stats
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+
+CHAT = {"translate": "chat.type.text",
+        "with": [{"text": "Bob", "color": "gold", "clickEvent": {"action": "suggest_command", "value": "/msg Bob "}},
+                 "hello ", ]}
+
+
+class TestFlatten:
+    @pytest.mark.parametrize("component, text", [
+        ("plain", "plain"),
+        ({"text": "a", "extra": ["b", {"text": "c", "extra": [{"text": "d"}]}]}, "abcd"),
+        (["a", {"text": "b"}, ["c"]], "abc"),
+        (CHAT, "<Bob> hello "),
+        ({"translate": "multiplayer.player.joined", "with": [{"text": "Alice"}]}, "Alice joined the game"),
+        ({"translate": "unknown.key", "with": ["x", {"text": "y"}]}, "unknown.key x y"),
+        ({"translate": "chat.type.text", "with": ["only one"]}, "<only one> "),
+        ({"text": "§6gold§r and §lbold"}, "gold and bold"),
+        ({"score": {"name": "Bob", "objective": "kills", "value": "7"}}, "7"),
+        ({"keybind": "key.jump"}, "key.jump"),
+        ({"text": 5}, "5"),
+    ])
+    def test_text(self, component, text):
+        assert flatten(component) == text
+
+    def test_positional_arguments(self, monkeypatch):
+        from MinecraftConsoleClient.misc import chat
+        monkeypatch.setitem(chat.TRANSLATIONS, "test.positional", "%2$s before %1$s, 100%%")
+
+        assert flatten({"translate": "test.positional", "with": ["a", "b"]}) == "b before a, 100%"
+
+    def test_styled(self):
+        component = {"text": "a", "color": "red", "bold": True,
+                     "extra": [{"text": "b", "bold": False}, {"text": "c", "color": "unknown"}]}
+
+        assert flatten(component, is_styled=True) \
+               == "\033[0;91;1ma" + "\033[0;91mb" + "\033[0;1mc" + ANSI_RESET
+        assert flatten({"text": "§ax"}, is_styled=True) == "\033[0m\033[92mx" + ANSI_RESET
+        assert flatten("", is_styled=True) == ""
+
+
+class TestDecodeChat:
+    def setup_method(self):
+        clear_cache()
+
+    def test_cache(self):
+        raw = json.dumps(CHAT).encode()
+
+        assert decode_chat(raw) == decode_chat(memoryview(raw)) == decode_chat(bytearray(raw)) == "<Bob> hello "
+        assert decode_chat(raw, is_styled=True) == flatten(CHAT, is_styled=True)
+
+        assert get_cache_stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5, "size": 2}
+
+    def test_cache_key_is_copied(self):
+        data = bytearray(b'"first"')
+        assert decode_chat(memoryview(data)) == "first"
+
+        data[1:6] = b'other'
+
+        assert decode_chat(memoryview(data)) == "other"
+
+    def test_empty_cache(self):
+        assert get_cache_stats() == {"hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0}
+
+    def test_reader(self):
+        reader = PacketDataReader()
+        reader.load(memoryview(converters.pack_string(json.dumps(CHAT)) + b'\x01'))
+
+        assert reader.read_chat() == "<Bob> hello "
+        assert reader.read_byte() == 1
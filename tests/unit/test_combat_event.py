@@ -0,0 +1,59 @@
+import logging
+import struct
+from types import SimpleNamespace
+
+import pytest as pytest
+
+from MinecraftConsoleClient.misc import converters
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+from MinecraftConsoleClient.versions.v1_12_2.packet.clientbound.play import CombatEvent
+
+HERO_ID = 7
+DEATH_MESSAGE = '{"translate": "death.attack.player", "with": [{"text": "Bob"}]}'
+
+
+def entity_dead(player_id: int, entity_id: int) -> PacketDataReader:
+    reader = PacketDataReader()
+    reader.load(memoryview(converters.convert_to_varint(2) + converters.convert_to_varint(player_id)
+                           + struct.pack(">i", entity_id) + converters.pack_string(DEATH_MESSAGE)))
+    return reader
+
+
+@pytest.fixture
+def game_() -> SimpleNamespace:
+    deaths = []
+    return SimpleNamespace(data=SimpleNamespace(hero=SimpleNamespace(entity=SimpleNamespace(id_=HERO_ID))),
+                           on_death=lambda: deaths.append(True), deaths=deaths)
+
+
+class TestCombatEvent:
+    def test_message_of_other_entity_is_not_decoded(self, game_, gui, caplog):
+        packet = CombatEvent()
+        packet.read_data(entity_dead(12, 13))
+
+        with caplog.at_level(logging.WARNING, logger="mainLogger"):
+            packet.default_handler(game_)
+
+        assert "message" not in packet.__dict__
+        assert gui.calls == [] and game_.deaths == []
+
+    def test_message_of_other_entity_is_logged(self, game_, gui, caplog):
+        packet = CombatEvent()
+        packet.read_data(entity_dead(12, 13))
+
+        with caplog.at_level(logging.INFO, logger="mainLogger"):
+            packet.default_handler(game_)
+
+        assert "Entity: 12 has been killed by: 13" in caplog.text and "Bob was slain by" in caplog.text
+        assert len(gui.calls) == 1 and gui.calls[0][0] == "add_to_hotbar"
+        assert game_.deaths == []
+
+    def test_hero_death(self, game_, gui):
+        packet = CombatEvent()
+        packet.read_data(entity_dead(12, HERO_ID))
+
+        packet.default_handler(game_)
+
+        assert game_.deaths == [True]
+        assert len(gui.calls) == 1 and gui.calls[0][0] == "add_to_hotbar"
+        assert "Bob was slain by" in gui.calls[0][1]
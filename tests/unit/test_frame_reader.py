@@ -0,0 +1,111 @@
+from random import randint, seed
+
+import pytest as pytest
+
+from MinecraftConsoleClient.misc.consts import MAX_FRAME_SIZE
+from MinecraftConsoleClient.misc.converters import convert_to_varint
+from MinecraftConsoleClient.packet.frame_reader import FrameReader, peek_packet_id
+
+
+def frame(payload: bytes) -> bytes:
+    return convert_to_varint(len(payload)) + payload
+
+
+class ChunkedStream:
+    """Imitate socket.recv_into returning data in given chunk sizes."""
+
+    def __init__(self, data: bytes, chunk_sizes: [int, ]):
+        self.data = data
+        self.chunk_sizes = list(chunk_sizes)
+
+    def recv_into(self, buffer: memoryview) -> int:
+        if not self.data:
+            return 0
+        size = min(self.chunk_sizes.pop(0) if self.chunk_sizes else len(self.data),
+                   len(buffer), len(self.data))
+        buffer[:size] = self.data[:size]
+        self.data = self.data[size:]
+        return size
+
+
+class TestFrameReader:
+    @staticmethod
+    def _read_all(reader: FrameReader) -> [bytes, ]:
+        result = []
+        while True:
+            frames = reader.read_frames()
+            if frames is None:
+                return result
+            result.extend(frames)
+
+    def test_many_frames_in_one_fill(self):
+        payloads = [bytes([i]) * (i + 1) for i in range(100)]
+        stream = ChunkedStream(b''.join(map(frame, payloads)), [])
+
+        reader = FrameReader(stream.recv_into)
+
+        assert reader.read_frames() == payloads
+        assert reader.read_frames() is None
+
+    def test_frames_split_byte_by_byte(self):
+        payloads = [b'\x01' * 200, b'\x02' * 3, b'\x03' * 70000]
+        data = b''.join(map(frame, payloads))
+        stream = ChunkedStream(data, [1] * len(data))
+
+        assert self._read_all(FrameReader(stream.recv_into, buffer_size=16)) == payloads
+
+    def test_random_split_and_growth(self):
+        seed(0)
+        payloads = [bytes([randint(0, 255)]) * randint(1, 5000) for _ in range(500)]
+        data = b''.join(map(frame, payloads))
+        stream = ChunkedStream(data, [randint(1, 3000) for _ in range(len(data))])
+
+        assert self._read_all(FrameReader(stream.recv_into, buffer_size=64)) == payloads
+
+    def test_buffered_protocol_interface(self):
+        payloads = [b'abc', b'\x00' * 300]
+        data = b''.join(map(frame, payloads))
+
+        reader = FrameReader(buffer_size=8)
+        frames = []
+        while data:
+            buffer = reader.get_buffer()
+            size = min(len(buffer), len(data))
+            buffer[:size] = data[:size]
+            data = data[size:]
+            frames.extend(reader.buffer_updated(size))
+
+        assert frames == payloads
+
+    def test_invalid_length(self):
+        stream = ChunkedStream(b'\xff\xff\xff\xff\xff\x01', [])
+        with pytest.raises(ValueError):
+            FrameReader(stream.recv_into).read_frames()
+
+    def test_too_big_length(self):
+        reader = FrameReader(ChunkedStream(convert_to_varint(MAX_FRAME_SIZE + 1) + b'\x00', []).recv_into)
+        with pytest.raises(ValueError):
+            reader.read_frames()
+        # Buffer has not grown to fit the packet.
+        assert len(reader.get_buffer()) < MAX_FRAME_SIZE
+
+    def test_max_length(self):
+        payload = b'\x1f' * MAX_FRAME_SIZE
+        assert self._read_all(FrameReader(ChunkedStream(frame(payload), []).recv_into)) == [payload]
+
+    def test_zero_length(self):
+        stream = ChunkedStream(b'\x00', [])
+        with pytest.raises(ValueError):
+            FrameReader(stream.recv_into).read_frames()
+
+
+class TestPeekPacketId:
+    @pytest.mark.parametrize("frame, is_compression_enabled, packet_id", (
+            (b'\x1f\x01\x02', False, 0x1F),
+            (b'\x80\x01', False, 0x80),
+            (b'\x00\x1f\x01', True, 0x1F),
+            (b'\x90\x03\x78\x9c', True, None),  # Compressed.
+            (b'\x00\x80', True, None),  # Incomplete VarInt.
+    ))
+    def test_peek(self, frame, is_compression_enabled, packet_id):
+        assert peek_packet_id(frame, is_compression_enabled) == packet_id
@@ -0,0 +1,178 @@
+import queue
+import random
+import time
+import zlib
+from concurrent.futures import Future
+
+import pytest as pytest
+
+from MinecraftConsoleClient.misc.converters import convert_to_varint
+from MinecraftConsoleClient.packet import inflate_stage
+from MinecraftConsoleClient.packet.inflate_stage import InflateMeasurement, InflateStage
+from MinecraftConsoleClient.packet.receive_queue import ReceiveQueue
+from MinecraftConsoleClient.packet.packet_data_reader import SkipStats
+
+COMPRESSION_THRESHOLD = 256
+SIZE_CUTOFF = 1024
+
+
+def frame(packet_id: int, size: int) -> bytes:
+    """Return frame (without length prefix) of packet with packet_id, compressed when size >= threshold."""
+    # Random bytes do not compress, size of frame is about size of packet.
+    payload = bytes((packet_id, )) + random.Random(size).randbytes(size - 1)
+    if size < COMPRESSION_THRESHOLD:
+        return b'\x00' + payload
+    return convert_to_varint(size) + zlib.compress(payload)
+
+
+def collect(stage: InflateStage) -> list:
+    """Return packets of inflated queue until None, Futures resolved, skipped packets omitted."""
+    items = []
+    while True:
+        item = stage.inflated.get(timeout=5)
+        if item is None:
+            return items
+        if item.__class__ is Future:
+            item = item.result()
+        if item is not None:
+            items.append(item)
+
+
+@pytest.fixture
+def received():
+    return queue.Queue()
+
+
+def start_stage(received: queue.Queue, **kwargs) -> InflateStage:
+    stage = InflateStage(received, workers=2, size_cutoff=SIZE_CUTOFF, **kwargs)
+    assert stage.start(COMPRESSION_THRESHOLD)
+    return stage
+
+
+class TestInflateStage:
+    def test_order_is_kept(self, received):
+        sizes = (200000, 10, 300, 50000, 20, 100000, 2000, 5)
+        frames = [frame(packet_id, size) for packet_id, size in enumerate(sizes)]
+        stage = start_stage(received)
+
+        for data in frames:
+            received.put(data)
+        received.put(b'')
+
+        items = collect(stage)
+        assert [(item[0], len(item)) for item in items] == list(enumerate(sizes))
+
+    def test_size_cutoff(self, received):
+        big, small = frame(1, 100000), frame(2, 300)
+        assert len(big) > SIZE_CUTOFF >= len(small)
+        stage = start_stage(received)
+
+        received.put(big)
+        received.put(small)
+        received.put(b'')
+
+        assert stage.inflated.get(timeout=5).__class__ is Future
+        assert stage.inflated.get(timeout=5).__class__ is memoryview
+        assert stage.inflated.get(timeout=5) is None
+
+    def test_packet_filter(self, received):
+        skip_stats = SkipStats()
+        stage = start_stage(received, packet_filter=frozenset((0x20, )), skip_stats=skip_stats)
+
+        for packet_id, size in ((0x21, 100000), (0x20, 100000), (0x21, 300), (0x21, 10), (0x20, 10)):
+            received.put(frame(packet_id, size))
+        received.put(b'')
+
+        # Big skipped packet is Future returning None, small ones are not put at all.
+        skipped = stage.inflated.get(timeout=5)
+        assert skipped.__class__ is Future and skipped.result() is None
+        assert [item[0] for item in collect(stage)] == [0x20, 0x20]
+        assert skip_stats.skipped_packets == 0
+        assert skip_stats.merged().skipped_packets == 3
+
+    def test_release_frame(self, received):
+        released = []
+        stage = start_stage(received, packet_filter=frozenset((0x20, )), release_frame=released.append)
+        frames = [frame(0x20, 100000), frame(0x21, 100000), frame(0x20, 10), frame(0x21, 10)]
+
+        for data in frames:
+            received.put(data)
+        received.put(b'')
+        items = collect(stage)
+
+        assert sorted(map(id, released)) == sorted(map(id, frames))
+        # Not compressed packet is copied, frame may be reused after release.
+        assert bytes(items[1]) == frames[2][1:] and items[1].obj is not frames[2]
+
+    @pytest.mark.parametrize("data", [
+        b'\xff\xff\xff\xff\xff\xff' + bytes(2000),
+        convert_to_varint(5000) + zlib.compress(bytes(4000)),
+        convert_to_varint(300) + b'not zlib',
+    ])
+    def test_invalid_packet(self, received, data):
+        stage = start_stage(received)
+
+        received.put(data)
+        received.put(frame(0x20, 10))
+        received.put(b'')
+
+        item = stage.inflated.get(timeout=5)
+        with pytest.raises(inflate_stage.InvalidUncompressedPacketError):
+            item.result()
+        # Stage keeps working, game decides what to do.
+        assert bytes(stage.inflated.get(timeout=5))[0] == 0x20
+
+    def test_metrics(self):
+        received = ReceiveQueue(100)
+        frames = [frame(0x20, 100000), frame(0x21, 100000), frame(0x20, 300), frame(0x21, 10)]
+        stage = start_stage(received, packet_filter=frozenset((0x20, )), collect_metrics=True)
+
+        for data in frames:
+            received.put(data)
+        received.put(b'')
+
+        items = [stage.inflated.get(timeout=5) for _ in frames]
+        assert stage.inflated.get(timeout=5) is None
+
+        # Every packet is put with its measurement, skipped ones too.
+        packet_ids = []
+        for data, (item, measurement) in zip(frames, items):
+            if item.__class__ is Future:
+                item = item.result()
+            packet_ids.append(None if item is None else item[0])
+            assert isinstance(measurement, InflateMeasurement)
+            assert measurement.wire_bytes == len(data)
+            assert measurement.inflate_time > 0.0 and measurement.ready_time > 0.0
+            assert measurement.received_wait_time >= 0.0
+            assert measurement.get_queue_wait_time(measurement.ready_time) == measurement.received_wait_time
+        assert packet_ids == [0x20, None, 0x20, None]
+
+    def test_shutdown(self, received):
+        stage = start_stage(received)
+
+        received.put(frame(1, 100000))
+        received.put(None)
+
+        assert stage.inflated.get(timeout=5).result()[0] == 1
+        assert stage.inflated.get(timeout=5) is None
+        stage._thread.join(5)
+        assert not stage._thread.is_alive()
+
+    def test_stop_with_full_inflated_queue(self, received):
+        stage = start_stage(received, max_inflated=2)
+
+        for packet_id in range(6):
+            received.put(frame(packet_id, 100000))
+        # Nobody gets inflated packets, stage waits for free space.
+        while not stage.inflated.full():
+            time.sleep(0.001)
+
+        assert stage.stop()
+        assert not stage._thread.is_alive()
+        assert stage.inflated.empty()
+
+    def test_stop_waiting_for_received(self, received):
+        stage = start_stage(received)
+
+        assert stage.stop()
+        assert not stage._thread.is_alive()
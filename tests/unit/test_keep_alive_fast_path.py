@@ -0,0 +1,62 @@
+import queue
+import socket
+
+import pytest as pytest
+
+from MinecraftConsoleClient.connection import Connection, frame_payload
+from MinecraftConsoleClient.packet.frame_reader import FrameReader
+
+KEEP_ALIVE_ID = b'\x00\x00\x00\x00\x00\x00\x04\xd2'
+
+
+def keep_alive_response(keep_alive_id: bytes) -> bytes:
+    return b'\x0b' + keep_alive_id
+
+
+@pytest.fixture
+def connection_pair():
+    client, server = socket.socketpair()
+    connection = Connection()
+    connection._connection.close()
+    connection._connection = client
+    yield connection, server
+    server.close()
+    connection.close()
+
+
+class TestKeepAliveFastPath:
+    @pytest.mark.parametrize("compression_threshold", [-1, 64])
+    def test_listener_answers_keep_alive(self, connection_pair, compression_threshold):
+        connection, server = connection_pair
+        connection.compression_threshold = compression_threshold
+        connection.enable_keep_alive_fast_path(0x1F, keep_alive_response)
+
+        received = queue.Queue()
+        connection.start_listener(received)
+        server.sendall(frame_payload(b'\x1f' + KEEP_ALIVE_ID, compression_threshold))
+
+        # Keep alive still gets to the game.
+        packet = received.get(timeout=5)
+        assert bytes(packet).endswith(b'\x1f' + KEEP_ALIVE_ID)
+
+        server.settimeout(5)
+        response = FrameReader(server.recv_into).read_frames()
+        assert [bytes(frame) for frame in response] \
+               == [frame_payload(keep_alive_response(KEEP_ALIVE_ID), compression_threshold)[1:]]
+
+        assert connection.pop_keep_alive_time(KEEP_ALIVE_ID) is not None
+        assert connection.pop_keep_alive_time(KEEP_ALIVE_ID) is None
+
+    def test_other_packets_are_not_answered(self, connection_pair):
+        connection, server = connection_pair
+        connection.compression_threshold = 64
+        connection.enable_keep_alive_fast_path(0x1F, keep_alive_response)
+
+        received = queue.Queue()
+        connection.start_listener(received)
+        server.sendall(frame_payload(b'\x1e' + KEEP_ALIVE_ID, 64)
+                       + frame_payload(b'\x1f' + KEEP_ALIVE_ID + b'\x00', 64))
+
+        assert received.get(timeout=5) is not None
+        assert received.get(timeout=5) is not None
+        assert connection.pop_keep_alive_time(KEEP_ALIVE_ID) is None
@@ -0,0 +1,34 @@
+import json
+
+from MinecraftConsoleClient.misc.metrics import PacketMetrics
+
+
+class TestPacketMetrics:
+    def test_snapshot(self, tmp_path):
+        metrics = PacketMetrics()
+        keep_alive = metrics.get(0x1F)
+        keep_alive.count += 2
+        keep_alive.wire_bytes += 20
+        metrics.get(None).count += 1
+        metrics.get(0x20).default_handler_time += 0.5
+
+        assert metrics.get(0x1F) is keep_alive
+
+        packets = metrics.snapshot()["packets"]
+        assert list(packets) == ["skipped", "0x1f", "0x20"]
+        assert packets["0x1f"]["count"] == 2
+        assert packets["0x1f"]["wire_bytes"] == 20
+        assert packets["0x20"]["default_handler_time"] == 0.5
+        assert packets["0x20"]["pre_handler_time"] == packets["0x20"]["post_handler_time"] == 0.0
+
+        path = tmp_path / "metrics.json"
+        metrics.dump_json(str(path))
+        assert json.loads(path.read_text())["packets"] == packets
+
+    def test_reset(self):
+        metrics = PacketMetrics()
+        metrics.get(0x1F).count += 1
+
+        metrics.reset()
+
+        assert metrics.snapshot()["packets"] == {}
@@ -0,0 +1,176 @@
+import struct
+from array import array
+from collections.abc import Mapping, Sequence
+
+import pytest as pytest
+
+from MinecraftConsoleClient.misc import nbt
+from MinecraftConsoleClient.misc.nbt import LazyCompound, LazyList, read_nbt, skip_nbt
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+
+
+def pack_name(name: str) -> bytes:
+    raw = name.encode()
+    return struct.pack(">H", len(raw)) + raw
+
+
+def pack_named(tag_type: int, name: str, payload: bytes) -> bytes:
+    return bytes((tag_type, )) + pack_name(name) + payload
+
+
+def pack_compound(*entries: bytes) -> bytes:
+    return b''.join(entries) + b'\x00'
+
+
+def pack_list(tag_type: int, *payloads: bytes) -> bytes:
+    return struct.pack(">Bi", tag_type, len(payloads)) + b''.join(payloads)
+
+
+ITEM = pack_compound(pack_named(nbt.TAG_STRING, "id", pack_name("minecraft:stone")),
+                     pack_named(nbt.TAG_BYTE, "Count", b'\x40'),
+                     pack_named(nbt.TAG_SHORT, "Damage", struct.pack(">h", -1)))
+
+CHEST = pack_named(nbt.TAG_COMPOUND, "", pack_compound(
+    pack_named(nbt.TAG_INT, "x", struct.pack(">i", -7)),
+    pack_named(nbt.TAG_LONG, "seed", struct.pack(">q", 2 ** 40)),
+    pack_named(nbt.TAG_FLOAT, "f", struct.pack(">f", 0.5)),
+    pack_named(nbt.TAG_DOUBLE, "d", struct.pack(">d", -1.25)),
+    pack_named(nbt.TAG_BYTE_ARRAY, "bytes", struct.pack(">i", 3) + b'abc'),
+    pack_named(nbt.TAG_INT_ARRAY, "ints", struct.pack(">i3i", 3, 1, -2, 3)),
+    pack_named(nbt.TAG_LONG_ARRAY, "longs", struct.pack(">i2q", 2, -1, 2 ** 62)),
+    pack_named(nbt.TAG_LIST, "doubles", pack_list(nbt.TAG_DOUBLE, struct.pack(">d", 1), struct.pack(">d", 2))),
+    pack_named(nbt.TAG_LIST, "empty", pack_list(nbt.TAG_END)),
+    pack_named(nbt.TAG_LIST, "Items", pack_list(nbt.TAG_COMPOUND, ITEM, ITEM)),
+    pack_named(nbt.TAG_LIST, "lines", pack_list(nbt.TAG_STRING, pack_name("a"), pack_name("ż"))),
+))
+
+ITEM_DICT = {"id": "minecraft:stone", "Count": 64, "Damage": -1}
+CHEST_DICT = {"x": -7, "seed": 2 ** 40, "f": 0.5, "d": -1.25, "bytes": b'abc', "ints": [1, -2, 3],
+              "longs": [-1, 2 ** 62], "doubles": [1.0, 2.0], "empty": [], "Items": [ITEM_DICT, ITEM_DICT],
+              "lines": ["a", "ż"]}
+
+
+def as_plain(value):
+    if isinstance(value, Mapping):
+        return {name: as_plain(value[name]) for name in value}
+    if isinstance(value, memoryview):
+        return bytes(value)
+    if isinstance(value, array):
+        return value.tolist()
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return [as_plain(element) for element in value]
+    return value
+
+
+class TestReadNbt:
+    def test_types(self):
+        data = memoryview(CHEST + b'\x01')
+        value, offset = read_nbt(data)
+
+        assert offset == len(CHEST)
+        assert as_plain(value) == CHEST_DICT
+        assert isinstance(value["bytes"], memoryview) and value["bytes"].obj is data.obj
+
+    def test_offset(self):
+        data = memoryview(b'\x01\x02' + CHEST)
+
+        assert read_nbt(data, 2)[1] == len(data)
+        assert skip_nbt(data, 2) == len(data)
+
+    def test_no_nbt(self):
+        assert read_nbt(memoryview(b'\x00\x01')) == (None, 1)
+        assert skip_nbt(memoryview(b'\x00\x01')) == 1
+
+    def test_modified_utf8(self):
+        # NUL as 2 bytes and U+1F600 as surrogate pair, like Java writes them.
+        raw = b'a\xc0\x80\xed\xa0\xbd\xed\xb8\x80'
+        data = memoryview(pack_named(nbt.TAG_STRING, "", struct.pack(">H", len(raw)) + raw))
+
+        assert read_nbt(data)[0] == "a\x00\U0001F600"
+
+    @pytest.mark.parametrize("data", [
+        CHEST[:-1],
+        CHEST[:20],
+        pack_named(nbt.TAG_STRING, "", struct.pack(">H", 5) + b'abc'),
+        pack_named(nbt.TAG_BYTE_ARRAY, "", struct.pack(">i", -1)),
+        pack_named(nbt.TAG_LIST, "", struct.pack(">Bi", nbt.TAG_INT, -1)),
+        pack_named(13, "", b''),
+    ])
+    def test_invalid(self, data):
+        for decode in (read_nbt, skip_nbt, lambda data_: read_nbt(data_, is_lazy=True)):
+            with pytest.raises((ValueError, IndexError, struct.error)):
+                decode(memoryview(data))
+
+    @pytest.mark.parametrize("tag_type", (nbt.TAG_STRING, nbt.TAG_COMPOUND, nbt.TAG_LIST, nbt.TAG_END, nbt.TAG_LONG))
+    @pytest.mark.parametrize("is_in_compound", (False, True))
+    def test_huge_list_length(self, tag_type, is_in_compound):
+        # Truncated list declaring 2 ** 31 - 1 elements, has to fail before allocating them.
+        data = pack_named(nbt.TAG_LIST, "", struct.pack(">Bi", tag_type, 2 ** 31 - 1) + b'\x00\x01')
+        if is_in_compound:
+            data = pack_named(nbt.TAG_COMPOUND, "", data)
+        data = memoryview(data)
+
+        for decode in (read_nbt, skip_nbt, lambda data_: read_nbt(data_, is_lazy=True)):
+            with pytest.raises(ValueError, match="exceeds data"):
+                decode(data)
+
+
+class TestLazyCompound:
+    def test_access(self):
+        compound, offset = read_nbt(memoryview(CHEST), is_lazy=True)
+
+        assert offset == len(CHEST)
+        assert isinstance(compound, LazyCompound)
+        assert len(compound) == len(CHEST_DICT) and list(compound) == list(CHEST_DICT)
+        assert "Items" in compound and "missing" not in compound
+        assert compound.get_tag_type("Items") == nbt.TAG_LIST
+
+        items = compound["Items"]
+        assert isinstance(items, LazyList) and len(items) == 2
+        assert items[-1]["Count"] == 64
+        assert isinstance(items[0], LazyCompound) and items[0] is items[0]
+        assert compound["Items"] is items
+        assert isinstance(compound["lines"], list) and isinstance(compound["doubles"], list)
+
+        assert as_plain(compound.to_dict()) == CHEST_DICT
+        with pytest.raises(KeyError):
+            compound["missing"]
+
+    def test_list(self):
+        nested = pack_list(nbt.TAG_LIST, pack_list(nbt.TAG_COMPOUND, ITEM), pack_list(nbt.TAG_INT))
+        data = memoryview(pack_named(nbt.TAG_LIST, "", nested) + b'\x01')
+
+        lists, offset = read_nbt(data, is_lazy=True)
+
+        assert offset == len(data) - 1
+        assert lists[1] == [] and lists[0][0]["id"] == "minecraft:stone"
+        assert as_plain(lists[:]) == as_plain(lists.to_list()) == [[ITEM_DICT], []]
+
+    def test_values_are_not_decoded(self, monkeypatch):
+        compound = read_nbt(memoryview(CHEST), is_lazy=True)[0]
+
+        decoded = []
+        read_payload = nbt._read_payload
+        monkeypatch.setattr(nbt, "_read_payload", lambda *args: decoded.append(args[2]) or read_payload(*args))
+
+        assert compound["x"] == -7
+        assert decoded == [nbt.TAG_INT]
+
+
+class TestReader:
+    def test_read(self):
+        reader = PacketDataReader()
+        reader.load(memoryview(CHEST + CHEST + b'\x00\x05'))
+
+        assert as_plain(reader.read_nbt()) == CHEST_DICT
+        assert as_plain(reader.read_nbt(is_lazy=False)) == CHEST_DICT
+        assert reader.read_nbt() is None
+        assert reader.read_byte() == 5
+
+    def test_skip(self):
+        reader = PacketDataReader()
+        reader.load(memoryview(CHEST + b'\x05'))
+
+        reader.skip_nbt()
+
+        assert reader.read_byte() == 5
@@ -0,0 +1,98 @@
+import asyncio
+
+from MinecraftConsoleClient.packet.outbound_queue import CoalesceKey, OutboundQueue, \
+    PacketPriority, PriorityDeque, outbound_packet
+
+
+@outbound_packet(PacketPriority.CONTROL)
+def control(data: bytes) -> bytes:
+    return b'\x0b' + data
+
+
+@outbound_packet(PacketPriority.MOVEMENT)
+def movement(data: bytes) -> bytes:
+    return b'\x0d' + data
+
+
+@outbound_packet(PacketPriority.MOVEMENT, CoalesceKey.OWN_POSITION)
+def position(data: bytes) -> bytes:
+    return b'\x0d' + data
+
+
+@outbound_packet(PacketPriority.MOVEMENT, CoalesceKey.OWN_LOOK)
+def look(data: bytes) -> bytes:
+    return b'\x0f' + data
+
+
+class TestOutboundQueue:
+    def test_outbound_packet(self):
+        packet = control(b'\x01')
+
+        assert packet == b'\x0b\x01'
+        assert packet.priority == PacketPriority.CONTROL
+        assert control.priority == PacketPriority.CONTROL
+        assert control.__name__ == "control"
+
+    def test_strict_priority(self):
+        to_send = OutboundQueue()
+        for idx in range(3):
+            to_send.put(movement(bytes([idx])))
+        to_send.put(b'\x02default')
+        to_send.put(control(b'\x01'))
+        to_send.put(control(b'\x02'))
+
+        assert to_send.qsize() == 6
+        assert [to_send.get_nowait() for _ in range(6)] == [
+            b'\x0b\x01', b'\x0b\x02', b'\x02default', b'\x0d\x00', b'\x0d\x01', b'\x0d\x02']
+        assert to_send.empty()
+
+    def test_coalescing(self):
+        to_send = OutboundQueue()
+        to_send.put(position(b'\x00'))
+        to_send.put(look(b'\x00'))
+        to_send.put(position(b'\x01'))
+        to_send.put(control(b'\x00'))
+        to_send.put(position(b'\x02'))
+
+        assert to_send.qsize() == 3
+        assert to_send.unfinished_tasks == 3
+        assert list(to_send.queue) == [b'\x0b\x00', b'\x0f\x00', b'\x0d\x02']
+        assert [to_send.get_nowait() for _ in range(3)] == [b'\x0b\x00', b'\x0f\x00', b'\x0d\x02']
+        assert to_send.empty()
+        assert to_send.coalesced == {CoalesceKey.OWN_POSITION: 2}
+
+        to_send.put(position(b'\x03'))
+        assert to_send.get_nowait() == b'\x0d\x03'
+
+    def test_discard(self):
+        to_send = OutboundQueue()
+        to_send.put(position(b'\x00'))
+        to_send.put(movement(b'\x00'))
+        to_send.put(look(b'\x00'))
+        to_send.put(position(b'\x01'))
+        to_send.put(control(b'\x00'))
+
+        assert to_send.discard(CoalesceKey.OWN_POSITION, CoalesceKey.OWN_LOOK) == 2
+        assert to_send.discard(CoalesceKey.OWN_POSITION_AND_LOOK) == 0
+
+        assert to_send.qsize() == to_send.unfinished_tasks == 2
+        assert [to_send.get_nowait() for _ in range(2)] == [b'\x0b\x00', b'\x0d\x00']
+        assert to_send.empty()
+        # Discarded packets are not counted as coalesced.
+        assert to_send.coalesced == {CoalesceKey.OWN_POSITION: 1}
+
+        to_send.put(position(b'\x02'))
+        assert to_send.get_nowait() == b'\x0d\x02'
+
+    def test_asyncio_queue(self):
+        class SendQueue(asyncio.Queue):
+            def _init(self, maxsize):
+                self._queue = PriorityDeque()
+
+        async def put_and_get() -> [bytes, ]:
+            to_send = SendQueue()
+            to_send.put_nowait(movement(b'\x00'))
+            to_send.put_nowait(control(b'\x00'))
+            return [await to_send.get(), await to_send.get()]
+
+        assert asyncio.run(put_and_get()) == [b'\x0b\x00', b'\x0d\x00']
@@ -0,0 +1,214 @@
+import threading
+import zlib
+
+import pytest as pytest
+
+from MinecraftConsoleClient.misc import converters
+from MinecraftConsoleClient.misc.converters import convert_to_varint
+from MinecraftConsoleClient.packet import packet_data_reader
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+
+
+def compressed_packet(payload: bytes, data_length: int = None) -> memoryview:
+    if data_length is None:
+        data_length = len(payload)
+    return memoryview(convert_to_varint(data_length) + zlib.compress(payload))
+
+
+class TestDecompress:
+    @staticmethod
+    def _reader(compression_threshold: int = 256) -> PacketDataReader:
+        reader = PacketDataReader()
+        reader.set_compression_threshold(compression_threshold)
+        return reader
+
+    @pytest.mark.parametrize("size", (256, 300, 0x8000 - 1, 0x8000, 100000))
+    def test_inflate(self, size):
+        payload = bytes(i & 0xFF for i in range(size))
+        reader = self._reader()
+
+        reader.load(compressed_packet(payload))
+
+        assert reader.get_not_parsed_data() == payload
+
+    def test_not_compressed(self):
+        reader = self._reader()
+
+        reader.load(memoryview(b'\x00\x1f' + b'\x01' * 8))
+
+        assert reader.extract_packet_id() == 0x1F
+
+    @pytest.mark.parametrize("data_length", (255, 301, PacketDataReader.max_packet_size + 1))
+    def test_invalid_data_length(self, data_length):
+        reader = self._reader()
+
+        with pytest.raises(packet_data_reader.InvalidUncompressedPacketError):
+            reader.load(compressed_packet(b'\x01' * 300, data_length))
+
+    def test_longer_than_data_length(self):
+        # About 10 KB compressed, would inflate into 10 MB.
+        packet = compressed_packet(b'\x01' * 10_000_000, 300)
+        reader = self._reader()
+
+        with pytest.raises(packet_data_reader.InvalidUncompressedPacketError):
+            reader.load(packet)
+
+    def test_truncated_stream(self):
+        packet = compressed_packet(bytes(range(256)) * 4)
+
+        with pytest.raises(packet_data_reader.InvalidUncompressedPacketError):
+            self._reader().load(packet[:-4])
+
+    def test_decompressor_is_reused(self):
+        reader = self._reader()
+        decompressor = reader._decompressor
+
+        for payload in (b'\x01' * 300, b'\x02' * 5000):
+            reader.load(compressed_packet(payload))
+            assert reader.get_not_parsed_data() == payload
+        assert reader._decompressor is decompressor
+
+    def test_corrupted_data(self):
+        packet = bytearray(compressed_packet(b'\x01' * 300))
+        packet[5:9] = b'\xff\xff\xff\xff'
+
+        with pytest.raises(packet_data_reader.InvalidUncompressedPacketError):
+            self._reader().load(memoryview(packet))
+
+
+class TestPacketFilter:
+    @staticmethod
+    def _reader(compression_threshold: int = 256) -> PacketDataReader:
+        reader = PacketDataReader()
+        reader.set_compression_threshold(compression_threshold)
+        reader.set_packet_filter(frozenset((0x1F, 0x20)))
+        return reader
+
+    def test_skip_big_compressed_without_inflating(self):
+        reader = self._reader()
+        packet = compressed_packet(b'\x19' + b'\x01' * 5000)
+
+        assert reader.load(packet) is False
+        assert reader.skip_stats.skipped_packets == 1
+        assert reader.skip_stats.skipped_compressed_bytes == len(packet) - 2
+        assert reader.skip_stats.skipped_inflated_bytes == 5001
+        assert reader.skip_stats.inflated_bytes == 0
+
+    def test_load_wanted_compressed(self):
+        reader = self._reader()
+        payload = b'\x20' + b'\x01' * 5000
+
+        assert reader.load(compressed_packet(payload)) is True
+        assert reader.get_not_parsed_data() == payload
+        assert reader.skip_stats.inflated_bytes == len(payload)
+
+    def test_skip_small_compressed_after_inflating(self):
+        reader = self._reader()
+
+        assert reader.load(compressed_packet(b'\x19' + b'\x01' * 300)) is False
+        assert reader.skip_stats.skipped_packets == 1
+        assert reader.skip_stats.skipped_inflated_bytes == 0
+
+    def test_not_compressed(self):
+        reader = self._reader()
+
+        assert reader.load(memoryview(b'\x00\x19' + b'\x01' * 8)) is False
+        assert reader.load(memoryview(b'\x00\x1f' + b'\x01' * 8)) is True
+        assert reader.extract_packet_id() == 0x1F
+
+    def test_compression_disabled(self):
+        reader = self._reader(-1)
+
+        assert reader.load(memoryview(b'\x19\x01')) is False
+        assert reader.load(memoryview(b'\x20\x01')) is True
+
+    def test_filter_disabled(self):
+        reader = self._reader()
+        reader.set_packet_filter(None)
+
+        assert reader.load(compressed_packet(b'\x19' + b'\x01' * 5000)) is True
+        assert reader.skip_stats.skipped_packets == 0
+
+
+class TestSkipStats:
+    def test_parts_from_threads(self):
+        skip_stats = packet_data_reader.SkipStats()
+        packet = compressed_packet(b'\x19' + b'\x01' * 5000)
+
+        def skip_packets():
+            reader = PacketDataReader()
+            reader.set_compression_threshold(256)
+            reader.set_packet_filter(frozenset((0x1F, )), skip_stats.create_part())
+            for _ in range(200):
+                reader.load(packet)
+
+        threads = [threading.Thread(target=skip_packets) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        merged = skip_stats.merged()
+        assert skip_stats.skipped_packets == 0
+        assert merged.skipped_packets == 800
+        assert merged.skipped_inflated_bytes == 800 * 5001
+        assert "skipped packets: 800" in repr(skip_stats)
+
+
+class TestReadMethods:
+    @staticmethod
+    def _reader(data: bytes) -> PacketDataReader:
+        reader = PacketDataReader()
+        reader.load(memoryview(data))
+        return reader
+
+    @pytest.mark.parametrize("value", (0, 1, 127, 128, 255, 25565, 2097151, 2147483647, -1, -2147483648))
+    def test_read_varint(self, value):
+        reader = self._reader(convert_to_varint(value) + b'\xff')
+
+        assert reader.read_varint() == value
+        assert reader.get_not_parsed_data() == b'\xff'
+
+    def test_read_varint_too_big(self):
+        with pytest.raises(ValueError):
+            self._reader(b'\xff' * 6).read_varint()
+
+    def test_read_sequence(self):
+        data = b''.join((converters.pack_bool(True),
+                         converters.pack_byte(-5),
+                         converters.pack_unsigned_short(65535),
+                         converters.pack_long(-(1 << 40)),
+                         converters.pack_float(1.5),
+                         converters.pack_double(-2.25),
+                         converters.pack_string("zażółć"),
+                         b'\x01\x02'))
+        reader = self._reader(data)
+
+        assert reader.read_bool() is True
+        assert reader.read_byte() == -5
+        assert reader.read_unsigned_short() == 65535
+        assert reader.read_long() == -(1 << 40)
+        assert reader.read_float() == 1.5
+        assert reader.read_double() == -2.25
+        assert reader.read_string() == "zażółć"
+        assert reader.read_rest() == b'\x01\x02'
+        assert reader.get_not_parsed_data() == b''
+
+    @pytest.mark.parametrize("value", (0, 1, -1, 0x7fffffffffffffff, -0x8000000000000000, 0x123456789abcdef))
+    def test_read_position_like_extract(self, value):
+        data = converters.pack_long(value)
+
+        position = self._reader(data).read_position()
+        expected = converters.extract_position(memoryview(data))[0]
+
+        assert (position.x, position.y, position.z) == (expected.x, expected.y, expected.z)
+
+    def test_read_after_decompress(self):
+        reader = PacketDataReader()
+        reader.set_compression_threshold(16)
+        payload = b'\x1f' + converters.pack_double(3.5) * 10
+
+        reader.load(compressed_packet(payload))
+
+        assert reader.extract_packet_id() == 0x1F
+        assert [reader.read_double() for _ in range(10)] == [3.5] * 10
@@ -0,0 +1,84 @@
+import struct
+
+import pytest as pytest
+
+from MinecraftConsoleClient.connection import frame_packet, frame_payload
+from MinecraftConsoleClient.packet.outbound_queue import CoalesceKey, OutboundQueue, PacketPriority, \
+    outbound_packet
+from MinecraftConsoleClient.packet.packet_template import PacketTemplate, get_payload
+from MinecraftConsoleClient.packet.packet_writer import PacketWriter
+
+PLAYER_POSITION = b'\x0d'
+
+
+@outbound_packet(PacketPriority.MOVEMENT, CoalesceKey.OWN_POSITION)
+def player_position(position: (float, float, float), on_ground: bool) -> bytes:
+    return PLAYER_POSITION + struct.pack(">ddd?", *position, on_ground)
+
+
+POSITIONS = [((1.5, 64.0, -3.25), False), ((-1e6, 255.0, 0.1), True)]
+
+
+class TestPacketTemplate:
+    @pytest.mark.parametrize("compression_threshold", [-1, 0, 27, 256])
+    def test_create_is_the_same_as_framed_creator(self, compression_threshold):
+        template = PacketTemplate(player_position, PLAYER_POSITION, "ddd?", compression_threshold)
+
+        for position, on_ground in POSITIONS:
+            packet = template.create(*position, on_ground)
+            payload = player_position(position, on_ground)
+
+            assert frame_packet(packet, compression_threshold) == frame_payload(payload, compression_threshold)
+            assert get_payload(packet) == payload
+            assert packet.priority == PacketPriority.MOVEMENT
+            assert packet.coalesce_key == CoalesceKey.OWN_POSITION
+
+    def test_is_framed(self):
+        assert PacketTemplate(player_position, PLAYER_POSITION, "ddd?", -1).is_framed
+        assert PacketTemplate(player_position, PLAYER_POSITION, "ddd?", 256).is_framed
+        # 26 bytes long payload is compressed.
+        assert not PacketTemplate(player_position, PLAYER_POSITION, "ddd?", 26).is_framed
+        assert PacketTemplate(player_position, PLAYER_POSITION, "ddd?", 27).is_framed
+
+    def test_framed_packet_is_sent_as_it_is(self):
+        packet = PacketTemplate(player_position, PLAYER_POSITION, "ddd?", 256).create(1.0, 2.0, 3.0, True)
+
+        assert frame_packet(packet, 256) is packet
+
+    def test_reframed_when_compression_threshold_changed(self):
+        packet = PacketTemplate(player_position, PLAYER_POSITION, "ddd?", -1).create(1.0, 2.0, 3.0, True)
+        payload = player_position((1.0, 2.0, 3.0), True)
+
+        for compression_threshold in (0, 256):
+            assert frame_packet(packet, compression_threshold) == frame_payload(payload, compression_threshold)
+
+    def test_created_packets_do_not_change(self):
+        template = PacketTemplate(player_position, PLAYER_POSITION, "ddd?", 256)
+
+        packets = [template.create(*position, on_ground) for position, on_ground in POSITIONS]
+
+        assert [get_payload(packet) for packet in packets] \
+               == [player_position(position, on_ground) for position, on_ground in POSITIONS]
+
+    def test_coalesced_with_payloads(self):
+        to_send = OutboundQueue()
+        template = PacketTemplate(player_position, PLAYER_POSITION, "ddd?", 256)
+
+        to_send.put(player_position((1.0, 2.0, 3.0), True))
+        to_send.put(template.create(4.0, 5.0, 6.0, True))
+
+        assert to_send.qsize() == 1
+        assert get_payload(to_send.get_nowait()) == player_position((4.0, 5.0, 6.0), True)
+
+    @pytest.mark.parametrize("compression_threshold", [-1, 0, 256])
+    def test_writer(self, compression_threshold):
+        writer = PacketWriter(16)
+        packets = [PacketTemplate(player_position, PLAYER_POSITION, "ddd?", threshold).create(1.0, 2.0, 3.0, True)
+                   for threshold in (-1, 0, 256)]
+
+        for packet in packets:
+            writer.add_frame(packet, compression_threshold)
+
+        assert writer.get_frames() == b''.join(frame_packet(packet, compression_threshold) for packet in packets)
+        assert writer.get_frames() \
+               == frame_payload(player_position((1.0, 2.0, 3.0), True), compression_threshold) * 3
@@ -0,0 +1,55 @@
+import pytest as pytest
+
+from MinecraftConsoleClient.connection import frame_payload
+from MinecraftConsoleClient.packet.packet_writer import PacketWriter
+
+PAYLOADS = [b'\x0b' + b'\x01' * 8, b'\x0e' * 255, b'\x0e' * 256,
+            b'\x00' + bytes(range(200)) * 3, b'\x0d' + b'\x00' * 100000]
+
+
+def write_frames(writer: PacketWriter, payloads: list, compression_threshold: int) -> bytes:
+    writer.clear()
+    for payload in payloads:
+        writer.add_frame(payload, compression_threshold)
+    return bytes(writer.get_frames())
+
+
+class TestPacketWriter:
+    @pytest.mark.parametrize("compression_threshold", [-1, 0, 64, 256, 1 << 20])
+    @pytest.mark.parametrize("payload", PAYLOADS)
+    def test_frame_is_the_same_as_frame_payload(self, payload, compression_threshold):
+        writer = PacketWriter(16)
+
+        assert write_frames(writer, [payload], compression_threshold) \
+               == frame_payload(payload, compression_threshold)
+        assert write_frames(writer, [memoryview(payload)], compression_threshold) \
+               == frame_payload(payload, compression_threshold)
+
+    @pytest.mark.parametrize("compression_threshold", [-1, 64])
+    def test_frames_are_written_one_after_another(self, compression_threshold):
+        writer = PacketWriter(16)
+
+        assert write_frames(writer, PAYLOADS, compression_threshold) \
+               == b''.join(frame_payload(payload, compression_threshold) for payload in PAYLOADS)
+
+        writer.clear()
+        assert writer.get_frames() == b''
+
+    def test_buffer_is_reused(self):
+        writer = PacketWriter(1024)
+        write_frames(writer, PAYLOADS[:2], 64)
+        buffer = writer.buffer
+
+        write_frames(writer, PAYLOADS[1:3], -1)
+
+        assert writer.buffer is buffer
+
+    def test_grow_with_view_alive(self):
+        writer = PacketWriter(16)
+        writer.add_frame(PAYLOADS[0], -1)
+        frames = writer.get_frames()
+
+        writer.add_frame(PAYLOADS[3], -1)
+
+        assert frames == frame_payload(PAYLOADS[0], -1)
+        assert writer.get_frames() == frame_payload(PAYLOADS[0], -1) + frame_payload(PAYLOADS[3], -1)
@@ -0,0 +1,46 @@
+import struct
+from types import SimpleNamespace
+
+from MinecraftConsoleClient.data_structures.position import Position
+from MinecraftConsoleClient.misc import converters
+from MinecraftConsoleClient.packet.outbound_queue import OutboundQueue
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+from MinecraftConsoleClient.versions.v1_12_2.serverbound.packet_creator import play
+
+PLAYER_POSITION_AND_LOOK = 0x2F
+TELEPORT_ID = 5
+
+
+def teleport(x: float, y: float, z: float) -> PacketDataReader:
+    reader = PacketDataReader()
+    reader.load(memoryview(struct.pack(">dddffb", x, y, z, 0.0, 0.0, 0) + converters.convert_to_varint(TELEPORT_ID)))
+    return reader
+
+
+def create_game() -> SimpleNamespace:
+    hero = SimpleNamespace(entity=SimpleNamespace(position=Position(0, 64, 0), look=SimpleNamespace(yaw=0, pitch=0)))
+    return SimpleNamespace(data=SimpleNamespace(hero=hero, world_data=SimpleNamespace()),
+                           to_send_packets=OutboundQueue())
+
+
+class TestPlayerPositionAndLook:
+    def test_queued_movement_is_discarded(self, version_1_12_2, gui):
+        game_ = create_game()
+        to_send = game_.to_send_packets
+        to_send.put(play.player_position((1, 64, 0), True))
+        to_send.put(play.player_position_and_look((1, 64, 0), (90, 0), True))
+        to_send.put(play.player_look((90, 0), True))
+        to_send.put(play.keep_alive(memoryview(bytes(8))))
+
+        from versions.v1_12_2.packet.clientbound import packets
+
+        packet = type(packets["play"][PLAYER_POSITION_AND_LOOK])()
+        packet.read_data(teleport(10, 70, 10))
+        packet.default_handler(game_)
+
+        position = game_.data.hero.entity.position
+        assert (position.x, position.y, position.z) == (10, 70, 10)
+        # Stale steps are not sent after the confirm, other packets are kept.
+        assert to_send.qsize() == to_send.unfinished_tasks == 3
+        assert [to_send.get_nowait()[0] for _ in range(3)] == [0x0b, 0x00, 0x0e]
+        assert to_send.empty()
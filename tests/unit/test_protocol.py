@@ -0,0 +1,124 @@
+import json
+import os
+import types
+
+import pytest as pytest
+
+from MinecraftConsoleClient.misc import converters
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+from MinecraftConsoleClient.packet.protocol import generate_packets, get_handled, has_handler, load_protocol
+# The same module as the one imported by packet.protocol.
+from MinecraftConsoleClient.packet.protocol import FieldType, SchemaReader, compile_schema
+
+PROTOCOL_1_12_2 = os.path.join(os.path.dirname(__file__), "..", "..", "MinecraftConsoleClient", "versions",
+                               "v1_12_2", "packet", "clientbound", "protocol.json")
+
+
+class Base(SchemaReader):
+    def pre_handler(self, game_):
+        pass
+
+    def default_handler(self, game_):
+        pass
+
+    def post_handler(self, game_):
+        pass
+
+
+class Handled(Base):
+    """Hand-written."""
+
+    @property
+    def is_big(self) -> bool:
+        return self.value > 100
+
+    def default_handler(self, game_):
+        return self.value
+
+
+class OwnReadData(Base):
+    def read_data(self, reader: PacketDataReader):
+        self.data = bytes(reader.get_not_parsed_data())
+        self.read_schema(reader)
+
+
+HANDLERS = types.ModuleType("handlers")
+HANDLERS.Handled = Handled
+HANDLERS.OwnReadData = OwnReadData
+
+
+def reader_of(data: bytes) -> PacketDataReader:
+    reader = PacketDataReader()
+    reader.load(memoryview(data))
+    return reader
+
+
+def write_protocol(tmp_path, description: dict) -> str:
+    path = tmp_path / "protocol.json"
+    path.write_text(json.dumps(description))
+    return str(path)
+
+
+class TestLoadProtocol:
+    def test_load(self, tmp_path):
+        path = write_protocol(tmp_path, {"release_name": "x",
+                                         "play": {"0x1A": {"name": "A", "fields": [["value", "VARINT"],
+                                                                                   ["yaw", "ANGLE"]]}}})
+
+        assert load_protocol(path) == {"play": {0x1A: ("A", (("value", FieldType.VARINT),
+                                                              ("yaw", FieldType.UNSIGNED_BYTE)))}}
+
+    @pytest.mark.parametrize("packet", [{"name": "A", "fields": [["value", "NOT_A_TYPE"]]},
+                                        {"name": "A"},
+                                        {"name": "A", "fields": [["value"]]}])
+    def test_invalid_packet(self, tmp_path, packet):
+        with pytest.raises(ValueError):
+            load_protocol(write_protocol(tmp_path, {"play": {"0x00": packet}}))
+
+    def test_invalid_packet_id(self, tmp_path):
+        with pytest.raises(ValueError):
+            load_protocol(write_protocol(tmp_path, {"play": {"zero": {"name": "A", "fields": []}}}))
+
+    def test_1_12_2_covers_every_clientbound_packet(self):
+        protocol = load_protocol(PROTOCOL_1_12_2)
+
+        assert sorted(protocol["login"]) == list(range(0x00, 0x04))
+        assert sorted(protocol["play"]) == list(range(0x00, 0x50))
+        for state_protocol in protocol.values():
+            for name, schema in state_protocol.values():
+                compile_schema(schema, f"{name}_read_schema")
+
+
+class TestGeneratePackets:
+    def test_generated_packets(self):
+        packets = generate_packets({0x00: ("Handled", (("value", FieldType.VARINT),)),
+                                    0x01: ("OwnReadData", (("x", FieldType.SHORT),)),
+                                    0x02: ("NotHandled", (("uuid", FieldType.UUID),))},
+                                   HANDLERS, Base)
+
+        handled = packets[0x00]
+        handled.read_data(reader_of(converters.convert_to_varint(300)))
+        assert isinstance(handled, Handled)
+        assert type(handled).__name__ == "Handled"
+        assert type(handled).__doc__ == "Hand-written."
+        assert handled.is_big
+        assert handled.default_handler(None) == 300
+
+        own_read_data = packets[0x01]
+        own_read_data.read_data(reader_of(b'\x00\x05'))
+        assert (own_read_data.x, own_read_data.data) == (5, b'\x00\x05')
+
+        not_handled = packets[0x02]
+        not_handled.read_data(reader_of(bytes(range(16))))
+        assert type(not_handled).__name__ == "NotHandled"
+        assert not_handled.uuid == bytes(range(16))
+
+        assert [has_handler(packet, Base) for packet in packets.values()] == [True, False, False]
+        assert get_handled(packets, Base) == {0x00: handled}
+
+    def test_hand_written_class_has_to_be_schema_reader(self):
+        handlers = types.ModuleType("handlers")
+        handlers.A = object
+
+        with pytest.raises(TypeError):
+            generate_packets({0x00: ("A", ())}, handlers, Base)
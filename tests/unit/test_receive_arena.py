@@ -0,0 +1,80 @@
+from MinecraftConsoleClient.misc.converters import convert_to_varint
+from MinecraftConsoleClient.packet.receive_arena import ArenaFrameReader, ReceiveArena
+
+
+def frame(payload: bytes) -> bytes:
+    return convert_to_varint(len(payload)) + payload
+
+
+def feed(reader: ArenaFrameReader, data: bytes) -> [memoryview, ]:
+    """Feed data into reader the way asyncio.BufferedProtocol does."""
+    frames = []
+    while data:
+        buffer = reader.get_buffer()
+        size = min(len(buffer), len(data))
+        buffer[:size] = data[:size]
+        data = data[size:]
+        frames.extend(reader.buffer_updated(size))
+    return frames
+
+
+class TestReceiveArena:
+    def test_frames_are_views_into_slab(self):
+        arena = ReceiveArena(slab_size=64)
+        reader = ArenaFrameReader(arena)
+
+        frames = feed(reader, frame(b"abc") + frame(b"de"))
+
+        assert [bytes(frame_) for frame_ in frames] == [b"abc", b"de"]
+        assert all(isinstance(frame_, memoryview) for frame_ in frames)
+
+    def test_outstanding_frames_stay_untouched(self):
+        arena = ReceiveArena(slab_size=16)
+        reader = ArenaFrameReader(arena)
+
+        first = feed(reader, frame(b"x" * 10))
+        rest = feed(reader, b"".join(frame(bytes([idx]) * 10) for idx in range(5)))
+
+        assert bytes(first[0]) == b"x" * 10
+        assert [bytes(frame_) for frame_ in rest] == [bytes([idx]) * 10 for idx in range(5)]
+
+    def test_released_slabs_are_reused(self):
+        arena = ReceiveArena(slab_size=16)
+        reader = ArenaFrameReader(arena)
+
+        previous = []
+        for idx in range(20):
+            frames = feed(reader, frame(bytes([idx]) * 10))
+            assert [bytes(frame_) for frame_ in frames] == [bytes([idx]) * 10]
+            # Previous frame is still used while the next one is received.
+            for frame_ in previous:
+                arena.release(frame_)
+            previous = frames
+
+        assert arena.allocated_slabs <= 3
+        assert arena.reused_slabs > 0
+
+    def test_slab_without_frames_is_reused_in_place(self):
+        arena = ReceiveArena(slab_size=16)
+        reader = ArenaFrameReader(arena)
+
+        for idx in range(20):
+            for frame_ in feed(reader, frame(bytes([idx]) * 10)):
+                arena.release(frame_)
+
+        assert arena.allocated_slabs == 1
+
+    def test_frame_bigger_than_slab(self):
+        arena = ReceiveArena(slab_size=16)
+        reader = ArenaFrameReader(arena)
+
+        frames = feed(reader, frame(b"small") + frame(b"b" * 100) + frame(b"after"))
+
+        assert [bytes(frame_) for frame_ in frames] == [b"small", b"b" * 100, b"after"]
+
+    def test_release_of_foreign_frame_is_ignored(self):
+        arena = ReceiveArena(slab_size=16)
+        ArenaFrameReader(arena)
+
+        arena.release(memoryview(bytearray(b"foreign")))
+        arena.release(b"foreign")
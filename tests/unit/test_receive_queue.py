@@ -0,0 +1,88 @@
+import threading
+
+from MinecraftConsoleClient.packet.receive_queue import ReceivePolicy, ReceiveQueue
+
+POLICIES = {0x01: ReceivePolicy.DROP, 0x02: ReceivePolicy.MERGE}
+
+
+class TestReceiveQueue:
+    @staticmethod
+    def _overloaded_queue(discarded: list = None) -> ReceiveQueue:
+        received = ReceiveQueue(4, 2, POLICIES,
+                                on_discard=None if discarded is None else discarded.append)
+        for idx in range(4):
+            received.put(bytes((0x03, idx)))
+        return received
+
+    def test_not_overloaded(self):
+        received = ReceiveQueue(4, 2, POLICIES)
+        for packet in (b'\x01\x00', b'\x02\x00', b'\x02\x01'):
+            received.put(packet)
+
+        assert [received.get_nowait() for _ in range(3)] == [b'\x01\x00', b'\x02\x00', b'\x02\x01']
+        assert received.max_depth == 3
+        assert received.overloads == 0
+
+    def test_drop(self):
+        discarded = []
+        received = self._overloaded_queue(discarded)
+
+        received.put(b'\x01\x00')
+        received.put(None)
+
+        assert received.qsize() == 5
+        assert received.dropped == {0x01: 1}
+        assert received.overloads == 1
+        assert discarded == [b'\x01\x00']
+
+    def test_merge(self):
+        discarded = []
+        received = ReceiveQueue(4, 2, POLICIES, on_discard=discarded.append)
+        received.put(b'\x02\x00')
+        for idx in range(3):
+            received.put(bytes((0x03, idx)))
+
+        received.put(b'\x02\x01')
+        received.put(b'\x02\x02')
+
+        assert received.qsize() == 4
+        assert received.get_nowait() == b'\x02\x02'
+        assert received.merged == {0x02: 2}
+        assert discarded == [b'\x02\x00', b'\x02\x01']
+
+    def test_block_until_low_water(self):
+        received = self._overloaded_queue()
+
+        putter = threading.Thread(target=received.put, args=(b'\x03\x04',))
+        putter.start()
+        putter.join(0.1)
+        assert putter.is_alive()
+
+        received.get()
+        putter.join(0.1)
+        assert putter.is_alive()
+
+        received.get()
+        putter.join(1)
+        assert not putter.is_alive()
+        assert received.qsize() == 3
+        assert received.blocked_time > 0
+
+    def test_close_releases_blocked(self):
+        received = self._overloaded_queue()
+
+        putter = threading.Thread(target=received.put, args=(b'\x03\x04',))
+        putter.start()
+        received.close()
+        putter.join(1)
+
+        assert not putter.is_alive()
+        assert received.qsize() == 4
+
+    def test_compressed_packet_id(self):
+        received = self._overloaded_queue()
+        received.set_compression_threshold(256)
+
+        received.put(b'\x00\x01\x00')
+
+        assert received.dropped == {0x01: 1}
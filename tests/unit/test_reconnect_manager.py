@@ -0,0 +1,227 @@
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest as pytest
+
+from MinecraftConsoleClient import reconnect_manager
+from MinecraftConsoleClient.reconnect_manager import ReconnectManager
+
+ADDRESS = ("127.0.0.1", 25565)
+
+
+class StubGame:
+    """
+    Game which plays sessions described by (time_to_play, play_time) without connecting,
+    time_to_play None means session which has not logged in.
+    """
+
+    def __init__(self, *sessions: (float, float)):
+        self.sessions = list(sessions)
+        self.data = SimpleNamespace(hero=SimpleNamespace(username="Bob"),
+                                    host=SimpleNamespace(get_host_data=lambda: ("localhost", ADDRESS[1])))
+        self.server_address = None
+        self.logged_in_time = None
+        self.resets = 0
+        self.closed_connections = 0
+        # server_address of every started session.
+        self.addresses = []
+
+    def start(self):
+        self.addresses.append(self.server_address)
+        time_to_play, play_time = self.sessions.pop(0) if self.sessions else (None, 0.0)
+        if time_to_play is None:
+            return "Cannot connect to the server."
+        time.sleep(time_to_play)
+        self.logged_in_time = time.perf_counter()
+        time.sleep(play_time)
+        return "Received 0 bytes"
+
+    def reset_session(self):
+        self.resets += 1
+        self.logged_in_time = None
+
+    def close_connection(self):
+        self.closed_connections += 1
+
+
+@pytest.fixture
+def resolved(monkeypatch) -> list:
+    """Hosts resolved by ReconnectManager, always to ADDRESS."""
+    hosts = []
+
+    def getaddrinfo(host, port, *args):
+        hosts.append((host, port))
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ADDRESS)]
+
+    monkeypatch.setattr(reconnect_manager.socket, "getaddrinfo", getaddrinfo)
+    return hosts
+
+
+def create_manager(game_: StubGame, max_attempts: int) -> ReconnectManager:
+    manager = ReconnectManager(game_, max_attempts)
+    manager.base_delay = 0.01
+    manager.max_delay = 0.02
+    manager.stable_play_time = 0.05
+    return manager
+
+
+class TestDelay:
+    @pytest.mark.parametrize("failures, delay", [(0, 0.0), (1, 1.0), (2, 2.0), (4, 8.0), (7, 60.0), (100, 60.0)])
+    def test_backoff(self, monkeypatch, failures, delay):
+        manager = ReconnectManager(StubGame())
+        manager._failures = failures
+
+        monkeypatch.setattr(reconnect_manager.random, "random", lambda: 0.0)
+        assert manager.get_delay() == delay
+        # At most jitter part of the delay is taken off.
+        monkeypatch.setattr(reconnect_manager.random, "random", lambda: 1.0)
+        assert manager.get_delay() == pytest.approx(delay * (1 - manager.jitter))
+
+    def test_jitter(self):
+        manager = ReconnectManager(StubGame())
+        manager._failures = 3
+
+        delays = {manager.get_delay() for _ in range(100)}
+
+        assert len(delays) > 1
+        assert all(4.0 * (1 - manager.jitter) <= delay <= 4.0 for delay in delays)
+
+
+class TestReconnectManager:
+    def test_max_attempts(self, resolved):
+        game_ = StubGame()
+        manager = create_manager(game_, 3)
+
+        assert manager.run() == "Cannot connect to the server."
+
+        assert [attempt.number for attempt in manager.attempts] == [1, 2, 3]
+        assert all(attempt.time_to_play is None for attempt in manager.attempts)
+        assert game_.resets == 2
+        assert manager._failures == 3
+        # Host is resolved again after session which has not logged in.
+        assert len(resolved) == 3
+
+    def test_address_is_resolved_once(self, resolved):
+        game_ = StubGame((0.0, 0.0), (0.0, 0.0), (0.0, 0.0))
+        manager = create_manager(game_, 3)
+
+        manager.run()
+
+        assert resolved == [("localhost", ADDRESS[1])]
+        assert game_.addresses == [ADDRESS] * 3
+
+    def test_time_to_play(self, resolved):
+        game_ = StubGame((0.02, 0.0), (None, 0.0), (0.01, 0.06))
+        manager = create_manager(game_, 3)
+
+        manager.run()
+
+        first, second, third = manager.attempts
+        assert 0.02 <= first.time_to_play < 0.5 and first.play_time < 0.05
+        assert second.time_to_play is None and second.play_time == 0.0
+        assert 0.01 <= third.time_to_play < 0.5 and third.play_time >= 0.06
+        # Session which played long enough resets backoff.
+        assert manager._failures == 0
+
+    def test_stop(self, resolved):
+        game_ = StubGame()
+        manager = create_manager(game_, None)
+        manager.base_delay = manager.max_delay = 10
+        manager.jitter = 0
+
+        runner = threading.Thread(target=manager.run)
+        runner.start()
+        while not manager.attempts:
+            time.sleep(0.001)
+        manager.stop()
+        runner.join(5)
+
+        assert not runner.is_alive()
+        assert len(manager.attempts) == 1
+        assert game_.closed_connections == 1
+
+    def test_async_game_is_rejected(self, version_1_12_2):
+        from async_game import AsyncGame
+        from data_structures.hero import Hero
+        from data_structures.host import Host
+
+        with pytest.raises(TypeError, match="AsyncGame"):
+            ReconnectManager(AsyncGame(Host("localhost", 25565), Hero("Bob")))
+
+
+def create_game():
+    from data_structures.hero import Hero
+    from data_structures.host import Host
+    from game import Game
+
+    return Game(Host("localhost", 25565), Hero("Bob"))
+
+
+class TestResetSession:
+    def test_reset_session(self, version_1_12_2):
+        game_ = create_game()
+        game_.server_address = ADDRESS
+        game_.logged_in_time = time.perf_counter()
+        game_.data.world_data.compression_threshold = 256
+        login_payloads = game_._get_login_payloads()
+        connection_ = game_._connection
+        received_packets = game_.received_packets
+        game_.to_send_packets.put(b'\x0b' + bytes(8))
+
+        game_.reset_session()
+
+        # New session state.
+        assert game_._connection is not None and game_._connection is not connection_
+        assert game_.received_packets is not received_packets
+        assert game_.to_send_packets.empty()
+        assert game_.logged_in_time is None
+        assert game_.data.world_data.compression_threshold == -1
+        # Kept between sessions.
+        assert game_.server_address == ADDRESS
+        assert game_._get_login_payloads() is login_payloads
+        assert game_.data.hero.username == "Bob"
+
+        game_.stop()
+
+    def test_reset_session_during_walk(self, version_1_12_2, monkeypatch):
+        from data_structures.position import Position
+
+        game_ = create_game()
+        game_.data.hero.entity.position = Position(0, 64, 0)
+        move_manager = game_.move_manager
+        assert move_manager.start()
+        move_manager.add_target(100, 64, 0)
+        move_manager.add_target(0, 64, 100)
+        # Walk is in progress.
+        assert game_.to_send_packets.get(timeout=5)
+
+        game_.reset_session()
+
+        # Walk is aborted, targets dropped, nothing is put until logged in.
+        time.sleep(0.3)
+        assert game_.to_send_packets.empty()
+        assert move_manager.is_suspended() and game_.move_manager is move_manager
+
+        # Start of the next session: mover is unsuspended only after log in.
+        events = []
+        received_packets = game_.received_packets
+        monkeypatch.setattr(game_, "_connect_to_server", lambda: True)
+        monkeypatch.setattr(game_._connection, "start_listener", lambda received: True)
+        monkeypatch.setattr(game_._connection, "start_sender", lambda to_send: True)
+        monkeypatch.setattr(game_, "_log_in", lambda: events.append(("log_in", move_manager.is_suspended(),
+                                                                     game_.to_send_packets.qsize())) or True)
+        monkeypatch.setattr(move_manager, "unsuspend", lambda: events.append(("unsuspend", )))
+        received_packets.put(b'')
+
+        assert game_.start() == "Received 0 bytes"
+        assert events == [("log_in", True, 0), ("unsuspend", )]
+
+        # Stop of the session makes sender exit, then mover walks again when unsuspended.
+        assert game_.to_send_packets.get_nowait() == b''
+        monkeypatch.undo()
+        move_manager.unsuspend()
+        move_manager.add_target(1, 64, 0)
+        assert game_.to_send_packets.get(timeout=5)
+        move_manager.stop()
@@ -0,0 +1,150 @@
+import pytest as pytest
+
+from MinecraftConsoleClient.misc import converters
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+from MinecraftConsoleClient.packet.schema import FieldType, LazyField, SchemaReader, compile_schema
+
+
+def reader_of(data: bytes) -> PacketDataReader:
+    reader = PacketDataReader()
+    reader.load(memoryview(data))
+    return reader
+
+
+class Target:
+    pass
+
+
+class TestCompileSchema:
+    def test_fixed_size_fields_are_read_with_one_unpack(self):
+        schema = (("x", FieldType.DOUBLE), ("yaw", FieldType.FLOAT), ("flags", FieldType.BYTE))
+        decoder = compile_schema(schema)
+
+        target = Target()
+        reader = reader_of(converters.pack_double(1.5) + converters.pack_float(-2.0) + b'\xff' + b'rest')
+        decoder(target, reader)
+
+        assert (target.x, target.yaw, target.flags) == (1.5, -2.0, -1)
+        assert reader.get_not_parsed_data() == b'rest'
+        assert decoder.source.count("_unpack_") == 1
+
+    def test_mixed_fields(self):
+        schema = (("entity_id", FieldType.INT),
+                  ("food", FieldType.VARINT),
+                  ("is_on_ground", FieldType.BOOL),
+                  ("name", FieldType.STRING),
+                  ("position", FieldType.POSITION),
+                  ("rest", FieldType.REST))
+        data = b''.join((b'\x00\x00\x01\x00',
+                         converters.convert_to_varint(300),
+                         converters.pack_bool(True),
+                         converters.pack_string("Bob"),
+                         converters.pack_long(1 << 38),
+                         b'\x01\x02'))
+
+        target = Target()
+        compile_schema(schema)(target, reader_of(data))
+
+        expected_position = converters.extract_position(memoryview(converters.pack_long(1 << 38)))[0]
+        assert (target.entity_id, target.food, target.is_on_ground, target.name) == (256, 300, True, "Bob")
+        assert (target.position.x, target.position.y, target.position.z) \
+               == (expected_position.x, expected_position.y, expected_position.z)
+        assert target.rest == b'\x01\x02'
+
+    def test_rest_has_to_be_last(self):
+        with pytest.raises(ValueError):
+            compile_schema((("rest", FieldType.REST), ("x", FieldType.INT)))
+
+    def test_invalid_field(self):
+        with pytest.raises(ValueError):
+            compile_schema((("not valid", FieldType.INT),))
+        with pytest.raises(TypeError):
+            compile_schema((("x", "i"),))
+
+    def test_too_short_data(self):
+        with pytest.raises(Exception):
+            compile_schema((("x", FieldType.LONG),))(Target(), reader_of(b'\x00' * 7))
+
+
+class TestSchemaReader:
+    def test_read_data_is_compiled_from_schema(self):
+        class Packet(SchemaReader):
+            schema = (("health", FieldType.FLOAT), ("food", FieldType.VARINT))
+
+        packet = Packet()
+        packet.read_data(reader_of(converters.pack_float(20.0) + b'\x14'))
+
+        assert (packet.health, packet.food) == (20.0, 20)
+
+    def test_own_read_data_is_kept(self):
+        class Packet(SchemaReader):
+            schema = (("x", FieldType.SHORT),)
+
+            def read_data(self, reader: PacketDataReader):
+                self.data = reader.get_not_parsed_data()
+                self.read_schema(reader)
+
+        packet = Packet()
+        packet.read_data(reader_of(b'\x00\x05'))
+
+        assert packet.x == 5
+        assert packet.data == b'\x00\x05'
+
+
+class TestLazyField:
+    class Packet(SchemaReader):
+        schema = (("message", FieldType.JSON), ("level_type", FieldType.STRING_BYTES),
+                  ("name", FieldType.STRING), ("food", FieldType.VARINT))
+        lazy_fields = ("message", "level_type", "name")
+
+    @staticmethod
+    def data_of(message: str, level_type: str, name: str, food: int) -> bytes:
+        return b''.join((converters.pack_string(message), converters.pack_string(level_type),
+                         converters.pack_string(name), converters.convert_to_varint(food)))
+
+    def test_decoded_on_access(self):
+        packet = self.Packet()
+        packet.read_data(reader_of(self.data_of('{"text": "hi"}', "flat", "Bob", 300)))
+
+        assert packet.food == 300
+        assert "message" not in packet.__dict__
+
+        assert packet.message == {"text": "hi"}
+        assert (packet.level_type, packet.name) == (b"flat", "Bob")
+        assert packet.__dict__["message"] is packet.message
+
+    def test_cached_until_next_read(self):
+        packet = self.Packet()
+        packet.read_data(reader_of(self.data_of('"first"', "default", "Bob", 1)))
+        assert packet.message == "first"
+
+        packet.read_data(reader_of(self.data_of('"second"', "flat", "Alice", 2)))
+
+        assert (packet.message, packet.level_type, packet.name, packet.food) == ("second", b"flat", "Alice", 2)
+
+    def test_not_read(self):
+        with pytest.raises(AttributeError):
+            _ = self.Packet().message
+
+    def test_invalid_lazy_field(self):
+        with pytest.raises(ValueError):
+            compile_schema((("x", FieldType.INT),), lazy_fields=("y",))
+        with pytest.raises(ValueError):
+            compile_schema((("x", FieldType.VARINT),), lazy_fields=("x",))
+        with pytest.raises(ValueError):
+            LazyField("x", FieldType.REST)
+
+    def test_hand_written_read(self):
+        class Packet(SchemaReader):
+            message = LazyField("message", FieldType.JSON)
+
+            def read_data(self, reader: PacketDataReader):
+                self.event = reader.read_varint()
+                Packet.message.read(self, reader)
+
+        packet = Packet()
+        packet.message = None
+        packet.read_data(reader_of(b'\x02' + converters.pack_string('{"text": "died"}')))
+
+        assert packet.event == 2
+        assert packet.message == {"text": "died"}
@@ -0,0 +1,79 @@
+from array import array
+
+import pytest as pytest
+
+from MinecraftConsoleClient.misc.consts import MAX_INT, MIN_INT
+from MinecraftConsoleClient.misc.converters import SMALL_VARINT_LIMIT, convert_to_varint, decode_varint, \
+    decode_varints, extract_varint_as_int
+from MinecraftConsoleClient.packet.packet_data_reader import PacketDataReader
+
+# Examples from https://wiki.vg/Protocol#VarInt_and_VarLong
+WIKI_EXAMPLES = {
+    0: b'\x00',
+    1: b'\x01',
+    2: b'\x02',
+    127: b'\x7f',
+    128: b'\x80\x01',
+    255: b'\xff\x01',
+    25565: b'\xdd\xc7\x01',
+    2097151: b'\xff\xff\x7f',
+    2147483647: b'\xff\xff\xff\xff\x07',
+    -1: b'\xff\xff\xff\xff\x0f',
+    -2147483648: b'\x80\x80\x80\x80\x08',
+}
+
+VALUES = [0, 1, 127, 128, 255, 300, SMALL_VARINT_LIMIT - 1, SMALL_VARINT_LIMIT, 2097151, 2097152,
+          MAX_INT, -1, -300, MIN_INT]
+
+
+class TestEncode:
+    @pytest.mark.parametrize("value, varint", WIKI_EXAMPLES.items())
+    def test_wiki_examples(self, value, varint):
+        assert convert_to_varint(value) == varint
+
+    def test_precomputed_match_computed(self):
+        for value in range(SMALL_VARINT_LIMIT - 1, SMALL_VARINT_LIMIT + 2):
+            varint = convert_to_varint(value)
+            assert decode_varint(varint) == (value, len(varint))
+        assert len(convert_to_varint(SMALL_VARINT_LIMIT - 1)) == 2
+        assert len(convert_to_varint(SMALL_VARINT_LIMIT)) == 3
+
+
+class TestDecode:
+    @pytest.mark.parametrize("value, varint", WIKI_EXAMPLES.items())
+    def test_wiki_examples(self, value, varint):
+        assert decode_varint(varint) == (value, len(varint))
+        assert decode_varint(memoryview(b'\xaa' + varint + b'\xbb'), 1) == (value, len(varint) + 1)
+
+    def test_extract_varint_as_int(self):
+        value, leftover = extract_varint_as_int(memoryview(convert_to_varint(25565) + b'rest'))
+        assert (value, bytes(leftover)) == (25565, b'rest')
+
+    def test_too_big(self):
+        with pytest.raises(ValueError):
+            decode_varint(b'\xff\xff\xff\xff\xff\x01')
+        with pytest.raises(ValueError):
+            decode_varints(b'\x01\xff\xff\xff\xff\xff\x01', 0, 2)
+
+    def test_too_short(self):
+        with pytest.raises(IndexError):
+            decode_varint(b'\xff\xff')
+        with pytest.raises(IndexError):
+            decode_varints(b'\x01\x02', 0, 3)
+
+    def test_decode_varints(self):
+        data = b'head' + b''.join(convert_to_varint(value) for value in VALUES) + b'tail'
+
+        values, offset = decode_varints(data, 4, len(VALUES))
+
+        assert values == array("i", VALUES)
+        assert data[offset:] == b'tail'
+        assert decode_varints(data, 4, 0) == (array("i"), 4)
+
+    def test_reader(self):
+        reader = PacketDataReader()
+        reader.load(memoryview(b''.join(convert_to_varint(value) for value in VALUES * 2)))
+
+        assert [reader.read_varint() for _ in VALUES] == VALUES
+        assert list(reader.read_varints(len(VALUES))) == VALUES
+        assert reader.get_not_parsed_data() == b''
@@ -0,0 +1,164 @@
+import queue
+import random
+import socket
+import time
+
+import pytest as pytest
+
+from MinecraftConsoleClient import connection as connection_module
+from MinecraftConsoleClient.connection import Connection, frame_payload
+
+COMPRESSION_THRESHOLD = 64
+
+# Uncompressed and compressed (>= COMPRESSION_THRESHOLD) payloads.
+PAYLOADS = [b'\x0b' + bytes(8), b'\x02' + b'chat message' * 10, b'\x0e\x00', b'\x09' + bytes(1000), b'\x1a']
+
+
+class RecordingSocket:
+    """Socket passing everything to the wrapped one, records data of sendall calls."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.calls = []
+
+    def sendall(self, data: bytes):
+        self.calls.append(bytes(data))
+        return self.sock.sendall(data)
+
+    def __getattr__(self, name: str):
+        return getattr(self.sock, name)
+
+
+@pytest.fixture
+def connection_pair():
+    client, server = socket.socketpair()
+    server.settimeout(5)
+    connection = Connection()
+    connection._connection.close()
+    connection._connection = RecordingSocket(client)
+    connection.compression_threshold = COMPRESSION_THRESHOLD
+    connection.coalesce_writes = True
+    yield connection, server
+    server.close()
+    connection.close()
+
+
+def receive(server: socket.socket, size: int) -> bytes:
+    data = b''
+    while len(data) < size:
+        data += server.recv(size - len(data))
+    return data
+
+
+def expected_bytes(payloads: [bytes, ]) -> bytes:
+    return b''.join(frame_payload(payload, COMPRESSION_THRESHOLD) for payload in payloads)
+
+
+def stop_sender(connection: Connection, to_send: queue.Queue):
+    to_send.put(b'')
+    connection._sender.join(5)
+    assert not connection._sender.is_alive()
+
+
+class TestWriteCoalescing:
+    def test_queue_is_drained(self, connection_pair):
+        connection, server = connection_pair
+        to_send = queue.Queue()
+        for payload in PAYLOADS:
+            to_send.put(payload)
+        to_send.put(b'')
+
+        assert connection.start_sender(to_send)
+        connection._sender.join(5)
+
+        expected = expected_bytes(PAYLOADS)
+        # Mixed compressed and uncompressed frames sent with one call, exactly as framed one by one.
+        assert connection._connection.calls == [expected]
+        assert receive(server, len(expected)) == expected
+        assert not connection._sender.is_alive()
+
+    def test_max_batch_packets(self, connection_pair, monkeypatch):
+        connection, server = connection_pair
+        monkeypatch.setattr(connection_module, "MAX_BATCH_PACKETS", 2)
+        to_send = queue.Queue()
+        for payload in PAYLOADS:
+            to_send.put(payload)
+        to_send.put(b'')
+
+        assert connection.start_sender(to_send)
+        connection._sender.join(5)
+
+        assert connection._connection.calls == [expected_bytes(PAYLOADS[:2]), expected_bytes(PAYLOADS[2:4]),
+                                                 expected_bytes(PAYLOADS[4:])]
+
+    def test_max_batch_delay(self, connection_pair):
+        connection, server = connection_pair
+        connection.max_batch_delay = 0.5
+        to_send = queue.Queue()
+
+        assert connection.start_sender(to_send)
+        to_send.put(PAYLOADS[0])
+        time.sleep(0.05)
+        to_send.put(PAYLOADS[1])
+
+        # Sender waited for the second packet.
+        expected = expected_bytes(PAYLOADS[:2])
+        assert receive(server, len(expected)) == expected
+        assert connection._connection.calls == [expected]
+        stop_sender(connection, to_send)
+
+    def test_no_batch_delay(self, connection_pair):
+        connection, server = connection_pair
+        to_send = queue.Queue()
+
+        assert connection.start_sender(to_send)
+        for payload in PAYLOADS[:2]:
+            to_send.put(payload)
+            expected = expected_bytes([payload])
+            assert receive(server, len(expected)) == expected
+
+        assert connection._connection.calls == [expected_bytes(PAYLOADS[:1]), expected_bytes(PAYLOADS[1:2])]
+        stop_sender(connection, to_send)
+
+    def test_stop_sentinel(self, connection_pair):
+        connection, server = connection_pair
+        connection.max_batch_delay = 5
+        to_send = queue.Queue()
+        for payload in (PAYLOADS[0], PAYLOADS[1], b'', PAYLOADS[2]):
+            to_send.put(payload)
+
+        assert connection.start_sender(to_send)
+        connection._sender.join(5)
+
+        # Packets queued before b'' are sent without waiting for max_batch_delay, later ones are not.
+        assert not connection._sender.is_alive()
+        assert connection._connection.calls == [expected_bytes(PAYLOADS[:2])]
+        assert to_send.get_nowait() == PAYLOADS[2]
+
+    def test_partial_writes(self, connection_pair):
+        connection, server = connection_pair
+        # Batch (not compressible) much bigger than socket buffers, socket accepts it in parts.
+        payloads = [b'\x09' + random.Random(idx).randbytes(20000) for idx in range(64)]
+        to_send = queue.Queue()
+        for payload in payloads:
+            to_send.put(payload)
+        to_send.put(b'')
+
+        assert connection.start_sender(to_send)
+        expected = expected_bytes(payloads)
+        assert len(expected) > connection._connection.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        assert receive(server, len(expected)) == expected
+        connection._sender.join(5)
+        assert connection._connection.calls == [expected]
+
+
+class TestTcpNoDelay:
+    @pytest.mark.parametrize("tcp_nodelay", [True, False])
+    def test_enable_write_coalescing(self, tcp_nodelay):
+        connection = Connection()
+
+        connection.enable_write_coalescing(0.01, tcp_nodelay)
+
+        assert connection.coalesce_writes and connection.max_batch_delay == 0.01
+        assert connection._connection.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY) == int(tcp_nodelay)
+        connection.close()